@@ -79,6 +79,14 @@ def create_app(config_class=Config):
     app.register_blueprint(signature_bp, url_prefix='/api')
     app.register_blueprint(ml_bp, url_prefix='/api/ml')
     
+    # Register CLI commands
+    from app.cli.workers import track_receipts, drain_outbox, anchor_batches, index_events, sync_mirror
+    app.cli.add_command(track_receipts)
+    app.cli.add_command(drain_outbox)
+    app.cli.add_command(anchor_batches)
+    app.cli.add_command(index_events)
+    app.cli.add_command(sync_mirror)
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
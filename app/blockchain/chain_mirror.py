@@ -0,0 +1,168 @@
+"""
+SQL mirror of the contract's files, contracts and signatures mappings
+
+The event indexer keeps the chain_files, chain_contracts and
+chain_signatures tables in step with the chain: every contract id and CID
+that appears in an indexed block range is re-read at the range's last
+block, in one JSON-RPC batch, and stored in the same transaction as the
+events and the checkpoint. The mirror therefore reflects exactly the
+checkpoint block. After a reorg the rows changed above the fork point are
+re-read at the fork point.
+
+Verification queries answer from the mirror together with that block
+height; `strict` (or a mirror miss) reads the chain instead, bypassing
+the read cache when strict. Routes also skip their response cache for
+strict requests (see strict_requested).
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import has_request_context, request
+
+from app import db
+from app.models.chain_event import IndexerCheckpoint
+from app.models.chain_mirror import MirroredContract, MirroredFile, MirroredSignature
+
+# Contract ids (two calls each) or CIDs per JSON-RPC batch
+REFRESH_BATCH_SIZE = 200
+
+# What getSignature returns for a contract that was never signed
+UNSIGNED = {
+    'contract_id': 0,
+    'original_cid': '',
+    'signed_cid': '',
+    'timestamp': 0,
+    'metadata': None,
+    'signer': '0x0000000000000000000000000000000000000000'
+}
+
+def _store_contract(contract_id: int, details: Dict, block_number: int) -> None:
+    row = MirroredContract.query.get(contract_id)
+    if not details['timestamp']:
+        if row is not None:
+            db.session.delete(row)
+        return
+    if row is None:
+        row = MirroredContract(contract_id=contract_id)
+        db.session.add(row)
+    for field in ('cid', 'timestamp', 'status', 'creator', 'party_a', 'party_b',
+                  'is_party_a_signed', 'is_party_b_signed'):
+        setattr(row, field, details[field])
+    row.block_number = block_number
+
+def _store_signature(contract_id: int, details: Dict, block_number: int) -> None:
+    row = MirroredSignature.query.get(contract_id)
+    if not details['timestamp']:
+        if row is not None:
+            db.session.delete(row)
+        return
+    if row is None:
+        row = MirroredSignature(contract_id=contract_id)
+        db.session.add(row)
+    row.original_cid = details['original_cid']
+    row.signed_cid = details['signed_cid']
+    row.timestamp = details['timestamp']
+    row.signature_metadata = details['metadata']
+    row.signer = details['signer']
+    row.block_number = block_number
+
+def _store_file(cid: str, record: Dict, block_number: int) -> None:
+    row = MirroredFile.query.filter_by(cid=cid).first()
+    if not record['timestamp']:
+        if row is not None:
+            db.session.delete(row)
+        return
+    if row is None:
+        row = MirroredFile(cid=cid)
+        db.session.add(row)
+    row.owner = record['owner']
+    row.timestamp = record['timestamp']
+    row.block_number = block_number
+
+def refresh(client, contract_ids: Iterable[int], cids: Iterable[str], block_number: int) -> None:
+    """
+    Re-read mirrored rows at block_number and store them (the caller commits)
+
+    Rows that do not exist at that block are deleted.
+    """
+    contract_ids = sorted(set(contract_ids))
+    cids = sorted(set(cids))
+    for i in range(0, len(contract_ids), REFRESH_BATCH_SIZE):
+        chunk = contract_ids[i:i + REFRESH_BATCH_SIZE]
+        batch = client.read_batch(block_number)
+        for contract_id in chunk:
+            batch.contract_row(contract_id).signature_row(contract_id)
+        results = batch.execute()
+        for contract_id, details, signature in zip(chunk, results[::2], results[1::2]):
+            _store_contract(contract_id, details, block_number)
+            _store_signature(contract_id, signature, block_number)
+
+    for i in range(0, len(cids), REFRESH_BATCH_SIZE):
+        chunk = cids[i:i + REFRESH_BATCH_SIZE]
+        batch = client.read_batch(block_number)
+        for cid in chunk:
+            batch.file_row(cid)
+        for cid, record in zip(chunk, batch.execute()):
+            _store_file(cid, record, block_number)
+
+def rewind(client, block_number: int) -> None:
+    """Re-read the rows that changed above block_number (the fork point of a reorg)"""
+    contract_ids = {row.contract_id for row in MirroredContract.query.filter(MirroredContract.block_number > block_number)}
+    contract_ids.update(
+        row.contract_id for row in MirroredSignature.query.filter(MirroredSignature.block_number > block_number)
+    )
+    cids = [row.cid for row in MirroredFile.query.filter(MirroredFile.block_number > block_number)]
+    refresh(client, contract_ids, cids, block_number)
+
+def strict_requested() -> bool:
+    """Whether the current request asked for a live chain read (?strict=true)"""
+    return has_request_context() and request.args.get('strict', 'false').lower() == 'true'
+
+def mirror_block(name: str = 'contract_events') -> Optional[int]:
+    """Block the mirror reflects, or None if the indexer has not run"""
+    checkpoint = IndexerCheckpoint.query.filter_by(name=name).first()
+    if checkpoint is None or checkpoint.block_number < 0:
+        return None
+    return checkpoint.block_number
+
+def verify_cid(client, cid: str, strict: bool = False) -> Dict:
+    """
+    Web3Client.verify_cid answered from the mirror, with as_of_block
+
+    A live answer (strict, not mirrored, or no mirror) has as_of_block None.
+    """
+    as_of_block = None if strict else mirror_block()
+    if as_of_block is not None:
+        row = MirroredFile.query.filter_by(cid=cid).first()
+        if row is not None:
+            return dict(row.to_verification(), as_of_block=as_of_block)
+    return dict(client.verify_cid(cid), as_of_block=None)
+
+def verify_contract(client, contract_id: int, cid: str, strict: bool = False) -> Dict:
+    """Web3Client.verify_contract answered from the mirror, with as_of_block"""
+    as_of_block = None if strict else mirror_block()
+    if as_of_block is not None:
+        row = MirroredContract.query.get(contract_id)
+        if row is not None:
+            return dict(row.to_verification(cid), as_of_block=as_of_block)
+    if strict:
+        client.reads.invalidate(contract_id)
+    return dict(client.verify_contract(contract_id, cid), as_of_block=None)
+
+def contract_state(client, contract_id: int, strict: bool = False) -> Tuple[Dict, Dict, Optional[int]]:
+    """
+    Contract and signature details of one contract, and the block they describe
+
+    Live reads are one JSON-RPC batch pinned to the head block.
+    """
+    as_of_block = None if strict else mirror_block()
+    if as_of_block is not None:
+        row = MirroredContract.query.get(contract_id)
+        if row is not None:
+            signature = MirroredSignature.query.get(contract_id)
+            return row.to_details(), signature.to_details() if signature else dict(UNSIGNED), as_of_block
+
+    if strict:
+        client.reads.invalidate(contract_id)
+    batch = client.read_batch()
+    details, signature = batch.contract_details(contract_id).signature_details(contract_id).execute()
+    return details, signature, batch.block_number
@@ -39,6 +39,12 @@ contract StorageContract {
         address signer;
     }
     
+    struct Anchor {
+        uint256 leafCount;
+        uint256 timestamp;
+        address submitter;
+    }
+    
     // State variables
     mapping(string => File) public files;
     mapping(address => string[]) public userFiles;
@@ -47,6 +53,8 @@ contract StorageContract {
     mapping(uint256 => Signature) public signatures;
     mapping(address => uint256[]) public userContracts;
     
+    mapping(bytes32 => Anchor) public anchoredRoots;
+    
     // Events
     event FileStored(string cid, address owner, uint256 timestamp);
     event ContractStored(uint256 indexed contractId, string cid, address creator, address partyA, address partyB);
@@ -54,6 +62,7 @@ contract StorageContract {
     event SignatureRequested(uint256 indexed contractId, address requestedBy, address requestedFrom);
     event ContractSigned(uint256 indexed contractId, string originalCid, string signedCid, address signer);
     event ContractCancelled(uint256 indexed contractId, address cancelledBy, uint256 timestamp);
+    event RootAnchored(bytes32 indexed root, uint256 leafCount, address submitter, uint256 timestamp);
     
     // Modifiers
     modifier validCid(string memory cid) {
@@ -103,6 +112,21 @@ contract StorageContract {
         return userFiles[user];
     }
     
+    // Batched anchoring: one Merkle root commits to many CIDs and contract hashes
+    function anchorRoot(bytes32 root, uint256 leafCount) public {
+        require(root != bytes32(0), "Invalid root");
+        require(leafCount > 0, "Empty batch");
+        require(anchoredRoots[root].timestamp == 0, "Root already anchored");
+        
+        anchoredRoots[root] = Anchor({
+            leafCount: leafCount,
+            timestamp: block.timestamp,
+            submitter: msg.sender
+        });
+        
+        emit RootAnchored(root, leafCount, msg.sender, block.timestamp);
+    }
+    
     // Contract management functions
     function storeContract(
         uint256 contractId, 
@@ -114,6 +138,43 @@ contract StorageContract {
         validCid(cid) 
     {
         require(contracts[contractId].timestamp == 0, "Contract already registered");
+        _storeContract(contractId, cid, partyA, partyB);
+    }
+
+    // Bulk registration: ids that are already registered are skipped, so a
+    // partially applied batch can be resent; any other invalid item reverts
+    function storeContracts(
+        uint256[] memory contractIds,
+        string[] memory cids,
+        address[] memory partyAs,
+        address[] memory partyBs
+    )
+        public
+    {
+        require(
+            cids.length == contractIds.length &&
+            partyAs.length == contractIds.length &&
+            partyBs.length == contractIds.length,
+            "Array length mismatch"
+        );
+        
+        for (uint256 i = 0; i < contractIds.length; i++) {
+            if (contracts[contractIds[i]].timestamp != 0) {
+                continue;
+            }
+            require(bytes(cids[i]).length > 0, "Invalid CID");
+            _storeContract(contractIds[i], cids[i], partyAs[i], partyBs[i]);
+        }
+    }
+
+    function _storeContract(
+        uint256 contractId,
+        string memory cid,
+        address partyA,
+        address partyB
+    )
+        internal
+    {
         require(partyA != address(0) && partyB != address(0), "Invalid party addresses");
         
         contracts[contractId] = Contract({
@@ -306,6 +367,24 @@ contract StorageContract {
         );
     }
     
+    // `data` is the raw leaf, hashed here with the 0x00 leaf prefix (as in
+    // merkle.py), so an inner node cannot be passed off as a leaf
+    function verifyInclusion(bytes memory data, bytes32[] memory proof, bytes32 root)
+        public
+        view
+        returns (bool valid, uint256 timestamp)
+    {
+        bytes32 computed = keccak256(abi.encodePacked(bytes1(0x00), data));
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(bytes1(0x01), computed, sibling))
+                : keccak256(abi.encodePacked(bytes1(0x01), sibling, computed));
+        }
+        Anchor memory a = anchoredRoots[root];
+        return (computed == root && a.timestamp > 0, a.timestamp);
+    }
+    
     function verifySignature(
         uint256 contractId,
         string memory originalCid,
@@ -0,0 +1,239 @@
+import logging
+import threading
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.blockchain import chain_mirror
+from app.blockchain.web3_client import get_web3_client
+from app.models.chain_event import ChainEvent, IndexerCheckpoint
+
+logger = logging.getLogger(__name__)
+
+class EventIndexer:
+    """
+    Copies contract events from the chain into the chain_events table
+
+    Each pass scans the next block range after the checkpoint with a single
+    eth_getLogs call, fetches the headers of the blocks that have events in
+    one JSON-RPC batch, and commits the events together with the new checkpoint. The
+    hashes of recently indexed blocks are kept on the checkpoint; when the
+    last one is no longer canonical, events above the newest block that
+    still matches are deleted and the range is scanned again.
+
+    The same transaction updates the mirror of the contract's mappings
+    (see chain_mirror) for every contract id and file CID in the range.
+    """
+
+    def __init__(self, name: str = 'contract_events', start_block: int = 0, block_range: int = 2000,
+                 reorg_depth: int = 12, interval: float = 2.0):
+        """
+        Args:
+            name: Checkpoint name
+            start_block: First block to index (the contract's deployment block)
+            block_range: Maximum blocks scanned per pass
+            reorg_depth: Recent block hashes kept for reorg detection
+            interval: Seconds between passes once caught up
+        """
+        self.name = name
+        self.start_block = start_block
+        self.block_range = block_range
+        self.reorg_depth = reorg_depth
+        self.interval = interval
+        self.lag = 0  # Blocks left to index after the last pass
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'EventIndexer':
+        return cls(
+            start_block=config.get('INDEXER_START_BLOCK', 0),
+            block_range=config.get('INDEXER_BLOCK_RANGE', 2000),
+            reorg_depth=config.get('INDEXER_REORG_DEPTH', 12),
+            interval=config.get('INDEXER_POLL_INTERVAL', 2.0)
+        )
+
+    def checkpoint(self) -> IndexerCheckpoint:
+        checkpoint = IndexerCheckpoint.query.filter_by(name=self.name).first()
+        if checkpoint is None:
+            checkpoint = IndexerCheckpoint(name=self.name, block_number=self.start_block - 1, block_hashes={})
+            db.session.add(checkpoint)
+        return checkpoint
+
+    def _fork_point(self, client, checkpoint: IndexerCheckpoint) -> Optional[int]:
+        """
+        Newest recorded block that is still canonical, or None if there was no reorg
+        """
+        hashes = checkpoint.block_hashes or {}
+        if not hashes:
+            return None
+        numbers = sorted((int(number) for number in hashes), reverse=True)
+        newest = client.get_blocks([numbers[0]])[numbers[0]]
+        if newest is not None and newest['hash'] == hashes[str(numbers[0])]:
+            return None
+
+        # Look up the older recorded blocks in one batch
+        blocks = client.get_blocks(numbers[1:])
+        for number in numbers[1:]:
+            if blocks[number] is not None and blocks[number]['hash'] == hashes[str(number)]:
+                return number
+        logger.error(f"Reorg deeper than {self.reorg_depth} blocks; reindexing from block {numbers[-1]}")
+        return numbers[-1] - 1
+
+    def rewind(self, checkpoint: IndexerCheckpoint, block_number: int) -> int:
+        """Drop events above block_number and move the checkpoint back to it"""
+        removed = ChainEvent.query.filter(ChainEvent.block_number > block_number) \
+            .delete(synchronize_session=False)
+        checkpoint.block_number = block_number
+        checkpoint.block_hashes = {
+            number: block_hash for number, block_hash in (checkpoint.block_hashes or {}).items()
+            if int(number) <= block_number
+        }
+        logger.warning(f"Chain reorg: rewound {self.name} to block {block_number}, removed {removed} events")
+        return removed
+
+    def run_once(self, client=None) -> int:
+        """
+        Index the next block range
+
+        Returns:
+            int: Number of events stored by this pass
+        """
+        client = client or get_web3_client()
+        checkpoint = self.checkpoint()
+
+        fork_point = self._fork_point(client, checkpoint)
+        if fork_point is not None:
+            self.rewind(checkpoint, fork_point)
+            chain_mirror.rewind(client, fork_point)
+            client.reads.clear()
+
+        head = client.w3.eth.block_number
+        from_block = checkpoint.block_number + 1
+        if from_block > head:
+            db.session.commit()
+            self.lag = 0
+            return 0
+        to_block = min(head, from_block + self.block_range - 1)
+        self.lag = head - to_block
+
+        logs = client.get_contract_logs(from_block, to_block)
+        file_logs = client.get_file_logs(from_block, to_block)
+        blocks = client.get_blocks([log['block_number'] for log in logs + file_logs] + [to_block])
+        for log in file_logs:
+            header = blocks[log['block_number']]
+            if header is None or header['hash'] != log['block_hash']:
+                db.session.rollback()
+                return 0
+        for log in logs:
+            header = blocks[log['block_number']]
+            if header is None or header['hash'] != log['block_hash']:
+                # The range was reorganized while scanning it; retry next pass
+                db.session.rollback()
+                return 0
+            db.session.add(ChainEvent(
+                event_type=log['type'],
+                contract_id=log['contract_id'],
+                block_number=log['block_number'],
+                block_hash=log['block_hash'],
+                block_timestamp=header['timestamp'],
+                tx_hash=log['tx_hash'],
+                log_index=log['log_index'],
+                fields=log['fields']
+            ))
+
+        chain_mirror.refresh(
+            client, [log['contract_id'] for log in logs], [log['cid'] for log in file_logs], to_block
+        )
+
+        hashes = dict(checkpoint.block_hashes or {})
+        hashes.update({str(number): header['hash'] for number, header in blocks.items() if header})
+        checkpoint.block_hashes = {
+            number: block_hash for number, block_hash in hashes.items()
+            if int(number) > to_block - self.reorg_depth
+        }
+        checkpoint.block_number = to_block
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another indexer stored this range first
+            db.session.rollback()
+            return 0
+
+        for log in logs:
+            client.reads.invalidate(log['contract_id'], log['block_number'])
+        return len(logs)
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Event indexer pass failed: {str(e)}")
+                    db.session.rollback()
+                    self.lag = 0
+                finally:
+                    db.session.remove()
+                # Keep scanning without pause while catching up
+                if not self.lag:
+                    self.wait()
+
+    def notify(self) -> None:
+        """Run the next pass now (a new block or log arrived)"""
+        self._wake.set()
+
+    def wait(self) -> None:
+        """Sleep until the poll interval elapses or notify() is called"""
+        self._wake.wait(self.interval)
+        self._wake.clear()
+
+    def start(self, app) -> None:
+        """Start the background thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, args=(app,), name='event-indexer', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+_indexer: Optional[EventIndexer] = None
+_indexer_lock = threading.Lock()
+
+def get_event_indexer() -> EventIndexer:
+    """Get the process-wide event indexer"""
+    global _indexer
+    if _indexer is None:
+        with _indexer_lock:
+            if _indexer is None:
+                _indexer = EventIndexer.from_config(current_app.config)
+    return _indexer
+
+def index_in_background() -> None:
+    """
+    Start the in-process indexer unless a separate worker runs it
+
+    With GANACHE_WS_URL set, live subscriptions are started as well; they
+    keep this process's read cache current even when the indexer runs
+    elsewhere.
+    """
+    from app.blockchain.subscriptions import get_chain_subscriber
+
+    indexer = None
+    if current_app.config.get('INDEXER_IN_PROCESS', True):
+        indexer = get_event_indexer()
+        indexer.start(current_app._get_current_object())
+    subscriber = get_chain_subscriber(indexer)
+    if subscriber is not None:
+        subscriber.start()
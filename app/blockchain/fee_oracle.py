@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def argument_shape(args) -> Tuple:
+    """
+    Gas-relevant shape of call arguments
+
+    Calldata cost depends on argument types, the 32-byte word count of
+    dynamic values and zero vs non-zero integers, not on the exact values.
+    """
+    shape = []
+    for arg in args:
+        if isinstance(arg, bool):
+            shape.append(('bool',))
+        elif isinstance(arg, int):
+            shape.append(('int', arg == 0))
+        elif isinstance(arg, (str, bytes)):
+            shape.append((type(arg).__name__, (len(arg) + 31) // 32))
+        elif isinstance(arg, (list, tuple)):
+            shape.append(('list', argument_shape(arg)))
+        else:
+            shape.append((type(arg).__name__,))
+    return tuple(shape)
+
+class FeeOracle:
+    """
+    Cached gas price, recent base fees and memoized gas estimates
+
+    A background thread, started on first use, samples eth_gasPrice and
+    eth_feeHistory every `refresh_interval` seconds. Readers get the last
+    sample as long as it is younger than `max_age`; an older sample is
+    refreshed inline, and if the node cannot be reached the configured
+    fallback price is used.
+    Gas estimates are memoized per (function, argument shape), so repeated
+    estimates for the same kind of call need no RPC.
+    """
+
+    def __init__(self, w3, refresh_interval: float = 5.0, max_age: float = 30.0, history_blocks: int = 20,
+                 fallback_gas_price: int = 20000000000, max_estimates: int = 1024, background: bool = True):
+        self.w3 = w3
+        self.background = background
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.history_blocks = history_blocks
+        self.fallback_gas_price = fallback_gas_price
+        self.max_estimates = max_estimates
+        self._sample: Optional[Dict] = None
+        self._sampled_at = 0.0
+        self._estimates: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, w3, config) -> 'FeeOracle':
+        return cls(
+            w3,
+            refresh_interval=config.get('FEE_ORACLE_INTERVAL', 5.0),
+            max_age=config.get('FEE_ORACLE_MAX_AGE', 30.0),
+            history_blocks=config.get('FEE_HISTORY_BLOCKS', 20),
+            fallback_gas_price=config.get('GAS_PRICE', 20000000000),
+            background=config.get('FEE_ORACLE_BACKGROUND', True)
+        )
+
+    def refresh(self) -> Dict:
+        """Sample the node's fee data now"""
+        sample = {'gas_price': self.w3.eth.gas_price, 'base_fee': None, 'priority_fee': None}
+        try:
+            history = self.w3.eth.fee_history(self.history_blocks, 'latest', [50])
+            base_fees = history['baseFeePerGas']
+            rewards = [reward[0] for reward in history.get('reward') or [] if reward]
+            sample['base_fee'] = base_fees[-1] if base_fees else None
+            sample['priority_fee'] = sorted(rewards)[len(rewards) // 2] if rewards else None
+        except Exception as e:
+            # Pre-London nodes have no fee history; the gas price alone is enough
+            logger.debug(f"Fee history unavailable: {str(e)}")
+        with self._lock:
+            self._sample = sample
+            self._sampled_at = time.monotonic()
+        return sample
+
+    def fees(self) -> Dict:
+        """Last fee sample with its age, refreshed inline if older than max_age"""
+        if self.background:
+            self.start()
+        age = time.monotonic() - self._sampled_at
+        sample = self._sample
+        if sample is None or age > self.max_age:
+            try:
+                sample = self.refresh()
+                age = 0.0
+            except Exception as e:
+                logger.warning(f"Gas price refresh failed, using fallback: {str(e)}")
+                if sample is None:
+                    return {'gas_price': self.fallback_gas_price, 'base_fee': None,
+                            'priority_fee': None, 'age': None, 'source': 'fallback'}
+        return dict(sample, age=round(age, 3), source='node')
+
+    def gas_price(self) -> int:
+        return self.fees()['gas_price']
+
+    def estimate_gas(self, function, fn_name: str, args, sender: str, default: Optional[int] = None) -> int:
+        """
+        Memoized estimate_gas for a contract function call
+
+        A call that reverts (for example because the contract id is already
+        registered) falls back to `default`.
+        """
+        key = (fn_name, argument_shape(args))
+        with self._lock:
+            if key in self._estimates:
+                self._estimates.move_to_end(key)
+                return self._estimates[key]
+        try:
+            gas = function.estimate_gas({'from': sender})
+        except Exception as e:
+            if default is None:
+                raise
+            logger.debug(f"Gas estimate for {fn_name} failed, using default: {str(e)}")
+            return default
+        with self._lock:
+            self._estimates[key] = gas
+            while len(self._estimates) > self.max_estimates:
+                self._estimates.popitem(last=False)
+        return gas
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Fee sampling failed: {str(e)}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start background sampling if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='fee-oracle', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval + 1)
@@ -0,0 +1,56 @@
+from typing import List, Sequence
+
+from eth_utils import keccak
+
+# Domain separation between leaves and inner nodes (RFC 6962 style).
+# verify_proof and StorageContract.verifyInclusion hash the raw leaf data
+# themselves, so an inner node can never be passed off as a leaf.
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def leaf_hash(data: bytes) -> bytes:
+    return keccak(LEAF_PREFIX + data)
+
+def node_hash(a: bytes, b: bytes) -> bytes:
+    """Hash two children in sorted order, so proofs need no left/right flags"""
+    return keccak(NODE_PREFIX + min(a, b) + max(a, b))
+
+class MerkleTree:
+    """
+    Binary keccak256 Merkle tree over pre-hashed leaves
+
+    Pairs are hashed in sorted order and an odd node is promoted to the
+    next level unchanged. This matches StorageContract.verifyInclusion.
+    """
+
+    def __init__(self, leaves: Sequence[bytes]):
+        if not leaves:
+            raise ValueError("Merkle tree needs at least one leaf")
+        self.levels: List[List[bytes]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[bytes]:
+        """Sibling hashes from the leaf at `index` up to the root"""
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            index //= 2
+        return proof
+
+def verify_proof(data: bytes, proof: Sequence[bytes], root: bytes) -> bool:
+    """Check that raw leaf `data` is in the tree with `root`, given its proof"""
+    computed = leaf_hash(data)
+    for sibling in proof:
+        computed = node_hash(computed, sibling)
+    return computed == root
@@ -0,0 +1,166 @@
+import logging
+import threading
+from typing import Dict, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Increment the stored next nonce, or return nil if it has not been initialized
+_ALLOCATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCR', KEYS[1]) - 1
+end
+return false
+"""
+
+# Give a nonce back (ARGV[1]) if no later one has been allocated since
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == tostring(tonumber(ARGV[1]) + 1) then
+    redis.call('SET', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Realign with the chain's pending count (ARGV[1]) after a nonce error on
+# ARGV[2]: forward always, backward only if ARGV[2] was the last allocation
+_RESYNC_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+local chain = tonumber(ARGV[1])
+if current == nil or chain > current or current == tonumber(ARGV[2]) + 1 then
+    redis.call('SET', KEYS[1], chain)
+    return chain
+end
+return current
+"""
+
+# Substrings of node errors that mean our nonce is out of step with the chain
+NONCE_ERROR_MARKERS = (
+    'nonce too low',
+    'nonce too high',
+    "doesn't have the correct nonce",
+    'incorrect nonce',
+    'already known',
+    'replacement transaction underpriced'
+)
+
+def is_nonce_error(error: Exception) -> bool:
+    """Check whether a send failure was caused by a stale or reused nonce"""
+    detail = error.args[0] if error.args else ''
+    if isinstance(detail, dict):
+        detail = detail.get('message', '')
+    message = str(detail).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+class NonceManager:
+    """
+    Allocates transaction nonces locally for each sender account
+
+    With Redis, the next nonce per (chain, account) is a single counter
+    advanced with INCR, so every worker process draws from one sequence
+    without asking the node. Without Redis the counter is kept in process
+    behind a lock. Counters start from the account's pending transaction
+    count on chain.
+
+    A counter never moves backwards past nonces other senders may still be
+    broadcasting: an unused nonce is only given back (release) or the
+    counter realigned downwards (resync) when it is still the latest
+    allocation, checked atomically.
+    """
+
+    def __init__(self, w3, chain_id: int, redis_client=None, namespace: str = 'nonce'):
+        self.w3 = w3
+        self.chain_id = chain_id
+        self.redis = redis_client
+        self.namespace = namespace
+        self._allocate = redis_client.register_script(_ALLOCATE_SCRIPT) if redis_client is not None else None
+        self._release = redis_client.register_script(_RELEASE_SCRIPT) if redis_client is not None else None
+        self._resync = redis_client.register_script(_RESYNC_SCRIPT) if redis_client is not None else None
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, account: str) -> str:
+        return f"{self.namespace}:{self.chain_id}:{account.lower()}"
+
+    def _chain_nonce(self, account: str) -> int:
+        return self.w3.eth.get_transaction_count(account, 'pending')
+
+    def allocate(self, account: str) -> int:
+        """Get the next unused nonce for an account"""
+        if self.redis is None:
+            with self._lock:
+                if account not in self._local:
+                    self._local[account] = self._chain_nonce(account)
+                nonce = self._local[account]
+                self._local[account] = nonce + 1
+                return nonce
+
+        key = self._key(account)
+        try:
+            nonce = self._allocate(keys=[key])
+            if nonce is None:
+                # First use: seed from chain unless another worker just did
+                self.redis.set(key, self._chain_nonce(account), nx=True)
+                nonce = self._allocate(keys=[key])
+            return int(nonce)
+        except redis.RedisError as e:
+            logger.warning(f"Nonce counter unavailable, using chain nonce: {str(e)}")
+            return self._chain_nonce(account)
+
+    def release(self, account: str, nonce: int) -> bool:
+        """
+        Give back a nonce whose transaction was never sent
+
+        Only done if no later nonce has been allocated since; otherwise the
+        gap stays and a later nonce error realigns the counter.
+
+        Returns:
+            bool: True if the counter was moved back to `nonce`
+        """
+        if self.redis is None:
+            with self._lock:
+                if self._local.get(account) == nonce + 1:
+                    self._local[account] = nonce
+                    return True
+                return False
+        try:
+            return bool(self._release(keys=[self._key(account)], args=[nonce]))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release nonce: {str(e)}")
+            return False
+
+    def resync(self, account: str, allocated: int) -> int:
+        """
+        Realign an account's counter with its pending transaction count on chain
+
+        Called after a nonce error on the `allocated` nonce. The counter
+        moves forward whenever the chain is ahead, but backwards only if
+        `allocated` is still the latest allocation, so nonces held by
+        other senders are never handed out twice.
+
+        Returns:
+            int: The counter's value afterwards
+        """
+        chain_nonce = self._chain_nonce(account)
+        if self.redis is None:
+            with self._lock:
+                current = self._local.get(account)
+                if current is None or chain_nonce > current or current == allocated + 1:
+                    self._local[account] = chain_nonce
+                nonce = self._local[account]
+        else:
+            try:
+                nonce = int(self._resync(keys=[self._key(account)], args=[chain_nonce, allocated]))
+            except redis.RedisError as e:
+                logger.warning(f"Failed to resync nonce counter: {str(e)}")
+                return chain_nonce
+        logger.info(f"Resynced nonce for {account} to {nonce} (chain pending count {chain_nonce})")
+        return nonce
+
+    def peek(self, account: str) -> Optional[int]:
+        """Next nonce that would be allocated, if the counter is initialized"""
+        if self.redis is None:
+            return self._local.get(account)
+        value = self.redis.get(self._key(account))
+        return int(value) if value is not None else None
@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+class ChainReadCache:
+    """
+    In-process cache of decoded contract reads, keyed by contract id
+
+    On-chain state of a contract only changes through transactions that
+    touch its id, so entries live until the event indexer or one of our own
+    confirmed writes invalidates that id, or `ttl` seconds pass (the bound
+    for changes made outside this process). Entries remember the block they
+    were read at: an invalidation for block N keeps entries read at N or
+    later. A read that started before an invalidation is not stored.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_contracts: int = 10000):
+        self.ttl = ttl
+        self.max_contracts = max_contracts
+        # contract id -> {read key: (value, block number, expires at)}
+        self._entries: 'OrderedDict[int, Dict[Hashable, Tuple]]' = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0  # Bumped by clear()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, contract_id: int) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(contract_id, 0)
+
+    def get(self, contract_id: int, key: Hashable):
+        """Cached value (a copy), or None"""
+        with self._lock:
+            entry = self._entries.get(contract_id, {}).get(key)
+            if entry is None or entry[2] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(contract_id)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, contract_id: int, key: Hashable, value, block_number: Optional[int] = None,
+            generation: Optional[Tuple[int, int]] = None) -> None:
+        """Store a read, unless the contract was invalidated since `generation`"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(contract_id, 0)):
+                return
+            reads = self._entries.setdefault(contract_id, {})
+            reads[key] = (copy.deepcopy(value), block_number, time.monotonic() + self.ttl)
+            self._entries.move_to_end(contract_id)
+            while len(self._entries) > self.max_contracts:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, contract_id: int, key: Hashable, loader: Callable[[], object]):
+        value = self.get(contract_id, key)
+        if value is not None:
+            return value
+        generation = self.generation(contract_id)
+        value = loader()
+        self.put(contract_id, key, value, generation=generation)
+        return value
+
+    def invalidate(self, contract_id: int, block_number: Optional[int] = None) -> None:
+        """Drop a contract's reads taken before `block_number` (all of them if None)"""
+        with self._lock:
+            self._generations[contract_id] = self._generations.get(contract_id, 0) + 1
+            reads = self._entries.get(contract_id)
+            if not reads:
+                return
+            if block_number is None:
+                del self._entries[contract_id]
+                return
+            for key in [key for key, entry in reads.items() if entry[1] is None or entry[1] < block_number]:
+                del reads[key]
+
+    def clear(self) -> None:
+        """Drop everything, e.g. after a chain reorg"""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
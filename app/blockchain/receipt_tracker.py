@@ -0,0 +1,238 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from flask import current_app
+
+from app import db
+from app.blockchain.web3_client import get_web3_client
+from app.models.contract import Contract
+from app.models.pending_transaction import PendingTransaction
+from app.models.upload import Upload
+from app.models.anchor import AnchorBatch
+from app.services.anchor_service import mark_batch
+
+logger = logging.getLogger(__name__)
+
+class ReceiptTracker:
+    """
+    Follows transactions from broadcast to finality in the background
+
+    A transaction is `pending` until its receipt is seen, then `included`
+    with the number and hash of its block, and `final` once it is
+    `depth` blocks deep (counting its own block). The receipts of pending
+    transactions are fetched in one JSON-RPC batch. Included transactions are
+    re-checked each pass: the hashes of their blocks are fetched in one
+    JSON-RPC batch, and a transaction whose block was reorganized away goes
+    back to `pending` until its receipt reappears. A reverted transaction,
+    or one still unmined `timeout` seconds after its broadcast (or after
+    the reorg that dropped it), is `failed`.
+
+    Rows change status with a conditional update, so several trackers (one
+    per worker process, or a dedicated `flask track_receipts` process)
+    never apply a change twice. Callbacks run after commit with the
+    PendingTransaction whose status changed.
+    """
+
+    def __init__(self, batch_size: int = 100, interval: float = 2.0, timeout: float = 600.0, depth: int = 12):
+        """
+        Args:
+            batch_size: Pending rows, and included rows, checked per pass
+            interval: Seconds between passes when idle
+            timeout: Seconds after which an unmined transaction is marked failed
+            depth: Confirmations after which an included transaction is final
+        """
+        self.batch_size = batch_size
+        self.interval = interval
+        self.timeout = timeout
+        self.depth = max(1, depth)
+        self._callbacks: List[Callable[[PendingTransaction], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ReceiptTracker':
+        return cls(
+            batch_size=config.get('BLOCKCHAIN_TRACKER_BATCH_SIZE', 100),
+            interval=config.get('BLOCKCHAIN_TRACKER_INTERVAL', 2.0),
+            timeout=config.get('BLOCKCHAIN_TX_TIMEOUT', 600),
+            depth=config.get('CONFIRMATION_DEPTH', 12)
+        )
+
+    def add_callback(self, callback: Callable[[PendingTransaction], None]) -> None:
+        """Call `callback(pending_tx)` whenever a transaction changes status"""
+        self._callbacks.append(callback)
+
+    def _check(self, tx: PendingTransaction, receipt: Optional[Dict], now: datetime):
+        """Get (status, values) for a pending transaction from its receipt, or None if still pending"""
+        if receipt is None:
+            # Counted from the latest broadcast, or from the reorg that dropped it
+            started = tx.broadcast_at or tx.created_at
+            if started and (now - started).total_seconds() > self.timeout:
+                return 'failed', {'error': 'Transaction was not mined before the timeout', 'resolved_at': now}
+            return None
+
+        values = {
+            'block_number': receipt['block_number'],
+            'block_hash': receipt['block_hash'],
+            'gas_used': receipt['gas_used'],
+            'confirmations': 1
+        }
+        if receipt['status'] == 1:
+            return 'included', values
+        values.update(error='Transaction reverted', resolved_at=now)
+        return 'failed', values
+
+    def _check_depth(self, client, included: List[PendingTransaction], now: datetime):
+        """
+        Get (tx, status, values) for included transactions
+
+        Their block hashes are compared with the canonical chain in one batch.
+        """
+        head = client.w3.eth.block_number
+        blocks = client.get_blocks(tx.block_number for tx in included)
+        for tx in included:
+            block = blocks.get(tx.block_number)
+            if block is None or block['hash'] != tx.block_hash:
+                logger.warning(f"Transaction {tx.tx_hash} was reorganized out of block {tx.block_number}")
+                yield tx, 'pending', {'block_number': None, 'block_hash': None, 'gas_used': None,
+                                      'confirmations': 0, 'broadcast_at': now}
+                continue
+            confirmations = head - tx.block_number + 1
+            if confirmations >= self.depth:
+                yield tx, 'final', {'confirmations': confirmations, 'resolved_at': now}
+            else:
+                yield tx, 'included', {'confirmations': confirmations}
+
+    def _apply(self, tx: PendingTransaction, status: str) -> None:
+        """Propagate a status change to the contract, upload or anchor batch the transaction belongs to"""
+        if tx.entity_type == 'contract' and tx.entity_key:
+            contract = Contract.query.get(int(tx.entity_key))
+            if contract:
+                # blockchain_status describes the latest transaction only
+                if contract.blockchain_latest_tx in (None, tx.tx_hash):
+                    contract.blockchain_status = status
+                if tx.method == 'register_contract' and status != 'failed':
+                    contract.blockchain_tx = tx.tx_hash
+        elif tx.method == 'register_contracts':
+            # A storeContracts batch: the contracts it was sent for point at it
+            for contract in Contract.query.filter_by(blockchain_latest_tx=tx.tx_hash):
+                contract.blockchain_status = status
+                if status != 'failed' and not contract.blockchain_tx:
+                    contract.blockchain_tx = tx.tx_hash
+        elif tx.entity_type == 'upload' and tx.entity_key:
+            upload = Upload.query.filter_by(cid=tx.entity_key).first()
+            if upload:
+                upload.update_blockchain_status(tx.tx_hash, status)
+        elif tx.entity_type == 'anchor_batch' and tx.entity_key:
+            batch = AnchorBatch.query.get(int(tx.entity_key))
+            if batch:
+                if status == 'failed':
+                    mark_batch(batch, 'failed', tx.tx_hash)
+                elif status == 'pending':
+                    mark_batch(batch, 'pending')
+                else:
+                    mark_batch(batch, 'anchored', tx.tx_hash, upload_status=status)
+
+    def run_once(self, client=None) -> int:
+        """
+        Check one batch of pending and one batch of included transactions
+
+        Returns:
+            int: Number of transactions whose status changed in this pass
+        """
+        pending = PendingTransaction.query.filter_by(status='pending') \
+            .order_by(PendingTransaction.id) \
+            .limit(self.batch_size) \
+            .all()
+        included = PendingTransaction.query.filter_by(status='included') \
+            .order_by(PendingTransaction.id) \
+            .limit(self.batch_size) \
+            .all()
+        if not pending and not included:
+            return 0
+
+        client = client or get_web3_client()
+        now = datetime.utcnow()
+        changes = []
+        if pending:
+            try:
+                receipts = client.get_receipts(tx.tx_hash for tx in pending)
+            except Exception as e:
+                logger.warning(f"Receipt lookup failed: {str(e)}")
+                receipts = None
+            for tx in pending if receipts is not None else []:
+                result = self._check(tx, receipts.get(tx.tx_hash), now)
+                if result is not None:
+                    changes.append((tx, 'pending') + result)
+        if included:
+            try:
+                changes.extend((tx, 'included', status, values)
+                               for tx, status, values in self._check_depth(client, included, now))
+            except Exception as e:
+                logger.warning(f"Block hash check failed: {str(e)}")
+
+        changed = []
+        for tx, previous, status, values in changes:
+            updated = PendingTransaction.query \
+                .filter_by(id=tx.id, status=previous) \
+                .update(dict(values, status=status), synchronize_session=False)
+            if updated and status != previous:
+                self._apply(tx, status)
+                changed.append(tx)
+
+        db.session.commit()
+
+        for tx in changed:
+            if tx.entity_type == 'contract' and tx.entity_key and tx.status in ('included', 'pending'):
+                client.reads.invalidate(int(tx.entity_key))
+            for callback in self._callbacks:
+                try:
+                    callback(tx)
+                except Exception as e:
+                    logger.error(f"Receipt callback failed for {tx.tx_hash}: {str(e)}")
+        return len(changed)
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    resolved = self.run_once()
+                except Exception as e:
+                    logger.error(f"Receipt tracker pass failed: {str(e)}")
+                    db.session.rollback()
+                    resolved = 0
+                finally:
+                    db.session.remove()
+                # A full batch means more rows are waiting
+                if resolved < self.batch_size:
+                    self._stop.wait(self.interval)
+
+    def start(self, app) -> None:
+        """Start the background thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, args=(app,), name='receipt-tracker', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+_tracker: Optional[ReceiptTracker] = None
+_tracker_lock = threading.Lock()
+
+def get_receipt_tracker() -> ReceiptTracker:
+    """Get the process-wide receipt tracker"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ReceiptTracker.from_config(current_app.config)
+    return _tracker
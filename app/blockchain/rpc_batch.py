@@ -0,0 +1,153 @@
+from typing import Callable, Hashable, List, Optional, Tuple
+
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+
+from app.blockchain.web3_client import contract_details, contract_verification, file_record, signature_details
+from app.utils.error_handlers import BlockchainError
+
+class ReadBatch:
+    """
+    Contract reads and block lookups sent to the node as one JSON-RPC batch
+
+    Reads are queued with the chainable methods and sent by execute(),
+    which returns their decoded results in the order they were added.
+    Every eth_call is pinned to the same block number (the current head
+    unless one is given), so the results describe a single chain state.
+    Providers that cannot send batches get the same requests one by one.
+    Contract reads already in the client's read cache are not sent.
+
+    Example:
+        details, signature = client.read_batch() \\
+            .contract_details(contract_id) \\
+            .signature_details(contract_id) \\
+            .execute()
+    """
+
+    def __init__(self, client, block_number: Optional[int] = None):
+        self.client = client
+        self.block_number = block_number
+        self._requests = []  # (method, params, decode, cache key); method None for a cached result
+
+    def call(self, fn_name: str, args, decode: Callable,
+             cache_key: Optional[Tuple[int, Hashable]] = None) -> 'ReadBatch':
+        """
+        Queue a contract call; `decode` receives the decoded output values
+
+        With cache_key (contract id, read key) the result is served from and
+        stored in the client's read cache.
+        """
+        if cache_key is not None:
+            cached = self.client.reads.get(*cache_key)
+            if cached is not None:
+                self._requests.append((None, cached, None, None))
+                return self
+            cache_key = (cache_key, self.client.reads.generation(cache_key[0]))
+        contract = self.client.contract
+        function = contract.get_function_by_name(fn_name)
+        output_types = [collapse_if_tuple(output) for output in function.abi['outputs']]
+        codec = self.client.w3.codec
+
+        def decode_result(raw):
+            return decode(list(codec.decode(output_types, HexBytes(raw))))
+
+        self._requests.append((
+            'eth_call',
+            {'to': contract.address, 'data': contract.encodeABI(fn_name=fn_name, args=list(args))},
+            decode_result,
+            cache_key
+        ))
+        return self
+
+    def contract_details(self, contract_id: int) -> 'ReadBatch':
+        return self.call('getContract', [contract_id], contract_details, (contract_id, 'details'))
+
+    def signature_details(self, contract_id: int) -> 'ReadBatch':
+        return self.call('getSignature', [contract_id], signature_details, (contract_id, 'signature'))
+
+    def verify_contract(self, contract_id: int, cid: str) -> 'ReadBatch':
+        return self.call('verifyContract', [contract_id, cid], contract_verification, (contract_id, ('verify', cid)))
+
+    def contract_row(self, contract_id: int) -> 'ReadBatch':
+        """
+        Queue a read of the `contracts` mapping, which (unlike getContract)
+        does not revert for unknown ids; never cached
+        """
+        return self.call('contracts', [contract_id], contract_details)
+
+    def signature_row(self, contract_id: int) -> 'ReadBatch':
+        return self.call('signatures', [contract_id], signature_details)
+
+    def file_row(self, cid: str) -> 'ReadBatch':
+        return self.call('files', [cid], file_record)
+
+    def get_block(self, number: int) -> 'ReadBatch':
+        """Queue a block header lookup (number, hash, parent_hash, timestamp)"""
+        to_int = self.client.w3.to_int
+
+        def decode_block(block):
+            if block is None:
+                return None
+            return {
+                'number': to_int(hexstr=block['number']),
+                'hash': block['hash'],
+                'parent_hash': block['parentHash'],
+                'timestamp': to_int(hexstr=block['timestamp'])
+            }
+
+        self._requests.append(('eth_getBlockByNumber', [hex(number), False], decode_block, None))
+        return self
+
+    def get_receipt(self, tx_hash: str) -> 'ReadBatch':
+        """Queue a receipt lookup (status, block_number, block_hash, gas_used); None until mined"""
+        to_int = self.client.w3.to_int
+
+        def decode_receipt(receipt):
+            if receipt is None:
+                return None
+            return {
+                'status': to_int(hexstr=receipt['status']),
+                'block_number': to_int(hexstr=receipt['blockNumber']),
+                'block_hash': receipt['blockHash'],
+                'gas_used': to_int(hexstr=receipt['gasUsed'])
+            }
+
+        self._requests.append(('eth_getTransactionReceipt', [tx_hash], decode_receipt, None))
+        return self
+
+    def execute(self) -> List:
+        """Send the queued requests and return their decoded results"""
+        requests = [request for request in self._requests if request[0] is not None]
+        calls = [method == 'eth_call' for method, _, _, _ in requests]
+        if any(calls) and self.block_number is None:
+            self.block_number = self.client.w3.eth.block_number
+
+        payload = [
+            (method, [params, hex(self.block_number)] if is_call else params)
+            for (method, params, _, _), is_call in zip(requests, calls)
+        ]
+        provider = self.client.w3.provider
+        if not payload:
+            responses = []
+        elif hasattr(provider, 'make_batch_request'):
+            responses = provider.make_batch_request(payload)
+        else:
+            responses = [provider.make_request(method, params) for method, params in payload]
+
+        responses = iter(responses)
+        results = []
+        for method, params, decode, cache_key in self._requests:
+            if method is None:
+                results.append(params)
+                continue
+            response = next(responses)
+            if response.get('error'):
+                error = response['error']
+                raise BlockchainError(f"Batched {method} failed", error.get('message', str(error)))
+            result = decode(response['result'])
+            if cache_key is not None:
+                (contract_id, key), generation = cache_key
+                self.client.reads.put(contract_id, key, result, self.block_number, generation)
+            results.append(result)
+        self._requests = []
+        return results
@@ -0,0 +1,55 @@
+import zlib
+from typing import Dict, List, Optional
+
+class SenderPool:
+    """
+    Accounts that write transactions are spread across
+
+    Every account has its own nonce sequence, so transactions from different
+    accounts do not wait on each other. Routing is stable: the same key
+    (a contract id, a CID) always maps to the same account, which keeps the
+    writes for one contract (register, request, sign, cancel) in nonce
+    order and sent by the account that is party to it on chain.
+    """
+
+    def __init__(self, accounts: List[str], private_keys: Optional[Dict[str, str]] = None):
+        if not accounts:
+            raise ValueError("Sender pool needs at least one account")
+        self.accounts = list(accounts)
+        self._private_keys = private_keys or {}
+
+    @classmethod
+    def from_config(cls, w3, config) -> 'SenderPool':
+        """
+        Accounts from BLOCKCHAIN_PRIVATE_KEY and BLOCKCHAIN_PRIVATE_KEYS, signed
+        locally, or else the node's first BLOCKCHAIN_SENDER_POOL_SIZE unlocked accounts
+        """
+        keys = []
+        for key in [config.get('BLOCKCHAIN_PRIVATE_KEY')] + list(config.get('BLOCKCHAIN_PRIVATE_KEYS') or []):
+            if key and key not in keys:
+                keys.append(key)
+        if keys:
+            private_keys = {w3.eth.account.from_key(key).address: key for key in keys}
+            return cls(list(private_keys), private_keys)
+        return cls(w3.eth.accounts[:max(1, config.get('BLOCKCHAIN_SENDER_POOL_SIZE', 1))])
+
+    @property
+    def default(self) -> str:
+        return self.accounts[0]
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def for_key(self, key) -> str:
+        """Account that sends every write for `key`"""
+        if key is None:
+            return self.default
+        if isinstance(key, int):
+            index = key % len(self.accounts)
+        else:
+            index = zlib.crc32(str(key).encode()) % len(self.accounts)
+        return self.accounts[index]
+
+    def private_key(self, account: str) -> Optional[str]:
+        """Key to sign with locally, or None if the node signs for this account"""
+        return self._private_keys.get(account)
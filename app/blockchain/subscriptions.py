@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, Optional
+
+import websockets
+from flask import current_app
+
+from app.blockchain.web3_client import get_web3_client
+
+logger = logging.getLogger(__name__)
+
+class ChainSubscriber:
+    """
+    Live newHeads and contract log subscriptions over a WebSocket (eth_subscribe)
+
+    A log invalidates the read cache for its contract id as soon as it
+    arrives, and every head or log wakes the event indexer, which stays the
+    only writer of chain_events. After each (re)connect the indexer is woken
+    to catch up from its checkpoint, so nothing emitted while disconnected
+    is lost; meanwhile it keeps polling over HTTP. Reconnects back off
+    exponentially up to `reconnect_max` seconds.
+    """
+
+    def __init__(self, url: str, client, indexer=None, reconnect_min: float = 1.0, reconnect_max: float = 30.0):
+        self.url = url
+        self.client = client
+        self.indexer = indexer
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.connected = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _log_filter(self) -> Dict:
+        return {
+            'address': self.client.contract.address,
+            'topics': [list(self.client.contract_event_topics)]
+        }
+
+    def _wake_indexer(self) -> None:
+        if self.indexer is not None:
+            self.indexer.notify()
+
+    def handle_message(self, message: Dict, subscriptions: Dict[str, str]) -> None:
+        """Apply one message from the node; `subscriptions` maps subscription id to kind"""
+        if 'id' in message:
+            if message.get('error'):
+                raise ConnectionError(f"eth_subscribe failed: {message['error']}")
+            subscriptions[message['result']] = 'heads' if message['id'] == 1 else 'logs'
+            return
+
+        params = message.get('params') or {}
+        kind = subscriptions.get(params.get('subscription'))
+        if kind == 'logs':
+            log = params['result']
+            if log.get('removed'):
+                # Reorged out: anything cached may describe the abandoned chain
+                self.client.reads.clear()
+            elif len(log.get('topics', [])) > 1:
+                self.client.reads.invalidate(int(log['topics'][1], 16), int(log['blockNumber'], 16))
+        if kind is not None:
+            self._wake_indexer()
+
+    async def _listen(self) -> None:
+        async with websockets.connect(self.url, ping_interval=20) as ws:
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_subscribe', 'params': ['newHeads']}))
+            await ws.send(json.dumps({
+                'jsonrpc': '2.0', 'id': 2, 'method': 'eth_subscribe', 'params': ['logs', self._log_filter()]
+            }))
+            subscriptions: Dict[str, str] = {}
+            self.connected.set()
+            logger.info(f"Subscribed to chain events at {self.url}")
+            # Catch up on anything emitted while disconnected
+            self._wake_indexer()
+            while not self._stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                self.handle_message(json.loads(raw), subscriptions)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        delay = self.reconnect_min
+        try:
+            while not self._stop.is_set():
+                try:
+                    loop.run_until_complete(self._listen())
+                except Exception as e:
+                    logger.warning(f"Chain subscription lost, polling over HTTP until it reconnects: {str(e)}")
+                if self.connected.is_set():
+                    delay = self.reconnect_min
+                self.connected.clear()
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.reconnect_max)
+        finally:
+            loop.close()
+
+    def start(self) -> None:
+        """Start the subscription thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='chain-subscriber', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+_subscriber: Optional[ChainSubscriber] = None
+_subscriber_lock = threading.Lock()
+
+def get_chain_subscriber(indexer=None) -> Optional[ChainSubscriber]:
+    """Get the process-wide subscriber, or None if GANACHE_WS_URL is not set"""
+    global _subscriber
+    url = current_app.config.get('GANACHE_WS_URL')
+    if not url:
+        return None
+    if _subscriber is None:
+        with _subscriber_lock:
+            if _subscriber is None:
+                _subscriber = ChainSubscriber(
+                    url, get_web3_client(), indexer,
+                    reconnect_max=current_app.config.get('WS_RECONNECT_MAX', 30.0)
+                )
+    return _subscriber
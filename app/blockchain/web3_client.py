@@ -2,10 +2,26 @@ from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from flask import current_app
 from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
+from datetime import datetime
 import json
 import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from eth_utils import event_abi_to_log_topic
 from enum import IntEnum
 from app.utils.error_handlers import BlockchainError
+from app.blockchain.nonce_manager import NonceManager, is_nonce_error
+from app.blockchain.read_cache import ChainReadCache
+from app.blockchain.fee_oracle import FeeOracle
+from app.blockchain.sender_pool import SenderPool
+from app import db
+from app.models.pending_transaction import PendingTransaction
+from app.models.anchor import AnchorProof
+from app.models.contract import Contract
+from app.blockchain.merkle import verify_proof
+from app.services.anchor_service import item_data
 
 class ContractStatus(IntEnum):
     """Mirror of smart contract's ContractStatus enum"""
@@ -14,32 +30,175 @@ class ContractStatus(IntEnum):
     Signed = 2
     Cancelled = 3
 
+# Gas limit sent with each write method
+GAS_LIMITS = {
+    'register_cid': 150000,
+    'register_contract': 150000,
+    'request_signature': 100000,
+    'sign_contract': 200000,
+    'cancel_contract': 100000,
+    'anchor_root': 100000
+}
+
+# Events indexed by contractId (their first topic), and the type they are reported as
+CONTRACT_EVENT_TYPES = {
+    'ContractStored': 'ContractStored',
+    'ContractStatusChanged': 'StatusChanged',
+    'SignatureRequested': 'SignatureRequested',
+    'ContractSigned': 'ContractSigned',
+    'ContractCancelled': 'ContractCancelled'
+}
+
+def contract_id_topic(contract_id: int) -> str:
+    return '0x' + contract_id.to_bytes(32, 'big').hex()
+
+def _event_fields(event_name: str, args) -> Dict:
+    """API fields of a decoded contract event"""
+    if event_name == 'ContractStored':
+        return {'cid': args['cid'], 'creator': args['creator']}
+    if event_name == 'ContractSigned':
+        return {
+            'original_cid': args['originalCid'],
+            'signed_cid': args['signedCid'],
+            'signer': args['signer']
+        }
+    if event_name == 'ContractStatusChanged':
+        return {'new_status': ContractStatus(args['newStatus']).name}
+    if event_name == 'SignatureRequested':
+        return {'requested_by': args['requestedBy'], 'requested_from': args['requestedFrom']}
+    if event_name == 'ContractCancelled':
+        return {'cancelled_by': args['cancelledBy']}
+    return {}
+
+@lru_cache(maxsize=4)
+def _load_contract_data(path: str) -> Dict:
+    """Parse a compiled contract artifact (ABI and bytecode) once per process"""
+    with open(path) as f:
+        return json.load(f)
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTP provider on a pooled keep-alive session that can also send JSON-RPC batches"""
+    
+    def __init__(self, endpoint_uri: str, session: requests.Session, timeout: float):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout}, session=session)
+        self.rpc_session = session
+        self.timeout = timeout
+    
+    def make_batch_request(self, calls: List[Tuple[str, list]]) -> List[Dict]:
+        """Send (method, params) pairs in one POST; responses come back in the same order"""
+        payload = [
+            {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i}
+            for i, (method, params) in enumerate(calls)
+        ]
+        response = self.rpc_session.post(self.endpoint_uri, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return sorted(response.json(), key=lambda item: item['id'])
+
+def _make_provider(url: str, pool_size: int, timeout: float) -> PooledHTTPProvider:
+    """HTTP provider backed by a pooled keep-alive session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return PooledHTTPProvider(url, session, timeout)
+
+def contract_details(data) -> Dict:
+    """Decode getContract output"""
+    return {
+        'id': data[0],
+        'cid': data[1],
+        'timestamp': data[2],
+        'status': ContractStatus(data[3]).name,
+        'creator': data[4],
+        'party_a': data[5],
+        'party_b': data[6],
+        'is_party_a_signed': data[7],
+        'is_party_b_signed': data[8]
+    }
+
+def signature_details(data) -> Dict:
+    """Decode getSignature output"""
+    return {
+        'contract_id': data[0],
+        'original_cid': data[1],
+        'signed_cid': data[2],
+        'timestamp': data[3],
+        'metadata': json.loads(data[4]) if data[4] else None,
+        'signer': data[5]
+    }
+
+def file_record(data) -> Dict:
+    """Decode a `files` mapping row"""
+    return {
+        'cid': data[1],
+        'owner': data[2],
+        'timestamp': data[3]
+    }
+
+def contract_verification(data) -> Dict:
+    """Decode verifyContract output"""
+    return {
+        'is_valid': data[0],
+        'timestamp': data[1],
+        'status': ContractStatus(data[2]).name,
+        'method': 'direct'
+    }
+
 class Web3Client:
     """Client for interacting with Ethereum blockchain"""
     
-    def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(current_app.config['GANACHE_URL']))
+    def __init__(self, provider: Optional[Web3.HTTPProvider] = None):
+        self.w3 = Web3(provider or Web3.HTTPProvider(current_app.config['GANACHE_URL']))
         self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
         self.chain_id = current_app.config['CHAIN_ID']
+        self.async_transactions = current_app.config.get('BLOCKCHAIN_ASYNC_TX', False)
+        self._config = current_app.config
+        self._senders = None
+        cache = getattr(current_app, 'cache', None)
+        self.nonces = NonceManager(self.w3, self.chain_id, cache.redis if cache else None)
+        self.fees = FeeOracle.from_config(self.w3, current_app.config)
+        self.reads = ChainReadCache(
+            ttl=current_app.config.get('CHAIN_READ_CACHE_TTL', 30),
+            max_contracts=current_app.config.get('CHAIN_READ_CACHE_SIZE', 10000)
+        )
         self.contract = None
         self._load_contract()
         
-        # Set up event filters
-        self.contract_stored_filter = self.contract.events.ContractStored.create_filter(fromBlock='latest')
-        self.contract_signed_filter = self.contract.events.ContractSigned.create_filter(fromBlock='latest')
-        self.contract_status_filter = self.contract.events.ContractStatusChanged.create_filter(fromBlock='latest')
+        # Event filters are installed on the node on first use
+        self._filters = {}
+        self._filters_lock = threading.Lock()
+        self._event_topics = None
+    
+    def _event_filter(self, event_name: str):
+        """Get (creating once) the node-side filter for a contract event"""
+        if event_name not in self._filters:
+            with self._filters_lock:
+                if event_name not in self._filters:
+                    event = getattr(self.contract.events, event_name)
+                    self._filters[event_name] = event.create_filter(fromBlock='latest')
+        return self._filters[event_name]
+    
+    @property
+    def contract_stored_filter(self):
+        return self._event_filter('ContractStored')
+    
+    @property
+    def contract_signed_filter(self):
+        return self._event_filter('ContractSigned')
+    
+    @property
+    def contract_status_filter(self):
+        return self._event_filter('ContractStatusChanged')
     
     def _load_contract(self):
         """Load the deployed contract"""
         try:
             # Load contract ABI and address
-            contract_path = os.path.join(
+            contract_path = current_app.config.get('CONTRACT_ARTIFACT_PATH') or os.path.join(
                 current_app.root_path,
                 'blockchain/contracts/StorageContract.json'
             )
-            
-            with open(contract_path) as f:
-                contract_data = json.load(f)
+            contract_data = _load_contract_data(contract_path)
             
             contract_address = current_app.config.get('CONTRACT_ADDRESS')
             if not contract_address:
@@ -58,23 +217,8 @@ class Web3Client:
     def _deploy_contract(self, abi: list, bytecode: str) -> str:
         """Deploy a new contract"""
         try:
-            account = self.w3.eth.accounts[0]
             contract = self.w3.eth.contract(abi=abi, bytecode=bytecode)
-            
-            transaction = contract.constructor().build_transaction({
-                'from': account,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'chainId': self.chain_id
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.create().key
-            )
-            
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            tx_hash, _ = self._broadcast(contract.constructor(), gas=2000000)
             tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
             
             return tx_receipt.contractAddress
@@ -83,63 +227,320 @@ class Web3Client:
             current_app.logger.error(f"Contract deployment failed: {str(e)}")
             raise BlockchainError("Failed to deploy contract", str(e))
     
-    def register_contract(self, contract_id: int, cid: str, party_a: str, party_b: str) -> str:
-        """Register a contract on the blockchain"""
+    @property
+    def senders(self) -> SenderPool:
+        """Accounts writes are spread across (resolved on first use)"""
+        if self._senders is None:
+            self._senders = SenderPool.from_config(self.w3, self._config)
+        return self._senders
+    
+    @property
+    def default_account(self) -> str:
+        """First sender: the configured key's account, or the node's first account"""
+        return self.senders.default
+    
+    def sender_for_contract(self, contract_id: int) -> str:
+        """
+        Account that sends every write for a contract
+        
+        The account recorded at registration is reused, since only the
+        contract's parties may request, sign or cancel it. Contracts
+        registered before the sender pool existed used the default account.
+        """
+        contract = Contract.query.get(contract_id)
+        if contract is not None:
+            if contract.blockchain_sender:
+                return contract.blockchain_sender
+            if contract.blockchain_tx:
+                return self.senders.default
+        return self.senders.for_key(contract_id)
+    
+    def _broadcast(self, function, gas: int, account: Optional[str] = None):
+        """
+        Build and send a transaction with a locally allocated nonce
+        
+        Transactions are signed locally when the account has a configured
+        private key, otherwise the node signs with its unlocked account.
+        A nonce error realigns the account's counter with the chain and is
+        retried once. A transaction the node never accepted gives its nonce
+        back if no later one was allocated. After a timeout or dropped
+        connection the transaction may still have been sent, so the
+        counter is left alone.
+        
+        Returns:
+            tuple: (transaction hash as HexBytes, nonce)
+        """
+        account = account or self.default_account
+        private_key = self.senders.private_key(account)
+        for attempt in range(2):
+            nonce = self.nonces.allocate(account)
+            try:
+                transaction = function.build_transaction({
+                    'from': account,
+                    'gas': gas,
+                    'gasPrice': self.fees.gas_price(),
+                    'nonce': nonce,
+                    'chainId': self.chain_id
+                })
+                signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=private_key) \
+                    if private_key else None
+            except Exception:
+                self.nonces.release(account, nonce)  # Never sent
+                raise
+            try:
+                if signed_txn is not None:
+                    return self.w3.eth.send_raw_transaction(signed_txn.rawTransaction), nonce
+                return self.w3.eth.send_transaction(transaction), nonce
+            except ValueError as e:
+                # The node answered with an error, so the transaction is not in its pool
+                if not is_nonce_error(e):
+                    self.nonces.release(account, nonce)
+                    raise
+                self.nonces.resync(account, nonce)
+                if attempt:
+                    raise
+    
+    def _transact(self, function, gas: int, method: str,
+                  entity_type: Optional[str] = None, entity_key=None, sender: Optional[str] = None) -> str:
+        """
+        Send a transaction and wait for its receipt
+        
+        The sender is routed by entity (see SenderPool) unless given. A
+        PendingTransaction row is added to the session for the receipt
+        tracker, which follows the transaction until it is final: as
+        `included` with its block once the receipt is in, or, with
+        BLOCKCHAIN_ASYNC_TX, as `pending` right after broadcast.
+        
+        Raises:
+            BlockchainError: If the receipt shows the transaction reverted
+                (recorded as `failed`)
+        """
+        from app.blockchain.event_indexer import index_in_background
+        from app.blockchain.receipt_tracker import get_receipt_tracker
+        
+        if sender is None:
+            if entity_type == 'contract':
+                sender = self.sender_for_contract(int(entity_key))
+            else:
+                sender = self.senders.for_key(entity_key)
+        tx_hash, nonce = self._broadcast(function, gas, sender)
+        tx_hash = self.w3.to_hex(tx_hash)
+        index_in_background()
+        tracked = PendingTransaction(
+            tx_hash=tx_hash,
+            method=method,
+            entity_type=entity_type,
+            entity_key=str(entity_key) if entity_key is not None else None,
+            sender=sender,
+            nonce=nonce
+        )
+        if not self.async_transactions:
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            tracked.block_number = receipt['blockNumber']
+            tracked.block_hash = self.w3.to_hex(receipt['blockHash'])
+            tracked.gas_used = receipt['gasUsed']
+            tracked.confirmations = 1
+            if receipt['status'] != 1:
+                tracked.status = 'failed'
+                tracked.error = 'Transaction reverted'
+                tracked.resolved_at = datetime.utcnow()
+                db.session.add(tracked)
+                raise BlockchainError(f"Transaction {tx_hash} reverted", method)
+            if entity_type == 'contract':
+                self.reads.invalidate(int(entity_key), receipt['blockNumber'])
+            tracked.status = 'included'
+        db.session.add(tracked)
+        if current_app.config.get('BLOCKCHAIN_TRACKER_IN_PROCESS', True):
+            get_receipt_tracker().start(current_app._get_current_object())
+        return tx_hash
+    
+    def register_cid(self, cid: str, user_id: Optional[int] = None) -> str:
+        """Register an uploaded file's CID on the blockchain"""
         try:
-            account = self.w3.eth.accounts[0]
+            return self._transact(self.contract.functions.storeFile(cid), GAS_LIMITS['register_cid'], 'register_cid', 'upload', cid)
             
-            transaction = self.contract.functions.storeContract(
-                contract_id,
-                cid,
-                party_a,
-                party_b
-            ).build_transaction({
-                'from': account,
-                'gas': 150000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'chainId': self.chain_id
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.create().key
+        except Exception as e:
+            current_app.logger.error(f"CID registration failed: {str(e)}")
+            raise BlockchainError("Failed to register CID", str(e))
+    
+    def register_contract(self, contract_id: int, cid: str,
+                          party_a: Optional[str] = None, party_b: Optional[str] = None) -> str:
+        """
+        Register a contract on the blockchain
+        
+        The sender is chosen from the sender pool by contract id and recorded
+        on the contract row (in the caller's transaction); parties default
+        to that account.
+        """
+        try:
+            sender = self.sender_for_contract(contract_id)
+            tx_hash = self._transact(
+                self.contract.functions.storeContract(
+                    contract_id,
+                    cid,
+                    party_a or sender,
+                    party_b or sender
+                ),
+                GAS_LIMITS['register_contract'], 'register_contract', 'contract', contract_id, sender
             )
-            
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return self.w3.to_hex(tx_hash)
+            contract = Contract.query.get(contract_id)
+            if contract is not None:
+                contract.blockchain_sender = sender
+            return tx_hash
             
         except Exception as e:
             current_app.logger.error(f"Contract registration failed: {str(e)}")
             raise BlockchainError("Failed to register contract", str(e))
     
-    def request_signature(self, contract_id: int) -> str:
-        """Request contract signature"""
+    def _contract_batch_chunks(self, items: List[Dict], sender: str, gas_limit: int) -> List[Tuple[List[Dict], int]]:
+        """Split one sender's items into (chunk, gas) pairs that fit in gas_limit"""
+        # Estimated for an id nobody registered, since skipped ids cost almost nothing
+        args = [[2 ** 256 - 1], [max((item['cid'] for item in items), key=len)], [sender], [sender]]
+        single = self.fees.estimate_gas(
+            self.contract.functions.storeContracts(*args), 'storeContracts', args,
+            sender, GAS_LIMITS['register_contract']
+        )
+        # Everything but the 21000 base cost scales with the item count; keep a 20% margin
+        per_item = max(int((single - 21000) * 1.2), 1)
+        size = max(1, (gas_limit - 21000) // per_item)
+        return [
+            (items[i:i + size], 21000 + per_item * len(items[i:i + size]))
+            for i in range(0, len(items), size)
+        ]
+    
+    def register_contracts(self, batch: List[Dict]) -> List[Dict]:
+        """
+        Register many contracts with storeContracts transactions
+        
+        Items are dicts with contract_id, cid and optional party_a/party_b.
+        They are grouped by sender (see sender_for_contract) and split into
+        transactions that fit CONTRACT_BATCH_GAS_LIMIT. All transactions are
+        broadcast before any receipt is awaited. Ids that were already
+        registered on chain are skipped by the contract.
+        
+        A transaction that cannot be sent fails only its own items; the
+        receipts of the others are still collected. Each sent transaction
+        gets a PendingTransaction row (added to the caller's session) for
+        the receipt tracker, and registered contracts get its hash as
+        blockchain_tx.
+        
+        Returns:
+            list: One dict per item, in input order, with contract_id, status
+            (registered, skipped, pending or failed), tx_hash, block_number,
+            the log_index of its ContractStored event and any error
+        """
+        if not batch:
+            return []
         try:
-            account = self.w3.eth.accounts[0]
+            gas_limit = current_app.config.get('CONTRACT_BATCH_GAS_LIMIT', 6000000)
+            by_sender: Dict[str, List[Dict]] = {}
+            for item in batch:
+                by_sender.setdefault(self.sender_for_contract(item['contract_id']), []).append(item)
+            
+            results = {}
+            
+            def record(chunk, status, tx_hash=None, block_number=None, stored=None, error=None):
+                for item in chunk:
+                    contract_id = item['contract_id']
+                    item_status = status
+                    if status == 'registered' and contract_id not in stored:
+                        item_status = 'skipped'
+                    results[contract_id] = {
+                        'contract_id': contract_id,
+                        'status': item_status,
+                        'tx_hash': tx_hash,
+                        'block_number': block_number,
+                        'log_index': (stored or {}).get(contract_id),
+                        'error': error
+                    }
+            
+            sent = []
+            for sender, items in by_sender.items():
+                for chunk, gas in self._contract_batch_chunks(items, sender, gas_limit):
+                    function = self.contract.functions.storeContracts(
+                        [item['contract_id'] for item in chunk],
+                        [item['cid'] for item in chunk],
+                        [item.get('party_a') or sender for item in chunk],
+                        [item.get('party_b') or sender for item in chunk]
+                    )
+                    try:
+                        tx_hash, nonce = self._broadcast(function, gas, sender)
+                    except Exception as e:
+                        current_app.logger.error(f"Batch registration chunk was not sent: {str(e)}")
+                        record(chunk, 'failed', error=str(e))
+                        continue
+                    tracked = PendingTransaction(
+                        tx_hash=self.w3.to_hex(tx_hash),
+                        method='register_contracts',
+                        sender=sender,
+                        nonce=nonce
+                    )
+                    db.session.add(tracked)
+                    sent.append((chunk, sender, tracked))
+            
+            for chunk, sender, tracked in sent:
+                try:
+                    receipt = self.w3.eth.wait_for_transaction_receipt(tracked.tx_hash)
+                except Exception as e:
+                    # Still in flight; the receipt tracker follows it from here
+                    current_app.logger.warning(f"No receipt yet for {tracked.tx_hash}: {str(e)}")
+                    record(chunk, 'pending', tracked.tx_hash, error=str(e))
+                    self._mark_batch_registered(chunk, sender, tracked.tx_hash, 'pending')
+                    continue
+                tracked.block_number = receipt['blockNumber']
+                tracked.block_hash = self.w3.to_hex(receipt['blockHash'])
+                tracked.gas_used = receipt['gasUsed']
+                tracked.confirmations = 1
+                if receipt['status'] != 1:
+                    tracked.status = 'failed'
+                    tracked.error = 'Transaction reverted'
+                    tracked.resolved_at = datetime.utcnow()
+                    record(chunk, 'failed', tracked.tx_hash, receipt['blockNumber'], error='Transaction reverted')
+                    continue
+                tracked.status = 'included'
+                stored = {
+                    event['args']['contractId']: event['logIndex']
+                    for event in self.contract.events.ContractStored().process_receipt(receipt)
+                }
+                record(chunk, 'registered', tracked.tx_hash, receipt['blockNumber'], stored)
+                registered = [item for item in chunk if item['contract_id'] in stored]
+                for item in registered:
+                    self.reads.invalidate(item['contract_id'], receipt['blockNumber'])
+                self._mark_batch_registered(registered, sender, tracked.tx_hash, 'included')
             
-            transaction = self.contract.functions.requestSignature(
-                contract_id
-            ).build_transaction({
-                'from': account,
-                'gas': 100000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'chainId': self.chain_id
-            })
+            if sent and current_app.config.get('BLOCKCHAIN_TRACKER_IN_PROCESS', True):
+                from app.blockchain.receipt_tracker import get_receipt_tracker
+                get_receipt_tracker().start(current_app._get_current_object())
+            return [results[item['contract_id']] for item in batch]
             
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.create().key
+        except Exception as e:
+            current_app.logger.error(f"Batch contract registration failed: {str(e)}")
+            raise BlockchainError("Failed to register contracts", str(e))
+    
+    def _mark_batch_registered(self, items: List[Dict], sender: str, tx_hash: str, status: str) -> None:
+        """
+        Record a storeContracts transaction on the contract rows it registers
+
+        While it is pending, blockchain_tx is left for the receipt tracker
+        to set once the transaction is included.
+        """
+        for item in items:
+            contract = Contract.query.get(item['contract_id'])
+            if contract is not None:
+                contract.blockchain_latest_tx = tx_hash
+                contract.blockchain_status = status
+                contract.blockchain_sender = sender
+                if status == 'included':
+                    contract.blockchain_tx = tx_hash
+    
+    def request_signature(self, contract_id: int) -> str:
+        """Request contract signature"""
+        try:
+            return self._transact(
+                self.contract.functions.requestSignature(contract_id),
+                GAS_LIMITS['request_signature'], 'request_signature', 'contract', contract_id
             )
             
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return self.w3.to_hex(tx_hash)
-            
         except Exception as e:
             current_app.logger.error(f"Signature request failed: {str(e)}")
             raise BlockchainError("Failed to request signature", str(e))
@@ -148,31 +549,16 @@ class Web3Client:
                      signed_cid: str, signature_metadata: Dict) -> str:
         """Sign a contract"""
         try:
-            account = self.w3.eth.accounts[0]
-            
-            transaction = self.contract.functions.signContract(
-                contract_id,
-                original_cid,
-                signed_cid,
-                json.dumps(signature_metadata)
-            ).build_transaction({
-                'from': account,
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'chainId': self.chain_id
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.create().key
+            return self._transact(
+                self.contract.functions.signContract(
+                    contract_id,
+                    original_cid,
+                    signed_cid,
+                    json.dumps(signature_metadata)
+                ),
+                GAS_LIMITS['sign_contract'], 'sign_contract', 'contract', contract_id
             )
             
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return self.w3.to_hex(tx_hash)
-            
         except Exception as e:
             current_app.logger.error(f"Contract signing failed: {str(e)}")
             raise BlockchainError("Failed to sign contract", str(e))
@@ -180,137 +566,289 @@ class Web3Client:
     def cancel_contract(self, contract_id: int) -> str:
         """Cancel a contract"""
         try:
-            account = self.w3.eth.accounts[0]
-            
-            transaction = self.contract.functions.cancelContract(
-                contract_id
-            ).build_transaction({
-                'from': account,
-                'gas': 100000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'chainId': self.chain_id
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.create().key
+            return self._transact(
+                self.contract.functions.cancelContract(contract_id),
+                GAS_LIMITS['cancel_contract'], 'cancel_contract', 'contract', contract_id
             )
             
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return self.w3.to_hex(tx_hash)
-            
         except Exception as e:
             current_app.logger.error(f"Contract cancellation failed: {str(e)}")
             raise BlockchainError("Failed to cancel contract", str(e))
     
     def get_contract_details(self, contract_id: int) -> Dict:
-        """Get detailed contract information"""
+        """Get detailed contract information (cached until the contract changes)"""
         try:
-            contract_data = self.contract.functions.getContract(contract_id).call()
-            
-            return {
-                'id': contract_data[0],
-                'cid': contract_data[1],
-                'timestamp': contract_data[2],
-                'status': ContractStatus(contract_data[3]).name,
-                'creator': contract_data[4],
-                'party_a': contract_data[5],
-                'party_b': contract_data[6],
-                'is_party_a_signed': contract_data[7],
-                'is_party_b_signed': contract_data[8]
-            }
+            return self.reads.get_or_load(
+                contract_id, 'details',
+                lambda: contract_details(self.contract.functions.getContract(contract_id).call())
+            )
             
         except Exception as e:
             current_app.logger.error(f"Failed to get contract details: {str(e)}")
             raise BlockchainError("Failed to get contract details", str(e))
     
     def get_signature_details(self, contract_id: int) -> Dict:
-        """Get detailed signature information"""
+        """Get detailed signature information (cached until the contract changes)"""
         try:
-            signature_data = self.contract.functions.getSignature(contract_id).call()
-            
-            return {
-                'contract_id': signature_data[0],
-                'original_cid': signature_data[1],
-                'signed_cid': signature_data[2],
-                'timestamp': signature_data[3],
-                'metadata': json.loads(signature_data[4]) if signature_data[4] else None,
-                'signer': signature_data[5]
-            }
+            return self.reads.get_or_load(
+                contract_id, 'signature',
+                lambda: signature_details(self.contract.functions.getSignature(contract_id).call())
+            )
             
         except Exception as e:
             current_app.logger.error(f"Failed to get signature details: {str(e)}")
             raise BlockchainError("Failed to get signature details", str(e))
     
-    def verify_contract(self, contract_id: int, cid: str) -> Dict:
-        """Verify contract on blockchain"""
+    def estimate_register_gas(self, contract_id: int, cid: str) -> int:
+        """Gas for registering a contract (memoized by the fee oracle)"""
+        args = [contract_id, cid, self.default_account, self.default_account]
+        return self.fees.estimate_gas(
+            self.contract.functions.storeContract(*args), 'storeContract', args,
+            self.default_account, GAS_LIMITS['register_contract']
+        )
+    
+    def estimate_signature_gas(self, contract_id: int, cid: str,
+                               signature_metadata: Optional[Dict] = None) -> int:
+        """Gas for signing a contract (memoized by the fee oracle)"""
+        args = [contract_id, cid, cid, json.dumps(signature_metadata or {})]
+        return self.fees.estimate_gas(
+            self.contract.functions.signContract(*args), 'signContract', args,
+            self.default_account, GAS_LIMITS['sign_contract']
+        )
+    
+    def read_batch(self, block_number: Optional[int] = None):
+        """Start a batch of reads sent as one JSON-RPC request (see ReadBatch)"""
+        from app.blockchain.rpc_batch import ReadBatch
+        return ReadBatch(self, block_number)
+    
+    def get_blocks(self, numbers) -> Dict[int, Dict]:
+        """Fetch several block headers in one round trip"""
+        numbers = sorted(set(numbers))
+        batch = self.read_batch()
+        for number in numbers:
+            batch.get_block(number)
+        return dict(zip(numbers, batch.execute()))
+    
+    def get_receipts(self, tx_hashes) -> Dict[str, Optional[Dict]]:
+        """Fetch several transaction receipts in one round trip (None for unmined ones)"""
+        tx_hashes = list(dict.fromkeys(tx_hashes))
+        batch = self.read_batch()
+        for tx_hash in tx_hashes:
+            batch.get_receipt(tx_hash)
+        return dict(zip(tx_hashes, batch.execute()))
+    
+    def anchor_root(self, root: bytes, leaf_count: int, batch_id: Optional[int] = None) -> str:
+        """Anchor the Merkle root of a batch of CIDs and contract hashes"""
+        try:
+            return self._transact(
+                self.contract.functions.anchorRoot(root, leaf_count),
+                GAS_LIMITS['anchor_root'], 'anchor_root', 'anchor_batch', batch_id
+            )
+            
+        except Exception as e:
+            current_app.logger.error(f"Root anchoring failed: {str(e)}")
+            raise BlockchainError("Failed to anchor Merkle root", str(e))
+    
+    def get_anchored_root(self, root: bytes) -> Dict:
+        """Read an anchored root's record (a single contract call)"""
+        leaf_count, timestamp, submitter = self.contract.functions.anchoredRoots(root).call()
+        return {
+            'anchored': timestamp > 0,
+            'leaf_count': leaf_count,
+            'timestamp': timestamp,
+            'submitter': submitter
+        }
+    
+    def _verify_anchored(self, item_type: str, item_key: str) -> Optional[Dict]:
+        """
+        Verify an item against its batch root
+        
+        The inclusion proof is checked locally, so the only chain access
+        is one read of the root. Returns None if the item was not anchored
+        in a batch.
+        """
+        proof = AnchorProof.find_anchored(item_type, item_key)
+        if proof is None:
+            return None
+        
+        root = bytes.fromhex(proof.batch.root[2:])
+        included = verify_proof(
+            item_data(item_type, item_key),
+            [bytes.fromhex(sibling[2:]) for sibling in proof.proof or []],
+            root
+        )
+        anchor = self.get_anchored_root(root) if included else {'anchored': False, 'timestamp': 0}
+        return {
+            'is_valid': included and anchor['anchored'],
+            'timestamp': anchor['timestamp'],
+            'method': 'merkle',
+            'root': proof.batch.root,
+            'anchor_tx': proof.batch.tx_hash,
+            'proof': proof.to_dict()
+        }
+    
+    def verify_cid(self, cid: str) -> Dict:
+        """Verify a file CID, through its batch proof if it was anchored"""
         try:
-            result = self.contract.functions.verifyContract(contract_id, cid).call()
+            anchored = self._verify_anchored('file', cid)
+            if anchored is not None:
+                return anchored
             
+            exists, owner, timestamp = self.contract.functions.verifyFile(cid).call()
             return {
-                'is_valid': result[0],
-                'timestamp': result[1],
-                'status': ContractStatus(result[2]).name
+                'is_valid': exists,
+                'owner': owner,
+                'timestamp': timestamp,
+                'method': 'direct'
             }
             
+        except Exception as e:
+            current_app.logger.error(f"CID verification failed: {str(e)}")
+            raise BlockchainError("Failed to verify CID", str(e))
+    
+    def verify_contract(self, contract_id: int, cid: str) -> Dict:
+        """Verify contract on blockchain"""
+        try:
+            anchored = self._verify_anchored('contract', f"{contract_id}:{cid}")
+            if anchored is not None:
+                # The proof covers the document only; the status comes from the
+                # contracts mapping (None if the contract is not registered yet)
+                details = self.reads.get_or_load(
+                    contract_id, 'row',
+                    lambda: contract_details(self.contract.functions.contracts(contract_id).call())
+                )
+                anchored['status'] = details['status'] if details['timestamp'] else None
+                return anchored
+            
+            return self.reads.get_or_load(
+                contract_id, ('verify', cid),
+                lambda: contract_verification(self.contract.functions.verifyContract(contract_id, cid).call())
+            )
+            
         except Exception as e:
             current_app.logger.error(f"Contract verification failed: {str(e)}")
             raise BlockchainError("Failed to verify contract", str(e))
     
+    @property
+    def contract_event_topics(self) -> Dict[str, str]:
+        """Topic hash -> event name for the events indexed by contractId"""
+        if self._event_topics is None:
+            self._event_topics = {
+                self.w3.to_hex(event_abi_to_log_topic(getattr(self.contract.events, name).abi)): name
+                for name in CONTRACT_EVENT_TYPES
+            }
+        return self._event_topics
+    
+    def decode_contract_log(self, log) -> Dict:
+        """Decode a raw log of one of the contract events"""
+        name = self.contract_event_topics[self.w3.to_hex(log['topics'][0])]
+        event = getattr(self.contract.events, name)().process_log(log)
+        return {
+            'type': CONTRACT_EVENT_TYPES[name],
+            'contract_id': event['args']['contractId'],
+            'fields': _event_fields(name, event['args']),
+            'block_number': log['blockNumber'],
+            'block_hash': self.w3.to_hex(log['blockHash']),
+            'tx_hash': self.w3.to_hex(log['transactionHash']),
+            'log_index': log['logIndex']
+        }
+    
+    def get_contract_logs(self, from_block, to_block, contract_id: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch and decode contract events in a block range with eth_getLogs
+        
+        With contract_id, the node filters on the indexed contractId topic.
+        """
+        topics = [list(self.contract_event_topics)]
+        if contract_id is not None:
+            topics.append(contract_id_topic(contract_id))
+        logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': topics
+        })
+        return [self.decode_contract_log(log) for log in logs]
+    
+    def get_file_logs(self, from_block, to_block) -> List[Dict]:
+        """Fetch and decode FileStored events in a block range with eth_getLogs"""
+        event = self.contract.events.FileStored
+        logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [self.w3.to_hex(event_abi_to_log_topic(event.abi))]
+        })
+        return [
+            {
+                'cid': event().process_log(log)['args']['cid'],
+                'block_number': log['blockNumber'],
+                'block_hash': self.w3.to_hex(log['blockHash']),
+                'tx_hash': self.w3.to_hex(log['transactionHash']),
+                'log_index': log['logIndex']
+            }
+            for log in logs
+        ]
+    
     def get_contract_events(self, contract_id: int) -> List[Dict]:
-        """Get all events for a specific contract"""
+        """
+        Get all events for a specific contract straight from the node
+        
+        The API reads events from the chain_events table kept by the event
+        indexer; this is the live equivalent, used when the index is not
+        available. Block timestamps are fetched in one batch.
+        """
         try:
-            events = []
-            
-            # Get ContractStored events
-            stored_events = self.contract_stored_filter.get_all_entries()
-            events.extend([
-                {
-                    'type': 'ContractStored',
-                    'contract_id': event['args']['contractId'],
-                    'cid': event['args']['cid'],
-                    'creator': event['args']['creator'],
-                    'timestamp': self.w3.eth.get_block(event['blockNumber'])['timestamp']
-                }
-                for event in stored_events
-                if event['args']['contractId'] == contract_id
-            ])
-            
-            # Get ContractSigned events
-            signed_events = self.contract_signed_filter.get_all_entries()
-            events.extend([
-                {
-                    'type': 'ContractSigned',
-                    'contract_id': event['args']['contractId'],
-                    'original_cid': event['args']['originalCid'],
-                    'signed_cid': event['args']['signedCid'],
-                    'signer': event['args']['signer'],
-                    'timestamp': self.w3.eth.get_block(event['blockNumber'])['timestamp']
-                }
-                for event in signed_events
-                if event['args']['contractId'] == contract_id
-            ])
-            
-            # Get status change events
-            status_events = self.contract_status_filter.get_all_entries()
-            events.extend([
-                {
-                    'type': 'StatusChanged',
-                    'contract_id': event['args']['contractId'],
-                    'new_status': ContractStatus(event['args']['newStatus']).name,
-                    'timestamp': self.w3.eth.get_block(event['blockNumber'])['timestamp']
-                }
-                for event in status_events
-                if event['args']['contractId'] == contract_id
-            ])
-            
-            # Sort events by timestamp
-            events.sort(key=lambda x: x['timestamp'])
-            return events
+            logs = self.get_contract_logs(
+                current_app.config.get('INDEXER_START_BLOCK', 0), 'latest', contract_id
+            )
+            blocks = self.get_blocks(log['block_number'] for log in logs)
+            return [
+                dict(
+                    {'type': log['type'], 'contract_id': log['contract_id']},
+                    **log['fields'],
+                    timestamp=blocks[log['block_number']]['timestamp'],
+                    block_number=log['block_number'],
+                    tx_hash=log['tx_hash']
+                )
+                for log in logs
+            ]
             
         except Exception as e:
             current_app.logger.error(f"Failed to get contract events: {str(e)}")
             raise BlockchainError("Failed to get contract events", str(e))
+
+_clients: Dict[Tuple, Web3Client] = {}
+_clients_lock = threading.Lock()
+
+def _reset_clients():
+    """Drop clients (and their sockets) inherited from a parent process"""
+    global _clients_lock
+    _clients.clear()
+    _clients_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_clients)
+
+def get_web3_client() -> Web3Client:
+    """
+    Get the process-wide Web3Client for the configured node and contract
+
+    The client holds one provider with a pooled keep-alive session and the
+    parsed ABI. Clients are keyed by process id as well, so gunicorn workers
+    forked after first use never share a connection pool.
+    """
+    config = current_app.config
+    key = (os.getpid(), config['GANACHE_URL'], config.get('CONTRACT_ADDRESS'))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                provider = _make_provider(
+                    config['GANACHE_URL'],
+                    config.get('WEB3_POOL_SIZE', 10),
+                    config.get('WEB3_REQUEST_TIMEOUT', 30)
+                )
+                client = _clients[key] = Web3Client(provider)
+    return client
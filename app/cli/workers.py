@@ -0,0 +1,142 @@
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.blockchain.receipt_tracker import ReceiptTracker
+from app.blockchain.event_indexer import EventIndexer
+from app.blockchain import chain_mirror
+from app.blockchain.subscriptions import ChainSubscriber
+from app.blockchain.web3_client import get_web3_client
+from app.services.outbox import OutboxDispatcher
+from app.services.anchor_service import AnchorService
+from app.models.chain_event import ChainEvent
+from app.models.contract import Contract
+from app.models.upload import Upload
+from app.utils.logger import get_logger
+from app import db
+
+logger = get_logger()
+
+@click.command('track_receipts')
+@click.option('--once', is_flag=True, help='Process one batch and exit')
+@with_appcontext
+def track_receipts(once):
+    """
+    CLI command to follow blockchain transactions from their receipts until they are final.
+    """
+    tracker = ReceiptTracker.from_config(current_app.config)
+    logger.info("Starting receipt tracker")
+    while True:
+        try:
+            resolved = tracker.run_once()
+        except Exception as e:
+            logger.error(f"Receipt tracker pass failed: {str(e)}")
+            db.session.rollback()
+            resolved = 0
+        finally:
+            db.session.remove()
+
+        if resolved:
+            logger.info(f"Updated the status of {resolved} transactions")
+        if once:
+            break
+        if resolved < tracker.batch_size:
+            time.sleep(tracker.interval)
+
+@click.command('drain_outbox')
+@click.option('--once', is_flag=True, help='Process one batch and exit')
+@with_appcontext
+def drain_outbox(once):
+    """
+    CLI command to deliver outbox side effects (IPFS uploads, chain writes, emails).
+    """
+    dispatcher = OutboxDispatcher.from_config(current_app.config)
+    if once:
+        claimed = dispatcher.run_once()
+        logger.info(f"Processed {claimed} outbox messages")
+        return
+
+    logger.info(f"Starting outbox dispatcher with {dispatcher.workers} workers")
+    dispatcher.start(current_app._get_current_object())
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        dispatcher.stop()
+
+@click.command('anchor_batches')
+@click.option('--once', is_flag=True, help='Cut and anchor one batch now, even if the window has not elapsed')
+@with_appcontext
+def anchor_batches(once):
+    """
+    CLI command to anchor queued CIDs and contract hashes as Merkle roots.
+    """
+    service = AnchorService.from_config(current_app.config)
+    while True:
+        try:
+            batch = service.run_once(force=once)
+        except Exception as e:
+            logger.error(f"Anchor pass failed: {str(e)}")
+            db.session.rollback()
+            batch = None
+        finally:
+            db.session.remove()
+
+        if once:
+            break
+        if batch is None:
+            time.sleep(service.interval)
+
+@click.command('index_events')
+@click.option('--once', is_flag=True, help='Index one block range and exit')
+@with_appcontext
+def index_events(once):
+    """
+    CLI command to index contract events from the chain into the database.
+    """
+    indexer = EventIndexer.from_config(current_app.config)
+    logger.info(f"Starting event indexer from block {indexer.checkpoint().block_number + 1}")
+    subscriber = None
+    if not once and current_app.config.get('GANACHE_WS_URL'):
+        # New heads and logs wake the indexer instead of waiting for the next poll
+        subscriber = ChainSubscriber(
+            current_app.config['GANACHE_WS_URL'], get_web3_client(), indexer,
+            reconnect_max=current_app.config.get('WS_RECONNECT_MAX', 30.0)
+        )
+        subscriber.start()
+    while True:
+        try:
+            indexed = indexer.run_once()
+        except Exception as e:
+            logger.error(f"Event indexer pass failed: {str(e)}")
+            db.session.rollback()
+            indexed = 0
+            indexer.lag = 0
+        finally:
+            db.session.remove()
+
+        if indexed:
+            logger.info(f"Indexed {indexed} contract events")
+        if once:
+            break
+        if not indexer.lag:
+            indexer.wait()
+
+@click.command('sync_mirror')
+@with_appcontext
+def sync_mirror():
+    """
+    CLI command to fill the chain mirror for contracts and files indexed before it existed.
+    """
+    block_number = chain_mirror.mirror_block()
+    if block_number is None:
+        logger.error("The event indexer has not run yet; nothing to mirror")
+        return
+    contract_ids = {contract_id for contract_id, in db.session.query(ChainEvent.contract_id).distinct()}
+    contract_ids.update(
+        contract_id for contract_id, in db.session.query(Contract.id).filter(Contract.blockchain_tx.isnot(None))
+    )
+    cids = [cid for cid, in db.session.query(Upload.cid).filter(Upload.blockchain_tx.isnot(None))]
+    chain_mirror.refresh(get_web3_client(), contract_ids, cids, block_number)
+    db.session.commit()
+    logger.info(f"Mirrored {len(contract_ids)} contracts and {len(cids)} files as of block {block_number}")
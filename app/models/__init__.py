@@ -9,3 +9,8 @@ from app.models.user import User
 from app.models.upload import Upload
 from app.models.contract import Contract, ContractAdjustment
 from app.models.weather_prediction import WeatherPrediction
+from app.models.pending_transaction import PendingTransaction
+from app.models.outbox import OutboxMessage
+from app.models.anchor import AnchorBatch, AnchorProof
+from app.models.chain_event import ChainEvent, IndexerCheckpoint
+from app.models.chain_mirror import MirroredFile, MirroredContract, MirroredSignature
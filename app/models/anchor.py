@@ -0,0 +1,62 @@
+from app import db
+from app.models import TimestampMixin
+
+class AnchorBatch(TimestampMixin, db.Model):
+    """A Merkle root anchored on-chain for a batch of CIDs and contract hashes"""
+    __tablename__ = 'anchor_batches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    root = db.Column(db.String(66), nullable=False, index=True)
+    leaf_count = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, anchored, failed
+    tx_hash = db.Column(db.String(66))
+    anchored_at = db.Column(db.DateTime)
+
+    proofs = db.relationship('AnchorProof', backref='batch', lazy='dynamic')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'root': self.root,
+            'leaf_count': self.leaf_count,
+            'status': self.status,
+            'tx_hash': self.tx_hash,
+            'anchored_at': self.anchored_at.isoformat() if self.anchored_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class AnchorProof(TimestampMixin, db.Model):
+    """
+    One anchored item and its inclusion proof
+
+    Items waiting for the next batch have no batch_id yet.
+    """
+    __tablename__ = 'anchor_proofs'
+    __table_args__ = (db.UniqueConstraint('item_type', 'item_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.Integer, db.ForeignKey('anchor_batches.id'), index=True)
+    item_type = db.Column(db.String(20), nullable=False)  # file, contract
+    item_key = db.Column(db.String(300), nullable=False)  # CID, or "<contract id>:<CID>"
+    leaf = db.Column(db.String(66), nullable=False)
+    leaf_index = db.Column(db.Integer)
+    proof = db.Column(db.JSON)  # Sibling hashes (hex), leaf to root
+
+    @classmethod
+    def find_anchored(cls, item_type, item_key):
+        """Get the proof for an item whose batch is anchored, if any"""
+        return cls.query.join(AnchorBatch).filter(
+            cls.item_type == item_type,
+            cls.item_key == item_key,
+            AnchorBatch.status == 'anchored'
+        ).first()
+
+    def to_dict(self):
+        return {
+            'item_type': self.item_type,
+            'item_key': self.item_key,
+            'leaf': self.leaf,
+            'leaf_index': self.leaf_index,
+            'proof': self.proof,
+            'batch_id': self.batch_id
+        }
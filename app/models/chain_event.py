@@ -0,0 +1,58 @@
+from app import db
+from app.models import TimestampMixin
+
+class ChainEvent(TimestampMixin, db.Model):
+    """A contract event indexed from the chain, with its block timestamp"""
+    __tablename__ = 'chain_events'
+    __table_args__ = (
+        db.UniqueConstraint('tx_hash', 'log_index'),
+        db.Index('ix_chain_events_contract_block', 'contract_id', 'block_number', 'log_index'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)  # ContractStored, ContractSigned, StatusChanged, ...
+    contract_id = db.Column(db.Integer, nullable=False)
+    block_number = db.Column(db.Integer, nullable=False, index=True)
+    block_hash = db.Column(db.String(66), nullable=False)
+    block_timestamp = db.Column(db.Integer, nullable=False)
+    tx_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False)
+    fields = db.Column(db.JSON)  # Decoded event arguments, as returned by the API
+
+    @classmethod
+    def for_contract(cls, contract_id):
+        """All indexed events of a contract, oldest first"""
+        return cls.query.filter_by(contract_id=contract_id) \
+            .order_by(cls.block_number, cls.log_index) \
+            .all()
+
+    def to_dict(self):
+        return dict(
+            {'type': self.event_type, 'contract_id': self.contract_id},
+            **(self.fields or {}),
+            timestamp=self.block_timestamp,
+            block_number=self.block_number,
+            tx_hash=self.tx_hash
+        )
+
+class IndexerCheckpoint(TimestampMixin, db.Model):
+    """
+    Progress of a chain indexer
+
+    block_hashes keeps the hashes of recently indexed blocks, by number,
+    so a reorg can be detected and rewound to the last block still on
+    the canonical chain.
+    """
+    __tablename__ = 'indexer_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+    block_number = db.Column(db.Integer, nullable=False)  # Last fully indexed block
+    block_hashes = db.Column(db.JSON)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'block_number': self.block_number,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
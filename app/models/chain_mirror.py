@@ -0,0 +1,82 @@
+from app import db
+from app.models import TimestampMixin
+
+class MirroredFile(TimestampMixin, db.Model):
+    """A row of the contract's `files` mapping, as of block_number"""
+    __tablename__ = 'chain_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cid = db.Column(db.String(255), nullable=False, unique=True)
+    owner = db.Column(db.String(42), nullable=False)
+    timestamp = db.Column(db.Integer, nullable=False)  # Block timestamp of storeFile
+    block_number = db.Column(db.Integer, nullable=False, index=True)
+
+    def to_verification(self):
+        """Same shape as Web3Client.verify_cid"""
+        return {
+            'is_valid': True,
+            'owner': self.owner,
+            'timestamp': self.timestamp,
+            'method': 'mirror'
+        }
+
+class MirroredContract(TimestampMixin, db.Model):
+    """A row of the contract's `contracts` mapping, as of block_number"""
+    __tablename__ = 'chain_contracts'
+
+    contract_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    cid = db.Column(db.String(255), nullable=False)
+    timestamp = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # ContractStatus name
+    creator = db.Column(db.String(42), nullable=False)
+    party_a = db.Column(db.String(42), nullable=False)
+    party_b = db.Column(db.String(42), nullable=False)
+    is_party_a_signed = db.Column(db.Boolean, default=False)
+    is_party_b_signed = db.Column(db.Boolean, default=False)
+    block_number = db.Column(db.Integer, nullable=False, index=True)
+
+    def to_details(self):
+        """Same shape as Web3Client.get_contract_details"""
+        return {
+            'id': self.contract_id,
+            'cid': self.cid,
+            'timestamp': self.timestamp,
+            'status': self.status,
+            'creator': self.creator,
+            'party_a': self.party_a,
+            'party_b': self.party_b,
+            'is_party_a_signed': self.is_party_a_signed,
+            'is_party_b_signed': self.is_party_b_signed
+        }
+
+    def to_verification(self, cid):
+        """Same shape as Web3Client.verify_contract"""
+        return {
+            'is_valid': self.cid == cid,
+            'timestamp': self.timestamp,
+            'status': self.status,
+            'method': 'mirror'
+        }
+
+class MirroredSignature(TimestampMixin, db.Model):
+    """A row of the contract's `signatures` mapping, as of block_number"""
+    __tablename__ = 'chain_signatures'
+
+    contract_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    original_cid = db.Column(db.String(255), nullable=False)
+    signed_cid = db.Column(db.String(255), nullable=False)
+    timestamp = db.Column(db.Integer, nullable=False)
+    signature_metadata = db.Column(db.JSON)
+    signer = db.Column(db.String(42), nullable=False)
+    block_number = db.Column(db.Integer, nullable=False, index=True)
+
+    def to_details(self):
+        """Same shape as Web3Client.get_signature_details"""
+        return {
+            'contract_id': self.contract_id,
+            'original_cid': self.original_cid,
+            'signed_cid': self.signed_cid,
+            'timestamp': self.timestamp,
+            'metadata': self.signature_metadata,
+            'signer': self.signer
+        }
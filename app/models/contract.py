@@ -41,6 +41,9 @@ class Contract(TimestampMixin, db.Model):
     
     # Blockchain
     blockchain_tx = db.Column(db.String(255))  # Transaction hash for contract registration
+    blockchain_status = db.Column(db.String(20))  # pending, included, final, failed (latest transaction)
+    blockchain_latest_tx = db.Column(db.String(66))  # Latest transaction (register, request, sign or cancel)
+    blockchain_sender = db.Column(db.String(42))  # Account that registered the contract and sends its writes
     
     # Relationships
     weather_prediction = db.relationship('WeatherPrediction', 
@@ -65,15 +68,34 @@ class Contract(TimestampMixin, db.Model):
         self.amount = amount
         self.payment_method = payment_method
 
-    def update_signature(self, signed_cid, signature_metadata, signature_method=None):
+    def update_signature(self, signed_cid, signature_metadata, signature_method=None,
+                         blockchain_tx=None, confirmed=True):
         self.signed_cid = signed_cid
         self.status = 'signed'
         self.signature_date = datetime.utcnow()
         self.signature_metadata = signature_metadata
         if signature_method:
             self.signature_method = signature_method
+        if blockchain_tx:
+            self.set_blockchain_status(confirmed, blockchain_tx)
         self.updated_at = datetime.utcnow()
 
+    def update_status(self, status, tx_hash=None, confirmed=True):
+        """Set the contract status after an on-chain transition"""
+        self.status = status
+        if tx_hash:
+            self.set_blockchain_status(confirmed, tx_hash)
+        self.updated_at = datetime.utcnow()
+
+    def set_blockchain_status(self, confirmed, tx_hash=None):
+        """
+        Mark the latest transaction as included (its receipt was seen) or pending;
+        the receipt tracker moves it on to final
+        """
+        self.blockchain_status = 'included' if confirmed else 'pending'
+        if tx_hash:
+            self.blockchain_latest_tx = tx_hash
+
     def set_token(self, token, expiry):
         """Set email verification token"""
         self.token_email = token
@@ -116,6 +138,9 @@ class Contract(TimestampMixin, db.Model):
             'status': self.status,
             'signature_date': self.signature_date.isoformat() if self.signature_date else None,
             'blockchain_tx': self.blockchain_tx,
+            'blockchain_status': self.blockchain_status,
+            'blockchain_latest_tx': self.blockchain_latest_tx,
+            'blockchain_sender': self.blockchain_sender,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -0,0 +1,53 @@
+"""Add Merkle anchor batches and proofs
+
+Revision ID: add_anchor_batches
+Revises: add_outbox_messages
+Create Date: 2024-03-30 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_anchor_batches'
+down_revision = 'add_outbox_messages'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'anchor_batches',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('root', sa.String(66), nullable=False),
+        sa.Column('leaf_count', sa.Integer, nullable=False),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('tx_hash', sa.String(66), nullable=True),
+        sa.Column('anchored_at', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_anchor_batches_root', 'anchor_batches', ['root'])
+    op.create_index('ix_anchor_batches_status', 'anchor_batches', ['status'])
+
+    # Queued items (no batch yet) and inclusion proofs of anchored ones
+    op.create_table(
+        'anchor_proofs',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('batch_id', sa.Integer, sa.ForeignKey('anchor_batches.id'), nullable=True),
+        sa.Column('item_type', sa.String(20), nullable=False),
+        sa.Column('item_key', sa.String(300), nullable=False),
+        sa.Column('leaf', sa.String(66), nullable=False),
+        sa.Column('leaf_index', sa.Integer, nullable=True),
+        sa.Column('proof', sa.JSON, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True),
+        sa.UniqueConstraint('item_type', 'item_key')
+    )
+    op.create_index('ix_anchor_proofs_batch_id', 'anchor_proofs', ['batch_id'])
+
+def downgrade():
+    op.drop_index('ix_anchor_proofs_batch_id', 'anchor_proofs')
+    op.drop_table('anchor_proofs')
+    op.drop_index('ix_anchor_batches_status', 'anchor_batches')
+    op.drop_index('ix_anchor_batches_root', 'anchor_batches')
+    op.drop_table('anchor_batches')
@@ -0,0 +1,22 @@
+"""Record when a transaction was last broadcast or dropped by a reorg
+
+Revision ID: add_broadcast_time
+Revises: add_confirmation_tracking
+Create Date: 2024-04-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_broadcast_time'
+down_revision = 'add_confirmation_tracking'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('pending_transactions', sa.Column('broadcast_at', sa.DateTime, nullable=True))
+    op.execute("UPDATE pending_transactions SET broadcast_at = created_at")
+
+def downgrade():
+    op.drop_column('pending_transactions', 'broadcast_at')
@@ -0,0 +1,50 @@
+"""Add indexed chain events and indexer checkpoints
+
+Revision ID: add_chain_events
+Revises: add_anchor_batches
+Create Date: 2024-04-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_chain_events'
+down_revision = 'add_anchor_batches'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'chain_events',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('event_type', sa.String(50), nullable=False),
+        sa.Column('contract_id', sa.Integer, nullable=False),
+        sa.Column('block_number', sa.Integer, nullable=False),
+        sa.Column('block_hash', sa.String(66), nullable=False),
+        sa.Column('block_timestamp', sa.Integer, nullable=False),
+        sa.Column('tx_hash', sa.String(66), nullable=False),
+        sa.Column('log_index', sa.Integer, nullable=False),
+        sa.Column('fields', sa.JSON, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True),
+        sa.UniqueConstraint('tx_hash', 'log_index')
+    )
+    op.create_index('ix_chain_events_block_number', 'chain_events', ['block_number'])
+    op.create_index('ix_chain_events_contract_block', 'chain_events', ['contract_id', 'block_number', 'log_index'])
+
+    op.create_table(
+        'indexer_checkpoints',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('block_number', sa.Integer, nullable=False),
+        sa.Column('block_hashes', sa.JSON, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+
+def downgrade():
+    op.drop_table('indexer_checkpoints')
+    op.drop_index('ix_chain_events_contract_block', 'chain_events')
+    op.drop_index('ix_chain_events_block_number', 'chain_events')
+    op.drop_table('chain_events')
@@ -0,0 +1,67 @@
+"""Add the mirror of on-chain files, contracts and signatures
+
+Revision ID: add_chain_mirror
+Revises: add_contract_sender
+Create Date: 2024-04-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_chain_mirror'
+down_revision = 'add_contract_sender'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'chain_files',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('cid', sa.String(255), nullable=False, unique=True),
+        sa.Column('owner', sa.String(42), nullable=False),
+        sa.Column('timestamp', sa.Integer, nullable=False),
+        sa.Column('block_number', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_chain_files_block_number', 'chain_files', ['block_number'])
+
+    op.create_table(
+        'chain_contracts',
+        sa.Column('contract_id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('cid', sa.String(255), nullable=False),
+        sa.Column('timestamp', sa.Integer, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('creator', sa.String(42), nullable=False),
+        sa.Column('party_a', sa.String(42), nullable=False),
+        sa.Column('party_b', sa.String(42), nullable=False),
+        sa.Column('is_party_a_signed', sa.Boolean, nullable=True),
+        sa.Column('is_party_b_signed', sa.Boolean, nullable=True),
+        sa.Column('block_number', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_chain_contracts_block_number', 'chain_contracts', ['block_number'])
+
+    op.create_table(
+        'chain_signatures',
+        sa.Column('contract_id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('original_cid', sa.String(255), nullable=False),
+        sa.Column('signed_cid', sa.String(255), nullable=False),
+        sa.Column('timestamp', sa.Integer, nullable=False),
+        sa.Column('signature_metadata', sa.JSON, nullable=True),
+        sa.Column('signer', sa.String(42), nullable=False),
+        sa.Column('block_number', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_chain_signatures_block_number', 'chain_signatures', ['block_number'])
+
+def downgrade():
+    op.drop_index('ix_chain_signatures_block_number', 'chain_signatures')
+    op.drop_table('chain_signatures')
+    op.drop_index('ix_chain_contracts_block_number', 'chain_contracts')
+    op.drop_table('chain_contracts')
+    op.drop_index('ix_chain_files_block_number', 'chain_files')
+    op.drop_table('chain_files')
@@ -0,0 +1,32 @@
+"""Track block hashes and confirmations of transactions
+
+Revision ID: add_confirmation_tracking
+Revises: add_chain_mirror
+Create Date: 2024-04-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_confirmation_tracking'
+down_revision = 'add_chain_mirror'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('pending_transactions', sa.Column('block_hash', sa.String(66), nullable=True))
+    op.add_column('pending_transactions', sa.Column('confirmations', sa.Integer, nullable=True, server_default='0'))
+
+    # 'confirmed' is split into included and final; existing confirmations are long past any reorg
+    op.execute("UPDATE pending_transactions SET status = 'final' WHERE status = 'confirmed'")
+    op.execute("UPDATE contracts SET blockchain_status = 'final' WHERE blockchain_status = 'confirmed'")
+    op.execute("UPDATE uploads SET status = 'final' WHERE status = 'confirmed'")
+
+def downgrade():
+    op.execute("UPDATE uploads SET status = 'confirmed' WHERE status IN ('included', 'final')")
+    op.execute("UPDATE contracts SET blockchain_status = 'confirmed' WHERE blockchain_status IN ('included', 'final')")
+    op.execute("UPDATE pending_transactions SET status = 'confirmed' WHERE status IN ('included', 'final')")
+
+    op.drop_column('pending_transactions', 'confirmations')
+    op.drop_column('pending_transactions', 'block_hash')
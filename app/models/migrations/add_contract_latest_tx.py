@@ -0,0 +1,21 @@
+"""Record the hash of a contract's latest transaction
+
+Revision ID: add_contract_latest_tx
+Revises: add_broadcast_time
+Create Date: 2024-04-09 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_contract_latest_tx'
+down_revision = 'add_broadcast_time'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('contracts', sa.Column('blockchain_latest_tx', sa.String(66), nullable=True))
+
+def downgrade():
+    op.drop_column('contracts', 'blockchain_latest_tx')
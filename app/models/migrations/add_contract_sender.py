@@ -0,0 +1,22 @@
+"""Add the sending account to contracts
+
+Revision ID: add_contract_sender
+Revises: add_chain_events
+Create Date: 2024-04-04 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_contract_sender'
+down_revision = 'add_chain_events'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Existing rows stay NULL: they were registered by the default account
+    op.add_column('contracts', sa.Column('blockchain_sender', sa.String(42), nullable=True))
+
+def downgrade():
+    op.drop_column('contracts', 'blockchain_sender')
@@ -0,0 +1,46 @@
+"""Add outbox messages
+
+Revision ID: add_outbox_messages
+Revises: add_pending_transactions
+Create Date: 2024-03-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_outbox_messages'
+down_revision = 'add_pending_transactions'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Side effects recorded in the same transaction as the change that caused them
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('aggregate_type', sa.String(20), nullable=False),
+        sa.Column('aggregate_id', sa.Integer, nullable=False),
+        sa.Column('payload', sa.JSON, nullable=True),
+        sa.Column('idempotency_key', sa.String(255), nullable=False, unique=True),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('attempts', sa.Integer, nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime, nullable=True),
+        sa.Column('locked_by', sa.String(100), nullable=True),
+        sa.Column('locked_at', sa.DateTime, nullable=True),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.Column('result', sa.JSON, nullable=True),
+        sa.Column('completed_at', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_outbox_messages_aggregate_id', 'outbox_messages', ['aggregate_id'])
+    op.create_index('ix_outbox_messages_status', 'outbox_messages', ['status'])
+    op.create_index('ix_outbox_messages_next_attempt_at', 'outbox_messages', ['next_attempt_at'])
+
+def downgrade():
+    op.drop_index('ix_outbox_messages_next_attempt_at', 'outbox_messages')
+    op.drop_index('ix_outbox_messages_status', 'outbox_messages')
+    op.drop_index('ix_outbox_messages_aggregate_id', 'outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,46 @@
+"""Add pending transactions
+
+Revision ID: add_pending_transactions
+Revises: add_signature_methods
+Create Date: 2024-03-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_pending_transactions'
+down_revision = 'add_signature_methods'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Track the latest on-chain transaction per contract
+    op.add_column('contracts', sa.Column('blockchain_status', sa.String(20), nullable=True))
+
+    # Broadcast transactions awaiting their receipt
+    op.create_table(
+        'pending_transactions',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('tx_hash', sa.String(66), nullable=False, unique=True),
+        sa.Column('method', sa.String(50), nullable=False),
+        sa.Column('entity_type', sa.String(20), nullable=True),
+        sa.Column('entity_key', sa.String(255), nullable=True),
+        sa.Column('sender', sa.String(42), nullable=True),
+        sa.Column('nonce', sa.Integer, nullable=True),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('block_number', sa.Integer, nullable=True),
+        sa.Column('gas_used', sa.Integer, nullable=True),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('resolved_at', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True)
+    )
+    op.create_index('ix_pending_transactions_tx_hash', 'pending_transactions', ['tx_hash'])
+    op.create_index('ix_pending_transactions_status', 'pending_transactions', ['status'])
+
+def downgrade():
+    op.drop_index('ix_pending_transactions_status', 'pending_transactions')
+    op.drop_index('ix_pending_transactions_tx_hash', 'pending_transactions')
+    op.drop_table('pending_transactions')
+    op.drop_column('contracts', 'blockchain_status')
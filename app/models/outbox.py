@@ -0,0 +1,41 @@
+from app import db
+from app.models import TimestampMixin
+
+class OutboxMessage(TimestampMixin, db.Model):
+    """A side effect (IPFS upload, chain write, email) recorded with the change that caused it"""
+    __tablename__ = 'outbox_messages'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # storacha_upload, chain_register, email
+    aggregate_type = db.Column(db.String(20), nullable=False)  # contract
+    aggregate_id = db.Column(db.Integer, nullable=False, index=True)
+    payload = db.Column(db.JSON)
+    idempotency_key = db.Column(db.String(255), nullable=False, unique=True)
+
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, processing, done, dead
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, index=True)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+    completed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'aggregate_type': self.aggregate_type,
+            'aggregate_id': self.aggregate_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'result': self.result,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<OutboxMessage {self.kind} {self.aggregate_type}:{self.aggregate_id} ({self.status})>'
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app import db
+from app.models import TimestampMixin
+
+class PendingTransaction(TimestampMixin, db.Model):
+    """A broadcast transaction, tracked until it is final or failed"""
+    __tablename__ = 'pending_transactions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tx_hash = db.Column(db.String(66), nullable=False, unique=True, index=True)
+    method = db.Column(db.String(50), nullable=False)  # Web3Client method, e.g. register_contract
+    entity_type = db.Column(db.String(20))  # contract, upload
+    entity_key = db.Column(db.String(255))  # Contract id or upload CID
+    sender = db.Column(db.String(42))
+    nonce = db.Column(db.Integer)
+    status = db.Column(db.String(20), default='pending', index=True)  # pending, included, final, failed
+    block_number = db.Column(db.Integer)
+    block_hash = db.Column(db.String(66))  # Checked against the canonical chain until final
+    confirmations = db.Column(db.Integer, default=0)
+    gas_used = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    broadcast_at = db.Column(db.DateTime, default=datetime.utcnow)  # Reset when a reorg drops the transaction
+    resolved_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tx_hash': self.tx_hash,
+            'method': self.method,
+            'entity_type': self.entity_type,
+            'entity_key': self.entity_key,
+            'sender': self.sender,
+            'nonce': self.nonce,
+            'status': self.status,
+            'block_number': self.block_number,
+            'block_hash': self.block_hash,
+            'confirmations': self.confirmations,
+            'gas_used': self.gas_used,
+            'error': self.error,
+            'broadcast_at': self.broadcast_at.isoformat() if self.broadcast_at else None,
+            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<PendingTransaction {self.method} {self.tx_hash} ({self.status})>'
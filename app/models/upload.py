@@ -12,7 +12,7 @@ class Upload(TimestampMixin, db.Model):
     mime_type = db.Column(db.String(100))
     file_size = db.Column(db.Integer)  # Size in bytes
     blockchain_tx = db.Column(db.String(255))  # Transaction hash
-    status = db.Column(db.String(20), default='pending')  # pending, confirmed, failed
+    status = db.Column(db.String(20), default='pending')  # pending, included, final, failed
     
     # Metadata
     ipfs_url = db.Column(db.String(512))
@@ -26,9 +26,13 @@ class Upload(TimestampMixin, db.Model):
         self.file_size = file_size
         self.ipfs_url = f"ipfs://{cid}"
 
-    def update_blockchain_status(self, tx_hash):
+    def update_blockchain_status(self, tx_hash, status='included'):
+        """
+        Record the registering transaction and its status: included once its
+        receipt is seen, final at CONFIRMATION_DEPTH (set by the receipt tracker)
+        """
         self.blockchain_tx = tx_hash
-        self.status = 'confirmed'
+        self.status = status
         self.updated_at = datetime.utcnow()
 
     def to_dict(self):
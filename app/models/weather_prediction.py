@@ -48,6 +48,14 @@ class WeatherPrediction(TimestampMixin, db.Model):
         self.prediction_metadata = metadata or {}
         self.updated_at = datetime.utcnow()
 
+    def set_delay_distribution(self, distribution):
+        """Store a simulated delay distribution alongside the ML outputs"""
+        metadata = dict(self.prediction_metadata or {})
+        metadata['delay_distribution'] = distribution
+        # Reassign so SQLAlchemy detects the JSON change
+        self.prediction_metadata = metadata
+        self.updated_at = datetime.utcnow()
+
     def process_daily_forecasts(self):
         """Process raw weather data into daily forecast summaries"""
         if not self.weather_data:
@@ -6,11 +6,14 @@ from app.models.weather_prediction import WeatherPrediction
 from app.routes import contract_bp
 from app.services.weather_service import WeatherService
 from app.services.ml_service import MLPredictor
-from app.services.pdf_generator import generate_contract_pdf, generate_pdf_from_html
-from app.services.email_service import send_contract_email
+from app.services.delay_simulation import DelaySimulator, positive_int
+from app.services.pdf_generator import generate_pdf_from_html
 from app.services.storacha import StorachaClient
-from app.blockchain.web3_client import Web3Client
+from app.blockchain.web3_client import get_web3_client
+from app.blockchain import chain_mirror
+from app.blockchain.event_indexer import index_in_background
 from app.services.contract_generator import ContractGenerator
+from app.services import outbox
 from datetime import datetime, timedelta
 from app.utils.validators.marshmallow_schemas import ContractSchema
 from app.utils.error_handlers import ValidationError, BlockchainError
@@ -62,6 +65,14 @@ def generate_contract():
                 'details': e.messages
             }), 400
             
+        try:
+            data['planned_duration_days'] = positive_int(data.get('planned_duration_days'), 'planned_duration_days')
+        except ValueError as e:
+            return jsonify({
+                'error': 'Validation error',
+                'details': str(e)
+            }), 400
+            
         # Parse dates
         start_date = datetime.strptime(data['planned_start_date'], '%Y-%m-%d').date()
             
@@ -126,6 +137,17 @@ def generate_contract():
             metadata=prediction['metadata']
         )
         
+        # Simulate the delay distribution (P50/P90 completion dates) for pricing
+        try:
+            simulator = DelaySimulator.from_config(current_app.config)
+            weather_prediction.set_delay_distribution(simulator.simulate_contract(
+                start_date=start_date,
+                planned_days=data['planned_duration_days'],
+                daily_forecast=weather_data.get('daily', [])
+            ))
+        except Exception as e:
+            current_app.logger.warning(f"Delay simulation failed: {str(e)}")
+        
         db.session.add(weather_prediction)
         
         # Adjust contract duration if confidence is high enough
@@ -136,12 +158,6 @@ def generate_contract():
                 f"Weather-based adjustment: {prediction['delay_days']} additional days recommended"
             )
         
-        # Generate PDF using legacy generator
-        pdf_content = generate_contract_pdf(
-            contract=contract,
-            weather_prediction=weather_prediction
-        )
-
         # Generate new HTML-based contract
         generator = ContractGenerator()
         contract_data = {
@@ -155,48 +171,19 @@ def generate_contract():
         }
         html_pdf_path = generator.generate_painting_contract(contract_data)
         
-        # Upload to Storacha
-        storacha = StorachaClient(
-            api_key=current_app.config['STORACHA_API_KEY']
-        )
-        
-        cid = storacha.upload_content(
-            content=pdf_content,
-            filename=f"contract_{contract.id}.pdf"
-        )
-        
-        contract.initial_cid = cid
-        
-        # Register in blockchain
-        try:
-            web3_client = Web3Client()
-            tx_hash = web3_client.register_contract(
-                contract_id=contract.id,
-                cid=cid
-            )
-            contract.blockchain_tx = tx_hash
-        except Exception as e:
-            current_app.logger.error(f"Blockchain registration failed: {str(e)}")
-            raise BlockchainError("Failed to register contract on blockchain", str(e))
-        
-        # Send email notification
-        try:
-            send_contract_email(
-                recipient_email=contract.provider_email,
-                contract=contract,
-                cid=cid
-            )
-        except Exception as e:
-            current_app.logger.error(f"Email notification failed: {str(e)}")
+        # Upload, chain registration and email run from the outbox after commit
+        outbox.enqueue('storacha_upload', 'contract', contract.id)
         
         db.session.commit()
+        outbox.dispatch_in_background()
         
         return jsonify({
             'success': True,
             'message': 'Contract generated successfully',
             'data': {
                 'contract': contract.to_dict(),
-                'weather_prediction': weather_prediction.to_dict()
+                'weather_prediction': weather_prediction.to_dict(),
+                'outbox': [message.to_dict() for message in outbox.messages_for('contract', contract.id)]
             }
         }), 201
         
@@ -240,7 +227,7 @@ def get_contract_template():
 @contract_bp.route('/contrato/status/<string:cid>', methods=['GET'])
 @contract_bp.route('/api/status/<string:cid>', methods=['GET'])
 @limiter.limit("100/hour")
-@cached(timeout=300)
+@cached(expires_in=300, skip_if=chain_mirror.strict_requested)
 def get_contract_status(cid):
     """
     Get contract status by CID
@@ -253,9 +240,14 @@ def get_contract_status(cid):
         type: string
         required: true
         description: Contract CID
+      - in: query
+        name: strict
+        type: boolean
+        required: false
+        description: Read the chain instead of the indexed mirror
     responses:
       200:
-        description: Contract status
+        description: Contract status; blockchain_status.as_of_block is the mirrored block height (null for a live read)
       404:
         description: Contract not found
       429:
@@ -273,10 +265,13 @@ def get_contract_status(cid):
         ipfs_status = storacha.check_cid_availability(cid)
         
         # Get blockchain verification
-        web3_client = Web3Client()
-        blockchain_status = web3_client.verify_contract(
+        web3_client = get_web3_client()
+        index_in_background()
+        blockchain_status = chain_mirror.verify_contract(
+            web3_client,
             contract_id=contract.id,
-            cid=cid
+            cid=cid,
+            strict=chain_mirror.strict_requested()
         )
         
         response = contract.to_dict()
@@ -300,6 +295,40 @@ def get_contract_status(cid):
             'details': str(e)
         }), 500
 
+@contract_bp.route('/contrato/<int:contract_id>/outbox', methods=['GET'])
+@limiter.limit("100/hour")
+def get_contract_outbox(contract_id):
+    """
+    Get the delivery status of a contract's side effects
+    ---
+    tags:
+      - Contracts
+    parameters:
+      - in: path
+        name: contract_id
+        type: integer
+        required: true
+        description: Contract ID
+    responses:
+      200:
+        description: Outbox messages (IPFS upload, chain registration, email) and their status
+      404:
+        description: Contract not found
+    """
+    contract = Contract.query.get_or_404(contract_id)
+    messages = outbox.messages_for('contract', contract.id)
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'contract_id': contract.id,
+            'initial_cid': contract.initial_cid,
+            'blockchain_tx': contract.blockchain_tx,
+            'complete': bool(messages) and all(m.status == 'done' for m in messages),
+            'messages': [message.to_dict() for message in messages]
+        }
+    }), 200
+
 @contract_bp.route('/custo/<string:cid>', methods=['GET'])
 @contract_bp.route('/api/custo/<string:cid>', methods=['GET'])
 @limiter.limit("50/hour")
@@ -329,7 +358,7 @@ def estimate_gas_cost(cid):
     ).first_or_404()
     
     try:
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         
         # Estimate gas for different operations
         estimates = {
@@ -343,12 +372,19 @@ def estimate_gas_cost(cid):
             )
         }
         
+        fees = web3_client.fees.fees()
+        
         return jsonify({
             'success': True,
             'data': {
                 'contract_id': contract.id,
                 'cid': cid,
-                'gas_estimates': estimates
+                'gas_estimates': estimates,
+                'gas_price': fees['gas_price'],
+                'estimated_costs_wei': {
+                    operation: gas * fees['gas_price'] for operation, gas in estimates.items()
+                },
+                'fees': fees
             }
         }), 200
         
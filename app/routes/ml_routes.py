@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from flasgger import swag_from
 from app.services.ml_service import MLPredictor
+from app.services.shadow_scoring import get_shadow_scorer
+from app.services.training_pipeline import get_training_jobs, make_chunk_source
 from app.utils.logger import get_logger
 from app.utils.validators.marshmallow_schemas import MLPredictionRequestSchema
 from app.utils.error_handlers import ValidationError, MLPredictionError
@@ -188,26 +190,155 @@ def model_status():
             'message': 'Failed to get model status'
         }), 500
 
+@ml_bp.route('/model/shadow', methods=['GET'])
+@limiter.limit("1000/day")
+@swag_from({
+    'tags': ['Machine Learning'],
+    'responses': {
+        200: {
+            'description': 'Shadow scoring statistics per model version',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'enabled': {'type': 'boolean'},
+                    'shadow_version': {'type': 'string'},
+                    'dropped': {'type': 'integer'},
+                    'versions': {'type': 'object'}
+                }
+            }
+        }
+    }
+})
+def shadow_status():
+    """Get agreement and latency stats of the shadow (candidate) model"""
+    try:
+        scorer = get_shadow_scorer()
+        if scorer is None:
+            return jsonify({'success': True, 'data': {'enabled': False}}), 200
+
+        stats = scorer.get_stats()
+        stats['enabled'] = True
+        return jsonify({'success': True, 'data': stats}), 200
+
+    except Exception as e:
+        logger.error(f"Error getting shadow scoring stats: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'Failed to get shadow scoring stats'
+        }), 500
+
+def _positive_int(data, key, default):
+    """Read a positive integer request field, raising ValueError for anything else"""
+    value = data.get(key, default)
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{key} must be a positive integer")
+    return value
+
 @ml_bp.route('/model/retrain', methods=['POST'])
 @limiter.limit("10/day")  # Strict limit on retraining
+@swag_from({
+    'tags': ['Machine Learning'],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'source': {
+                        'type': 'object',
+                        'description': "Training source: {'type': 'csv'|'parquet', 'path': ...}, "
+                                       "{'type': 'archive', 'latitude', 'longitude', 'start_date', 'end_date'} "
+                                       "or {'type': 'records', 'records': [...]}"
+                    },
+                    'training_data': {
+                        'type': 'array',
+                        'items': {'type': 'object'},
+                        'description': 'Inline training records (shorthand for a records source)'
+                    },
+                    'warm_start': {'type': 'boolean', 'default': True},
+                    'epochs': {'type': 'integer'},
+                    'chunk_size': {'type': 'integer'}
+                }
+            }
+        }
+    ],
+    'responses': {
+        202: {
+            'description': 'Training job accepted',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'status_url': {'type': 'string'}
+                }
+            }
+        },
+        400: {
+            'description': 'Invalid training source'
+        }
+    }
+})
 def retrain_model():
-    """Retrain the ML model with new data"""
+    """Start a background retraining job and return its id right away"""
     try:
-        data = request.get_json()
-        predictor = MLPredictor(current_app.config['ML_MODEL_PATH'])
-        
-        # Update model with new data
-        predictor.update_model(data.get('training_data', []))
-        
+        data = request.get_json() or {}
+        source = data.get('source') or {'type': 'records', 'records': data.get('training_data', [])}
+        warm_start = bool(data.get('warm_start', True))
+        default_epochs = (current_app.config['ML_WARM_START_EPOCHS'] if warm_start
+                          else current_app.config['ML_TRAINING_EPOCHS'])
+
+        try:
+            epochs = _positive_int(data, 'epochs', default_epochs)
+            chunks = make_chunk_source(
+                source,
+                chunk_size=_positive_int(data, 'chunk_size', current_app.config['ML_TRAINING_CHUNK_SIZE']),
+                data_dir=current_app.config['ML_TRAINING_DATA_DIR']
+            )
+        except (KeyError, ValueError) as e:
+            return jsonify({
+                'error': 'Validation error',
+                'message': str(e)
+            }), 400
+
+        job = get_training_jobs().submit(
+            chunks,
+            source=source,
+            model_path=current_app.config['ML_RAIN_MODEL_PATH'],
+            epochs=epochs,
+            warm_start=warm_start
+        )
+        logger.info(f"Training job {job.id} queued ({job.source_type}, warm_start={warm_start})")
+
         return jsonify({
             'success': True,
-            'message': 'Model successfully retrained',
-            'new_version': predictor.model_version
-        }), 200
+            'message': 'Training job accepted',
+            'data': {
+                'job_id': job.id,
+                'status_url': url_for('ml_bp.retrain_status', job_id=job.id),
+                'job': job.to_dict()
+            }
+        }), 202
 
     except Exception as e:
-        logger.error(f"Error retraining model: {str(e)}")
+        logger.error(f"Error starting retraining job: {str(e)}")
         return jsonify({
             'error': 'Training error',
             'message': str(e)
         }), 500
+
+@ml_bp.route('/model/retrain/<string:job_id>', methods=['GET'])
+@limiter.limit("1000/day")
+def retrain_status(job_id):
+    """Get progress of a background retraining job"""
+    job = get_training_jobs().get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Not found',
+            'message': f'Training job {job_id} not found'
+        }), 404
+
+    return jsonify({'success': True, 'data': job.to_dict()}), 200
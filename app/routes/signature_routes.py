@@ -1,12 +1,16 @@
 from flask import jsonify, request, current_app
 from app import db
 from app.models.contract import Contract
+from app.models.chain_event import ChainEvent
 from app.models.settings import Settings
 from app.routes import signature_bp
 from app.services.storacha import StorachaClient
 from app.services.pdf_generator import add_signature_to_pdf
 from app.services.signature_service import SignatureService
-from app.blockchain.web3_client import Web3Client, ContractStatus
+from app.services import anchor_service
+from app.blockchain.web3_client import get_web3_client, ContractStatus
+from app.blockchain.event_indexer import index_in_background
+from app.blockchain import chain_mirror
 from app.utils.validators.marshmallow_schemas import SignatureSchema, TokenRequestSchema
 from app.utils.error_handlers import ValidationError, BlockchainError, StorageError
 from app.utils.cache import cached
@@ -48,10 +52,10 @@ def request_signature(cid):
     try:
         contract = Contract.query.filter_by(initial_cid=cid).first_or_404()
         
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         tx_hash = web3_client.request_signature(contract.id)
         
-        contract.update_status('pending_signature', tx_hash)
+        contract.update_status('pending_signature', tx_hash, confirmed=not web3_client.async_transactions)
         db.session.commit()
         
         return jsonify({
@@ -325,7 +329,7 @@ def sign_contract(cid):
             raise StorageError("Failed to store signed contract", str(e))
         
         # Register in blockchain
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         tx_hash = web3_client.sign_contract(
             contract_id=contract.id,
             original_cid=cid,
@@ -338,10 +342,15 @@ def sign_contract(cid):
             signed_cid=signed_cid,
             signature_metadata=signature_metadata,
             signature_method=signature_method,
-            blockchain_tx=tx_hash
+            blockchain_tx=tx_hash,
+            confirmed=not web3_client.async_transactions
         )
+        if anchor_service.batched_mode():
+            anchor_service.queue_contract(contract.id, signed_cid)
         
         db.session.commit()
+        if anchor_service.batched_mode():
+            anchor_service.anchor_in_background()
         
         return jsonify({
             'success': True,
@@ -405,10 +414,10 @@ def cancel_contract(cid):
     try:
         contract = Contract.query.filter_by(initial_cid=cid).first_or_404()
         
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         tx_hash = web3_client.cancel_contract(contract.id)
         
-        contract.update_status('cancelled', tx_hash)
+        contract.update_status('cancelled', tx_hash, confirmed=not web3_client.async_transactions)
         db.session.commit()
         
         return jsonify({
@@ -437,7 +446,7 @@ def cancel_contract(cid):
 
 @signature_bp.route('/contrato/status/<string:cid>', methods=['GET'])
 @limiter.limit("300/hour")
-@cached(timeout=60)  # Cache for 1 minute
+@cached(expires_in=60, skip_if=chain_mirror.strict_requested)  # Cache for 1 minute
 def get_signature_status(cid):
     """
     Get signature status and details
@@ -450,9 +459,14 @@ def get_signature_status(cid):
         type: string
         required: true
         description: Contract CID (original or signed)
+      - in: query
+        name: strict
+        type: boolean
+        required: false
+        description: Read the chain instead of the indexed mirror
     responses:
       200:
-        description: Signature status and details
+        description: Signature status and details, with the block height they reflect (as_of_block)
       404:
         description: Contract not found
       429:
@@ -463,22 +477,27 @@ def get_signature_status(cid):
     ).first_or_404()
     
     try:
-        web3_client = Web3Client()
-        contract_details = web3_client.get_contract_details(contract.id)
+        web3_client = get_web3_client()
         
-        # Get blockchain events
-        events = web3_client.get_contract_events(contract.id)
+        # Chain state and events come from the indexed tables
+        index_in_background()
+        contract_details, _, as_of_block = chain_mirror.contract_state(
+            web3_client, contract.id, chain_mirror.strict_requested()
+        )
+        events = [event.to_dict() for event in ChainEvent.for_contract(contract.id)]
         
-        # Check IPFS availability
+        # Check IPFS availability of both CIDs in one round
         storacha = StorachaClient(api_key=current_app.config['STORACHA_API_KEY'])
+        availability = storacha.check_many([contract.initial_cid, contract.signed_cid])
         ipfs_status = {
-            'initial': storacha.check_cid_availability(contract.initial_cid),
-            'signed': storacha.check_cid_availability(contract.signed_cid) if contract.signed_cid else None
+            'initial': availability[contract.initial_cid],
+            'signed': availability[contract.signed_cid] if contract.signed_cid else None
         }
         
         response = {
             'contract': contract.to_dict(),
             'blockchain_details': contract_details,
+            'as_of_block': as_of_block,
             'events': events,
             'ipfs_status': ipfs_status
         }
@@ -497,7 +516,7 @@ def get_signature_status(cid):
 
 @signature_bp.route('/contrato/validar/<string:cid>', methods=['GET'])
 @limiter.limit("100/hour")
-@cached(timeout=300)  # Cache for 5 minutes
+@cached(expires_in=300, skip_if=chain_mirror.strict_requested)  # Cache for 5 minutes
 def validate_signature(cid):
     """
     Validate contract signature
@@ -510,9 +529,14 @@ def validate_signature(cid):
         type: string
         required: true
         description: Signed contract CID
+      - in: query
+        name: strict
+        type: boolean
+        required: false
+        description: Read the chain instead of the indexed mirror
     responses:
       200:
-        description: Signature validation result
+        description: Signature validation result, with the block height it reflects (as_of_block)
       404:
         description: Contract not found
       429:
@@ -526,22 +550,27 @@ def validate_signature(cid):
                 'error': 'Contract has not been signed'
             }), 400
             
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         
-        # Get contract details and signature verification
-        contract_details = web3_client.get_contract_details(contract.id)
-        signature_details = web3_client.get_signature_details(contract.id)
+        # Contract and signature state from the same block: the mirror's,
+        # or one batched round trip to the node
+        index_in_background()
+        contract_details, signature_details, as_of_block = chain_mirror.contract_state(
+            web3_client, contract.id, chain_mirror.strict_requested()
+        )
         
-        # Verify IPFS availability
+        # Verify IPFS availability of both CIDs in one round
         storacha = StorachaClient(api_key=current_app.config['STORACHA_API_KEY'])
+        availability = storacha.check_many([contract.initial_cid, cid])
         ipfs_status = {
-            'initial': storacha.check_cid_availability(contract.initial_cid),
-            'signed': storacha.check_cid_availability(cid)
+            'initial': availability[contract.initial_cid],
+            'signed': availability[cid]
         }
         
         response = {
             'contract_details': contract_details,
             'signature_details': signature_details,
+            'as_of_block': as_of_block,
             'ipfs_status': ipfs_status,
             'validation': {
                 'is_valid': (
@@ -3,8 +3,11 @@ from werkzeug.utils import secure_filename
 from app import db
 from app.models.upload import Upload
 from app.routes import storage_bp
-from app.services.storacha import StorachaClient
-from app.blockchain.web3_client import Web3Client
+from app.services.storacha import StorachaClient, get_request_stats
+from app.blockchain.web3_client import get_web3_client
+from app.blockchain import chain_mirror
+from app.blockchain.event_indexer import index_in_background
+from app.services import anchor_service
 from app.utils.validators.marshmallow_schemas import UploadSchema
 from app.utils.error_handlers import ValidationError, StorageError
 from app.utils.cache import cached
@@ -115,12 +118,21 @@ def upload_file():
         
         # Register CID in blockchain
         try:
-            web3_client = Web3Client()
-            tx_hash = web3_client.register_cid(cid, user_id)
-            
-            if tx_hash:
-                upload.update_blockchain_status(tx_hash)
+            if anchor_service.batched_mode():
+                # Anchored with the next Merkle batch; included once its root is on chain
+                anchor_service.queue_cid(cid)
                 db.session.commit()
+                anchor_service.anchor_in_background()
+            else:
+                web3_client = get_web3_client()
+                tx_hash = web3_client.register_cid(cid, user_id)
+                
+                if tx_hash:
+                    upload.update_blockchain_status(
+                        tx_hash,
+                        'pending' if web3_client.async_transactions else 'included'
+                    )
+                    db.session.commit()
                 
         except Exception as e:
             current_app.logger.warning(f"Blockchain registration failed: {str(e)}")
@@ -248,7 +260,7 @@ def get_cid_info(cid):
         is_available = storacha.check_cid_availability(cid)
         
         # Get blockchain status
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
         blockchain_status = web3_client.get_cid_status(cid)
         
         response = upload.to_dict()
@@ -271,7 +283,7 @@ def get_cid_info(cid):
 
 @storage_bp.route('/cids/<string:cid>/verify', methods=['GET'])
 @limiter.limit("100/hour")
-@cached(expires_in=60)  # Cache for 1 minute
+@cached(expires_in=60, skip_if=chain_mirror.strict_requested)  # Cache for 1 minute
 def verify_cid(cid):
     """
     Verify CID integrity across storage and blockchain
@@ -284,9 +296,14 @@ def verify_cid(cid):
         type: string
         required: true
         description: IPFS CID
+      - in: query
+        name: strict
+        type: boolean
+        required: false
+        description: Read the chain instead of the indexed mirror
     responses:
       200:
-        description: Verification result
+        description: Verification result; blockchain.as_of_block is the mirrored block height (null for a live read)
       404:
         description: CID not found
       429:
@@ -296,14 +313,16 @@ def verify_cid(cid):
     
     try:
         storacha = StorachaClient(api_key=current_app.config['STORACHA_API_KEY'])
-        web3_client = Web3Client()
+        web3_client = get_web3_client()
+        strict = chain_mirror.strict_requested()
+        index_in_background()
         
         verification = {
             'ipfs': {
                 'available': storacha.check_cid_availability(cid),
                 'timestamp': upload.created_at.isoformat()
             },
-            'blockchain': web3_client.verify_cid(cid)
+            'blockchain': chain_mirror.verify_cid(web3_client, cid, strict)
         }
         
         return jsonify({
@@ -320,3 +339,20 @@ def verify_cid(cid):
             'error': 'Failed to verify CID',
             'message': str(e)
         }), 500
+
+@storage_bp.route('/storacha/metrics', methods=['GET'])
+@limiter.limit("100/hour")
+def storacha_metrics():
+    """
+    Storacha request count, errors and latency per endpoint in this process
+    ---
+    tags:
+      - Storage
+    responses:
+      200:
+        description: Stats keyed by method and endpoint, e.g. "HEAD /content"
+    """
+    return jsonify({
+        'success': True,
+        'data': get_request_stats()
+    }), 200
@@ -0,0 +1,195 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app
+
+from app import db
+from app.blockchain.merkle import MerkleTree, leaf_hash
+from app.models.anchor import AnchorBatch, AnchorProof
+from app.models.upload import Upload
+
+logger = logging.getLogger(__name__)
+
+def batched_mode() -> bool:
+    return current_app.config.get('ANCHOR_MODE', 'direct') == 'batched'
+
+def item_data(item_type: str, item_key: str) -> bytes:
+    """Raw leaf data of an item (what verify_proof takes)"""
+    return f"{item_type}:{item_key}".encode()
+
+def item_leaf(item_type: str, item_key: str) -> bytes:
+    return leaf_hash(item_data(item_type, item_key))
+
+def queue_item(item_type: str, item_key: str) -> AnchorProof:
+    """Add an item to the next anchor batch in the current DB transaction (idempotent)"""
+    item = AnchorProof.query.filter_by(item_type=item_type, item_key=item_key).first()
+    if item is None:
+        item = AnchorProof(item_type=item_type, item_key=item_key, leaf='0x' + item_leaf(item_type, item_key).hex())
+        db.session.add(item)
+    return item
+
+def queue_cid(cid: str) -> AnchorProof:
+    return queue_item('file', cid)
+
+def queue_contract(contract_id: int, cid: str) -> AnchorProof:
+    return queue_item('contract', f"{contract_id}:{cid}")
+
+def mark_batch(batch: AnchorBatch, status: str, tx_hash: Optional[str] = None,
+               upload_status: str = 'included') -> None:
+    """
+    Record the state of a batch's anchor transaction
+
+    Uploads in an anchored batch get `upload_status` (included, then final
+    once the receipt tracker sees the transaction deep enough). A batch
+    whose transaction was reorganized away goes back to pending, and so do
+    its uploads. Items of a failed batch are released so the next batch
+    picks them up again.
+    """
+    batch.status = status
+    if tx_hash:
+        batch.tx_hash = tx_hash
+    if status in ('anchored', 'pending'):
+        if status == 'anchored' and batch.anchored_at is None:
+            batch.anchored_at = datetime.utcnow()
+        cids = [item.item_key for item in batch.proofs.filter_by(item_type='file')]
+        if cids:
+            for upload in Upload.query.filter(Upload.cid.in_(cids)):
+                upload.update_blockchain_status(batch.tx_hash, upload_status if status == 'anchored' else 'pending')
+    elif status == 'failed':
+        batch.proofs.update({'batch_id': None, 'leaf_index': None, 'proof': None}, synchronize_session=False)
+
+class AnchorService:
+    """
+    Collects queued items over a window and anchors one Merkle root per batch
+
+    A batch is cut when the oldest queued item has waited `window` seconds
+    or `max_leaves` items are queued. Proofs are stored before the root is
+    sent, so verification can start as soon as the root is on chain.
+    """
+
+    def __init__(self, window: float = 300.0, max_leaves: int = 1024, interval: float = 10.0):
+        self.window = window
+        self.max_leaves = max_leaves
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'AnchorService':
+        return cls(
+            window=config.get('ANCHOR_WINDOW_SECONDS', 300),
+            max_leaves=config.get('ANCHOR_MAX_LEAVES', 1024),
+            interval=config.get('ANCHOR_POLL_INTERVAL', 10)
+        )
+
+    def build_batch(self, force: bool = False) -> Optional[AnchorBatch]:
+        """Cut a batch from the queued items if one is due"""
+        queued = AnchorProof.query.filter(AnchorProof.batch_id.is_(None)) \
+            .order_by(AnchorProof.id) \
+            .limit(self.max_leaves) \
+            .all()
+        if not queued:
+            return None
+        oldest = queued[0].updated_at or queued[0].created_at
+        due = len(queued) >= self.max_leaves or \
+            (oldest and datetime.utcnow() - oldest >= timedelta(seconds=self.window))
+        if not (due or force):
+            return None
+
+        batch = AnchorBatch(root='0x', leaf_count=0, status='pending')
+        db.session.add(batch)
+        db.session.flush()
+
+        # Claim the items with a conditional update, so anchorers in other
+        # processes never put the same item in two batches; rows another
+        # anchorer claimed first are left out
+        AnchorProof.query.filter(
+            AnchorProof.id.in_([item.id for item in queued]),
+            AnchorProof.batch_id.is_(None)
+        ).update({'batch_id': batch.id}, synchronize_session=False)
+        claimed = AnchorProof.query.filter_by(batch_id=batch.id).order_by(AnchorProof.id).all()
+        if not claimed:
+            db.session.rollback()
+            return None
+
+        tree = MerkleTree([bytes.fromhex(item.leaf[2:]) for item in claimed])
+        batch.root = '0x' + tree.root.hex()
+        batch.leaf_count = len(claimed)
+        for index, item in enumerate(claimed):
+            item.batch_id = batch.id
+            item.leaf_index = index
+            item.proof = ['0x' + sibling.hex() for sibling in tree.proof(index)]
+        db.session.commit()
+        return batch
+
+    def submit(self, batch: AnchorBatch, client=None) -> AnchorBatch:
+        """Send the batch root on chain"""
+        from app.blockchain.web3_client import get_web3_client
+
+        client = client or get_web3_client()
+        try:
+            tx_hash = client.anchor_root(bytes.fromhex(batch.root[2:]), batch.leaf_count, batch.id)
+            if client.async_transactions:
+                batch.tx_hash = tx_hash  # Resolved by the receipt tracker
+            else:
+                mark_batch(batch, 'anchored', tx_hash)
+        except Exception as e:
+            logger.error(f"Anchoring batch {batch.id} failed: {str(e)}")
+            db.session.rollback()
+            mark_batch(batch, 'failed')
+        db.session.commit()
+        return batch
+
+    def run_once(self, client=None, force: bool = False) -> Optional[AnchorBatch]:
+        batch = self.build_batch(force)
+        if batch is not None:
+            self.submit(batch, client)
+            logger.info(f"Anchor batch {batch.id}: {batch.leaf_count} leaves, root {batch.root} ({batch.status})")
+        return batch
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Anchor pass failed: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+                self._stop.wait(self.interval)
+
+    def start(self, app) -> None:
+        """Start the background thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, args=(app,), name='anchor-service', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+_service: Optional[AnchorService] = None
+_service_lock = threading.Lock()
+
+def get_anchor_service() -> AnchorService:
+    """Get the process-wide anchor service"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AnchorService.from_config(current_app.config)
+    return _service
+
+def anchor_in_background() -> None:
+    """Start the in-process anchor service unless a separate worker cuts batches"""
+    if current_app.config.get('ANCHOR_IN_PROCESS', True):
+        get_anchor_service().start(current_app._get_current_object())
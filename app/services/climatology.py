@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app.utils.grid import GRID_RESOLUTION, grid_index
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 366
+# Half-width (days) of the circular window used to smooth daily statistics
+SMOOTHING_DAYS = 7
+# Day-of-year offset of each month in a leap year, so Feb 29 has its own slot
+_MONTH_OFFSETS = np.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+
+def day_of_year(d: date) -> int:
+    """Zero-based day-of-year slot on a 366-day calendar"""
+    return int(_MONTH_OFFSETS[d.month - 1]) + d.day - 1
+
+def _smooth(totals: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Circular moving average over day-of-year, weighted by sample counts"""
+    kernel = np.ones(2 * SMOOTHING_DAYS + 1, dtype=np.float64)
+    padded_totals = np.concatenate([totals[:, -SMOOTHING_DAYS:], totals, totals[:, :SMOOTHING_DAYS]], axis=1)
+    padded_counts = np.concatenate([counts[:, -SMOOTHING_DAYS:], counts, counts[:, :SMOOTHING_DAYS]], axis=1)
+    window_totals = np.apply_along_axis(np.convolve, 1, padded_totals, kernel, mode='valid')
+    window_counts = np.apply_along_axis(np.convolve, 1, padded_counts, kernel, mode='valid')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_totals / window_counts, np.nan).astype(np.float32)
+
+class ClimatologyTable:
+    """
+    Rain frequency and mean precipitation per grid cell and day-of-year
+
+    Stored as two (cells, 366) float32 arrays plus a cell index, so a
+    lookup is one dict access and one array read.
+    """
+
+    def __init__(self, cells: np.ndarray, rain_frequency: np.ndarray, mean_precipitation: np.ndarray,
+                 resolution: float = GRID_RESOLUTION):
+        self.cells = np.asarray(cells, dtype=np.int32)
+        self.rain_frequency = np.asarray(rain_frequency, dtype=np.float32)
+        self.mean_precipitation = np.asarray(mean_precipitation, dtype=np.float32)
+        self.resolution = resolution
+        self._index = {(int(row), int(col)): i for i, (row, col) in enumerate(self.cells)}
+
+    @classmethod
+    def build(cls, df, resolution: float = GRID_RESOLUTION) -> 'ClimatologyTable':
+        """
+        Build a table from the historical training dataset
+
+        Args:
+            df: DataFrame with latitude, longitude, date and prcp (as index
+                levels or columns), e.g. the output of train_model.collect_weather_data
+            resolution: Grid cell size in degrees
+        """
+        df = df.reset_index() if 'latitude' not in df.columns else df
+        dates = np.asarray(df['date'], dtype='datetime64[D]')
+        months = dates.astype('datetime64[M]').astype(np.int64) % 12
+        days = (dates - dates.astype('datetime64[M]')).astype(np.int64)
+        doy = _MONTH_OFFSETS[months] + days
+
+        rows = np.round(df['latitude'].to_numpy(dtype=np.float64) / resolution).astype(np.int32)
+        cols = np.round(df['longitude'].to_numpy(dtype=np.float64) / resolution).astype(np.int32)
+        cells, cell_ids = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+        cell_ids = cell_ids.ravel()
+
+        prcp = np.nan_to_num(df['prcp'].to_numpy(dtype=np.float64))
+        rain = df['chuva'].to_numpy(dtype=np.float64) if 'chuva' in df.columns else (prcp > 0).astype(np.float64)
+
+        shape = (len(cells), DAYS_PER_YEAR)
+        counts = np.zeros(shape)
+        rain_totals = np.zeros(shape)
+        prcp_totals = np.zeros(shape)
+        np.add.at(counts, (cell_ids, doy), 1)
+        np.add.at(rain_totals, (cell_ids, doy), rain)
+        np.add.at(prcp_totals, (cell_ids, doy), prcp)
+
+        return cls(cells, _smooth(rain_totals, counts), _smooth(prcp_totals, counts), resolution)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            cells=self.cells,
+            rain_frequency=self.rain_frequency,
+            mean_precipitation=self.mean_precipitation,
+            resolution=np.float64(self.resolution)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'ClimatologyTable':
+        with np.load(path) as data:
+            return cls(
+                data['cells'],
+                data['rain_frequency'],
+                data['mean_precipitation'],
+                float(data['resolution'])
+            )
+
+    def lookup(self, lat: float, lon: float, d: date) -> Optional[Tuple[float, float]]:
+        """
+        Get (rain frequency, mean precipitation mm) for a location and date
+
+        Returns:
+            tuple: Climatology values, or None if the cell is not covered
+        """
+        i = self._index.get(grid_index(lat, lon, self.resolution))
+        if i is None:
+            return None
+        slot = day_of_year(d)
+        frequency = self.rain_frequency[i, slot]
+        if np.isnan(frequency):
+            return None
+        return float(frequency), float(self.mean_precipitation[i, slot])
+
+    def climatology_day(self, lat: float, lon: float, d: date) -> Optional[Dict]:
+        """Build a daily entry shaped like a processed forecast day"""
+        values = self.lookup(lat, lon, d)
+        if values is None:
+            return None
+        frequency, precipitation = values
+        return {
+            'date': d.isoformat(),
+            'temp': {'min': None, 'max': None, 'day': None},
+            'humidity': None,
+            'wind_speed': None,
+            'rain_prob': round(frequency, 4),
+            'rain_amount': round(precipitation, 2),
+            'weather': {'main': None, 'description': 'climatology', 'icon': None},
+            'source': 'climatology'
+        }
+
+_table: Optional[ClimatologyTable] = None
+_table_mtime: Optional[float] = None
+_table_lock = threading.Lock()
+
+def get_climatology() -> Optional[ClimatologyTable]:
+    """
+    Get the process-wide climatology table from CLIMATOLOGY_PATH
+
+    The file is reloaded when it changes on disk.
+
+    Returns:
+        ClimatologyTable: Loaded table, or None if no table has been built
+    """
+    global _table, _table_mtime
+    path = current_app.config.get('CLIMATOLOGY_PATH')
+    if not path or not os.path.exists(path):
+        return None
+
+    mtime = os.path.getmtime(path)
+    if _table is None or mtime != _table_mtime:
+        with _table_lock:
+            if _table is None or mtime != _table_mtime:
+                try:
+                    _table = ClimatologyTable.load(path)
+                    _table_mtime = mtime
+                    logger.info(f"Loaded climatology table for {len(_table.cells)} grid cells")
+                except Exception as e:
+                    logger.error(f"Failed to load climatology table: {str(e)}")
+                    return _table
+    return _table
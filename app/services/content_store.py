@@ -0,0 +1,198 @@
+"""
+Local content-addressed store for IPFS content
+
+Content behind a CID never changes, so it can be kept on disk for as long
+as there is room. Each entry is <root>/<shard>/<cid> with a <cid>.sha256
+sidecar that is checked on every read; an entry that fails the check is
+deleted and reported as a miss. The shard is the two characters before
+the CID's last one (the go-ipfs flatfs "next-to-last/2" layout), since
+the leading characters are the same for every CID of a version ('Qm',
+'bafy') and would put everything in one directory.
+
+The store is bounded by max_bytes. Reads touch an entry's mtime, and
+when a write takes the store past the bound the least recently used
+entries are deleted down to LOW_WATER of it. Files of mmap_threshold
+bytes or more are returned as read-only mmaps instead of being copied
+into memory.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from typing import Iterator, Optional, Tuple, Union
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# bytes, or a read-only mmap for large files; both support the buffer protocol
+Content = Union[bytes, mmap.mmap]
+
+DIGEST_SUFFIX = '.sha256'
+TEMP_PREFIX = '.tmp-'
+
+class ContentStore:
+    """Size-bounded, integrity-checked disk cache of content keyed by CID"""
+
+    # Eviction frees space down to this fraction of max_bytes
+    LOW_WATER = 0.9
+
+    def __init__(self, root: str, max_bytes: int, mmap_threshold: int = 8 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # Estimate; recounted on eviction
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, cid: str) -> str:
+        # CIDs are base58 or base32, which also keeps them from escaping root
+        if len(cid) < 3 or not cid.isalnum():
+            raise ValueError(f"Invalid CID: {cid!r}")
+        return os.path.join(self.root, cid[-3:-1], cid)
+
+    def get(self, cid: str) -> Optional[Content]:
+        """Content stored under cid, or None if it is missing or corrupt"""
+        path = self._path(cid)
+        try:
+            with open(path + DIGEST_SUFFIX) as f:
+                expected = f.read().strip()
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size and size >= self.mmap_threshold:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    content = f.read()
+        except FileNotFoundError:
+            return None
+
+        if hashlib.sha256(content).hexdigest() != expected:
+            logger.warning(f"Content store entry for {cid} failed its integrity check")
+            if isinstance(content, mmap.mmap):
+                content.close()
+            self.discard(cid)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Evicted by another process since it was opened
+        return content
+
+    def put(self, cid: str, content: bytes) -> None:
+        """Store content under cid (write-once; an existing entry is only touched)"""
+        path = self._path(cid)
+        if os.path.exists(path) and os.path.exists(path + DIGEST_SUFFIX):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The digest goes first, so a reader never sees content without one
+        self._write(path + DIGEST_SUFFIX, hashlib.sha256(content).hexdigest().encode('ascii'))
+        self._write(path, content)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(content)
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def discard(self, cid: str) -> None:
+        """Delete the entry for cid, if any"""
+        self._remove(self._path(cid))
+
+    def evict(self) -> int:
+        """
+        Delete least recently used entries until the store fits its bound
+
+        Sizes are recounted from disk, so space freed or used by other
+        processes sharing the directory is taken into account.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            if total > self.max_bytes:
+                target = int(self.max_bytes * self.LOW_WATER)
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    self._remove(path)
+                    total -= size
+                    removed += 1
+            self._size = total
+        if removed:
+            logger.info(f"Evicted {removed} entries from the content store")
+        return removed
+
+    def _entries(self) -> Iterator[Tuple[float, int, str]]:
+        """(mtime, size, path) of every stored entry"""
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(DIGEST_SUFFIX) or entry.name.startswith(TEMP_PREFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        """Write data to path atomically (temp file in the same directory, then rename)"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        for name in (path, path + DIGEST_SUFFIX):
+            try:
+                os.unlink(name)
+            except FileNotFoundError:
+                pass
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+def get_content_store() -> Optional[ContentStore]:
+    """
+    Get the process-wide content store under CONTENT_STORE_PATH
+
+    Returns None (no local caching) when CONTENT_STORE_PATH is empty or
+    there is no app context to configure the store from.
+    """
+    global _store
+    if _store is None and has_app_context():
+        root = current_app.config.get('CONTENT_STORE_PATH')
+        if not root:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = ContentStore(
+                    root,
+                    current_app.config.get('CONTENT_STORE_MAX_BYTES', 1024 ** 3),
+                    current_app.config.get('CONTENT_STORE_MMAP_THRESHOLD', 8 * 1024 * 1024)
+                )
+    return _store
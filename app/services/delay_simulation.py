@@ -0,0 +1,191 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_SCENARIOS = 1000
+# Scenarios are simulated up to this multiple of the planned duration
+HORIZON_FACTOR = 3
+# Upper bound on random draws held in memory at once (contracts x scenarios x days)
+MAX_CHUNK_ELEMENTS = 4_000_000
+
+def positive_int(value, name: str) -> int:
+    """
+    Validate a count such as planned days or scenarios
+
+    Accepts integers, and integral floats or numeric strings.
+
+    Raises:
+        ValueError: If the value is missing, non-numeric, fractional or below 1
+    """
+    if isinstance(value, bool) or value is None or (isinstance(value, str) and not value.strip()):
+        raise ValueError(f"{name} must be a positive integer")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a positive integer")
+    if not number.is_integer() or number < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return int(number)
+
+def rain_probability_matrix(pop_rows: Sequence[Sequence[float]], horizon: int,
+                            fallback: Sequence[float]) -> np.ndarray:
+    """
+    Pad per-contract daily rain probabilities to a common horizon
+
+    Args:
+        pop_rows: Daily probability of precipitation for each contract
+        horizon: Number of simulated days
+        fallback: Probability used for each contract's days past its data
+
+    Returns:
+        np.ndarray: (contracts, horizon) float32 matrix
+    """
+    pop = np.empty((len(pop_rows), horizon), dtype=np.float32)
+    pop[:] = np.asarray(fallback, dtype=np.float32)[:, None]
+    for i, row in enumerate(pop_rows):
+        known = min(len(row), horizon)
+        if known:
+            pop[i, :known] = row[:known]
+    return np.clip(pop, 0.0, 1.0)
+
+def simulate_delays(pop: np.ndarray, planned_days: np.ndarray, n_scenarios: int = DEFAULT_SCENARIOS,
+                    rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample weather scenarios and return the delay of each one
+
+    Every simulated day rains with the contract's probability for that day;
+    rainy days are lost workdays, so a contract completes on the day its
+    planned number of dry days is reached. Scenarios that do not finish
+    within the horizon are capped at the horizon.
+
+    Args:
+        pop: (contracts, horizon) daily rain probabilities
+        planned_days: (contracts,) planned workdays
+        n_scenarios: Scenarios per contract
+        rng: Random generator (seed it for reproducible results)
+
+    Returns:
+        tuple: (contracts, n_scenarios) int16 delays in days, and a boolean
+        array of the same shape marking scenarios that did not finish
+
+    Raises:
+        ValueError: If n_scenarios or any planned duration is below 1
+    """
+    n_scenarios = positive_int(n_scenarios, 'n_scenarios')
+    planned_days = np.asarray(planned_days)
+    if planned_days.size and planned_days.min() < 1:
+        raise ValueError("planned_days must be a positive integer")
+    rng = rng or np.random.default_rng()
+    contracts, horizon = pop.shape
+    planned_days = planned_days.astype(np.int16)
+    delays = np.empty((contracts, n_scenarios), dtype=np.int16)
+    capped = np.empty((contracts, n_scenarios), dtype=bool)
+
+    chunk = max(1, MAX_CHUNK_ELEMENTS // (n_scenarios * horizon))
+    for start in range(0, contracts, chunk):
+        stop = min(start + chunk, contracts)
+        planned = planned_days[start:stop, None, None]
+
+        dry = rng.random((stop - start, n_scenarios, horizon), dtype=np.float32) >= pop[start:stop, None, :]
+        done = np.cumsum(dry, axis=2, dtype=np.int16) >= planned
+
+        # Index of the first day on which the planned dry days are reached
+        elapsed = np.where(done[..., -1], done.argmax(axis=2) + 1, horizon)
+        delays[start:stop] = elapsed - planned[..., 0]
+        capped[start:stop] = ~done[..., -1]
+
+    return delays, capped
+
+def summarize_delays(delays: np.ndarray, capped: np.ndarray, start_date: date, planned_days: int,
+                     horizon: int) -> Dict:
+    """
+    Summarize one contract's simulated delays as a JSON-serializable distribution
+
+    Completion dates follow the WeatherPrediction convention of
+    start_date + duration days. capped_fraction is the share of scenarios
+    that did not finish within the simulated horizon (`capped`); one that
+    finishes on its last day is not counted.
+    """
+    p50, p90 = np.percentile(delays, [50, 90])
+    p50, p90 = int(np.ceil(p50)), int(np.ceil(p90))
+    histogram = np.bincount(delays.astype(np.int64))
+
+    return {
+        'method': 'monte_carlo',
+        'n_scenarios': int(delays.size),
+        'horizon_days': horizon,
+        'mean_delay_days': round(float(delays.mean()), 2),
+        'p50_delay_days': p50,
+        'p90_delay_days': p90,
+        'p50_completion_date': (start_date + timedelta(days=planned_days + p50)).isoformat(),
+        'p90_completion_date': (start_date + timedelta(days=planned_days + p90)).isoformat(),
+        'capped_fraction': round(float(capped.mean()), 4),
+        'histogram': histogram.tolist()
+    }
+
+class DelaySimulator:
+    """Monte Carlo delay distributions for one or many contracts"""
+
+    def __init__(self, n_scenarios: int = DEFAULT_SCENARIOS, base_rain_probability: float = 0.3,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            n_scenarios: Scenarios sampled per contract
+            base_rain_probability: Daily rain probability when a contract has no data at all
+            seed: Optional seed for reproducible distributions
+
+        Raises:
+            ValueError: If n_scenarios is not a positive integer
+        """
+        self.n_scenarios = positive_int(n_scenarios, 'n_scenarios')
+        self.base_rain_probability = base_rain_probability
+        self.seed = seed
+
+    @classmethod
+    def from_config(cls, config) -> 'DelaySimulator':
+        return cls(
+            n_scenarios=config.get('DELAY_SIMULATION_SCENARIOS', DEFAULT_SCENARIOS),
+            base_rain_probability=config.get('BASE_RAIN_PROBABILITY', 0.3),
+            seed=config.get('DELAY_SIMULATION_SEED')
+        )
+
+    def simulate(self, start_dates: Sequence[date], planned_days: Sequence[int],
+                 daily_forecasts: Sequence[Sequence[Dict]]) -> List[Dict]:
+        """
+        Simulate delay distributions for a batch of contracts
+
+        Args:
+            start_dates: Planned start date of each contract
+            planned_days: Planned duration of each contract
+            daily_forecasts: Daily forecast dicts ('rain_prob') for each contract
+
+        Returns:
+            list: Delay distribution dict for each contract
+
+        Raises:
+            ValueError: If a planned duration is not a positive integer
+        """
+        if not len(planned_days):
+            return []
+        planned_days = [positive_int(days, 'planned_days') for days in planned_days]
+
+        pop_rows = [[day.get('rain_prob') or 0 for day in days] for days in daily_forecasts]
+        fallback = [float(np.mean(row)) if row else self.base_rain_probability for row in pop_rows]
+        horizon = int(max(planned_days)) * HORIZON_FACTOR
+
+        pop = rain_probability_matrix(pop_rows, horizon, fallback)
+        delays, capped = simulate_delays(
+            pop,
+            np.asarray(planned_days),
+            self.n_scenarios,
+            np.random.default_rng(self.seed)
+        )
+        return [
+            summarize_delays(delays[i], capped[i], start_dates[i], planned_days[i], horizon)
+            for i in range(len(planned_days))
+        ]
+
+    def simulate_contract(self, start_date: date, planned_days: int, daily_forecast: Sequence[Dict]) -> Dict:
+        """Simulate the delay distribution of a single contract"""
+        return self.simulate([start_date], [planned_days], [daily_forecast])[0]
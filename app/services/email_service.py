@@ -65,6 +65,9 @@ def send_contract_email(recipient_email: str, contract: 'Contract', cid: str):
         recipient_email: Recipient's email address
         contract: Contract instance
         cid: IPFS CID of the contract
+        
+    Returns:
+        bool: True if the email was sent
     """
     email_service = EmailService()
     
@@ -121,7 +124,7 @@ def send_contract_email(recipient_email: str, contract: 'Contract', cid: str):
     )
     
     # Send email
-    email_service.send_email(
+    return email_service.send_email(
         to_email=recipient_email,
         subject=f"Painting Contract for Review - {contract.title}",
         html_content=email_content
@@ -0,0 +1,241 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app.utils.grid import grid_cell
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever WEATHER_FEATURES or weather_feature_row changes
+FEATURE_SCHEMA_VERSION = 1
+WEATHER_FEATURES = (
+    'temp_min',
+    'temp_max',
+    'temp_day',
+    'humidity',
+    'wind_speed',
+    'rain_prob',
+    'rain_amount'
+)
+RAIN_PROB_COLUMN = WEATHER_FEATURES.index('rain_prob')
+
+def day_date(day: Dict) -> date:
+    """Get the calendar date of a daily forecast (ISO string or unix timestamp)"""
+    value = day.get('date', day.get('dt'))
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value).date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def weather_feature_row(day: Dict) -> np.ndarray:
+    """
+    Build the float32 feature row for one daily forecast
+
+    Accepts both the WeatherService format ('temp': {'min', 'max', 'day'})
+    and the flattened WeatherPrediction format ('temp_min', 'temp_max').
+    Missing values become NaN.
+    """
+    temp = day.get('temp') if isinstance(day.get('temp'), dict) else {}
+
+    def value(*candidates):
+        for candidate in candidates:
+            if candidate is not None:
+                return candidate
+        return np.nan
+
+    return np.array([
+        value(temp.get('min'), day.get('temp_min')),
+        value(temp.get('max'), day.get('temp_max')),
+        value(temp.get('day'), day.get('temp_day')),
+        value(day.get('humidity')),
+        value(day.get('wind_speed')),
+        value(day.get('rain_prob'), day.get('pop'), 0.0),
+        value(day.get('rain_amount'), day.get('rain'), 0.0)
+    ], dtype=np.float32)
+
+class RedisFeatureBackend:
+    """Feature rows as raw float32 bytes in Redis, one key per (cell, date)"""
+
+    def __init__(self, redis_client, schema_version: int, ttl: int):
+        self.redis = redis_client
+        self.schema_version = schema_version
+        self.ttl = ttl
+
+    def _key(self, cell: str, day: date) -> str:
+        return f"features:v{self.schema_version}:{cell}:{day.isoformat()}"
+
+    def get_many(self, cell: str, days: Sequence[date]) -> List[Optional[np.ndarray]]:
+        values = self.redis.mget([self._key(cell, d) for d in days])
+        return [np.frombuffer(v, dtype=np.float32) if v else None for v in values]
+
+    def put_many(self, cell: str, rows: Dict[date, np.ndarray]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for day, row in rows.items():
+            pipe.setex(self._key(cell, day), self.ttl, row.astype(np.float32).tobytes())
+        pipe.execute()
+
+class MemmapFeatureBackend:
+    """
+    Feature rows in one memory-mapped float32 file per grid cell
+
+    Row i holds the features for EPOCH + i days; NaN rows are missing. A
+    float64 file next to it holds the unix time each row was written, and
+    rows older than `ttl` seconds are treated as missing, like the Redis
+    keys that expire.
+    """
+
+    EPOCH = date(2000, 1, 1)
+    SPAN_DAYS = 40 * 366
+
+    def __init__(self, root: str, schema_version: int, ttl: int = 10800):
+        self.root = os.path.join(root, f"v{schema_version}")
+        self.ttl = ttl
+        self._maps: Dict[str, Tuple[np.memmap, np.memmap]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def _open(path: str, shape, dtype, fill) -> np.memmap:
+        if os.path.exists(path):
+            return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+        mapped = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+        mapped[:] = fill
+        mapped.flush()
+        return mapped
+
+    def _map(self, cell: str) -> Tuple[np.memmap, np.memmap]:
+        """Get a cell's (rows, write times) maps"""
+        maps = self._maps.get(cell)
+        if maps is not None:
+            return maps
+        with self._lock:
+            if cell not in self._maps:
+                self._maps[cell] = (
+                    self._open(os.path.join(self.root, f"{cell}.f32"),
+                               (self.SPAN_DAYS, len(WEATHER_FEATURES)), np.float32, np.nan),
+                    self._open(os.path.join(self.root, f"{cell}.t64"), (self.SPAN_DAYS,), np.float64, 0.0)
+                )
+            return self._maps[cell]
+
+    def _offsets(self, days: Sequence[date]) -> np.ndarray:
+        offsets = np.fromiter(((d - self.EPOCH).days for d in days), dtype=np.int64, count=len(days))
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= self.SPAN_DAYS):
+            raise ValueError("Date outside feature store range")
+        return offsets
+
+    def get_many(self, cell: str, days: Sequence[date]) -> List[Optional[np.ndarray]]:
+        all_rows, written = self._map(cell)
+        offsets = self._offsets(days)
+        rows = all_rows[offsets]
+        missing = np.isnan(rows).all(axis=1) | (written[offsets] < time.time() - self.ttl)
+        return [None if missing[i] else rows[i] for i in range(len(days))]
+
+    def put_many(self, cell: str, rows: Dict[date, np.ndarray]) -> None:
+        days = list(rows)
+        all_rows, written = self._map(cell)
+        offsets = self._offsets(days)
+        all_rows[offsets] = np.stack([rows[d] for d in days])
+        written[offsets] = time.time()
+
+class FeatureStore:
+    """
+    Precomputed weather feature rows keyed by (grid cell, date, schema version)
+
+    Contracts in the same grid cell share rows, so preparing model inputs
+    is a batched lookup plus a matrix stack; only missing rows are built
+    from the forecast dicts (and written back).
+    """
+
+    def __init__(self, backend, schema_version: int = FEATURE_SCHEMA_VERSION):
+        self.backend = backend
+        self.schema_version = schema_version
+
+    def put_days(self, lat: float, lon: float, days: Sequence[Dict]) -> None:
+        """Store feature rows for a list of daily forecasts"""
+        rows = {day_date(day): weather_feature_row(day) for day in days}
+        if rows:
+            self.backend.put_many(grid_cell(lat, lon), rows)
+
+    def get_matrix(self, lat: float, lon: float, days: Sequence[Dict]) -> np.ndarray:
+        """
+        Get the (len(days), n_features) float32 input matrix for daily forecasts
+
+        Args:
+            lat: Latitude of the contract location
+            lon: Longitude of the contract location
+            days: Daily forecast dicts (used to build rows missing from the store)
+        """
+        if not days:
+            return np.empty((0, len(WEATHER_FEATURES)), dtype=np.float32)
+
+        cell = grid_cell(lat, lon)
+        dates = [day_date(day) for day in days]
+        try:
+            rows = self.backend.get_many(cell, dates)
+        except Exception as e:
+            logger.warning(f"Feature store lookup failed: {str(e)}")
+            rows = [None] * len(days)
+
+        missing = {}
+        for i, row in enumerate(rows):
+            if row is None:
+                rows[i] = missing[dates[i]] = weather_feature_row(days[i])
+        if missing:
+            try:
+                self.backend.put_many(cell, missing)
+            except Exception as e:
+                logger.warning(f"Feature store write failed: {str(e)}")
+
+        return np.stack(rows).astype(np.float32, copy=False)
+
+class NullFeatureStore(FeatureStore):
+    """Feature store that always builds rows (caching disabled)"""
+
+    def __init__(self):
+        super().__init__(backend=None)
+
+    def put_days(self, lat: float, lon: float, days: Sequence[Dict]) -> None:
+        pass
+
+    def get_matrix(self, lat: float, lon: float, days: Sequence[Dict]) -> np.ndarray:
+        if not days:
+            return np.empty((0, len(WEATHER_FEATURES)), dtype=np.float32)
+        return np.stack([weather_feature_row(day) for day in days])
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+def get_feature_store() -> FeatureStore:
+    """
+    Get the process-wide feature store configured by FEATURE_STORE_BACKEND
+
+    'redis' uses the app cache connection, 'memmap' uses files under
+    FEATURE_STORE_PATH, anything else disables caching.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = current_app.config.get('FEATURE_STORE_BACKEND', 'redis')
+                if backend == 'redis':
+                    _store = FeatureStore(RedisFeatureBackend(
+                        current_app.cache.redis,
+                        FEATURE_SCHEMA_VERSION,
+                        current_app.config.get('FEATURE_STORE_TTL', 10800)
+                    ))
+                elif backend == 'memmap':
+                    _store = FeatureStore(MemmapFeatureBackend(
+                        current_app.config['FEATURE_STORE_PATH'],
+                        FEATURE_SCHEMA_VERSION,
+                        current_app.config.get('FEATURE_STORE_TTL', 10800)
+                    ))
+                else:
+                    _store = NullFeatureStore()
+    return _store
@@ -1,11 +1,15 @@
 import json
 import os
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
 import numpy as np
 from flask import current_app
 
+from app.services.feature_store import RAIN_PROB_COLUMN, NullFeatureStore, get_feature_store
+from app.utils.grid import location_coordinates
+
 # Only try to import tensorflow if not in test environment
 TENSORFLOW_AVAILABLE = False
 if not os.environ.get('TESTING'):
@@ -16,12 +20,25 @@ if not os.environ.get('TESTING'):
     except ImportError:
         pass
 
+def model_version(model_path: str) -> str:
+    """Derive a version label from a model file name and modification time"""
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return f"{name}-{int(os.path.getmtime(model_path))}"
+
+def load_keras_model(model_path: str):
+    """Load a Keras model from disk"""
+    return tf.keras.models.load_model(model_path)
+
 class MockMLPredictor:
     """Mock ML predictor for testing"""
     def predict_duration(self, features: Dict) -> int:
         """Mock prediction of contract duration"""
         return 7  # Default prediction of 7 days
     
+    def predict_duration_batch(self, features_list: List[Dict]) -> List[int]:
+        """Mock prediction of several contract durations"""
+        return [self.predict_duration(features) for features in features_list]
+    
     def predict_weather_impact(self, weather_data: Dict) -> float:
         """Mock prediction of weather impact"""
         return 0.0  # No weather impact in mock
@@ -29,14 +46,14 @@ class MockMLPredictor:
 class MLPredictor:
     """ML predictor for contract duration and weather impact"""
     def __init__(self):
-        if not TENSORFLOW_AVAILABLE:
-            self._mock = MockMLPredictor()
-        else:
+        self.model_version = 'mock'
+        # Also the fallback when a loaded model fails to predict
+        self._mock = MockMLPredictor()
+        if TENSORFLOW_AVAILABLE:
             model_path = current_app.config.get('ML_MODEL_PATH')
             if model_path and os.path.exists(model_path):
-                self.model = tf.keras.models.load_model(model_path)
-            else:
-                self._mock = MockMLPredictor()
+                self.model = load_keras_model(model_path)
+                self.model_version = model_version(model_path)
     
     def predict_duration(self, features: Dict) -> int:
         """
@@ -54,12 +71,39 @@ class MLPredictor:
         try:
             # Convert features to model input format
             input_data = self._prepare_features(features)
+            started = time.perf_counter()
             prediction = self.model.predict(input_data)
+            self._shadow_score(input_data, prediction, (time.perf_counter() - started) * 1000.0)
             return int(round(prediction[0]))
         except Exception as e:
             current_app.logger.error(f"ML prediction failed: {str(e)}")
             return self._mock.predict_duration(features)
     
+    def predict_duration_batch(self, features_list: List[Dict]) -> List[int]:
+        """
+        Predict contract durations for several contracts in one model call
+        
+        Args:
+            features_list: List of contract feature dictionaries
+            
+        Returns:
+            list: Predicted duration in days for each contract
+        """
+        if not features_list:
+            return []
+        if not hasattr(self, 'model'):
+            return self._mock.predict_duration_batch(features_list)
+            
+        try:
+            input_data = self._prepare_feature_batch(features_list)
+            started = time.perf_counter()
+            predictions = self.model.predict(input_data, verbose=0)
+            self._shadow_score(input_data, predictions, (time.perf_counter() - started) * 1000.0)
+            return [int(round(float(p))) for p in np.ravel(predictions)]
+        except Exception as e:
+            current_app.logger.error(f"Batch ML prediction failed: {str(e)}")
+            return self._mock.predict_duration_batch(features_list)
+    
     def predict_weather_impact(self, weather_data: Dict) -> float:
         """
         Predict weather impact on contract duration
@@ -81,19 +125,54 @@ class MLPredictor:
             current_app.logger.error(f"Weather impact prediction failed: {str(e)}")
             return self._mock.predict_weather_impact(weather_data)
     
+    def _shadow_score(self, input_data: np.ndarray, prediction: np.ndarray, latency_ms: float) -> None:
+        """Hand the served batch to the shadow scorer without waiting on it"""
+        try:
+            from app.services.shadow_scoring import get_shadow_scorer
+            scorer = get_shadow_scorer()
+            if scorer is not None:
+                scorer.record_served(self.model_version, len(input_data), latency_ms)
+                scorer.submit(input_data, prediction)
+        except Exception as e:
+            current_app.logger.warning(f"Shadow scoring skipped: {str(e)}")
+    
     def _prepare_features(self, features: Dict) -> np.ndarray:
         """Prepare features for model input"""
-        # Feature preparation logic here
-        return np.array([[
-            features.get('area', 0),
-            features.get('complexity', 1),
-            features.get('workers', 1)
-        ]])
+        return self._prepare_feature_batch([features])
+    
+    @staticmethod
+    def _prepare_feature_batch(features_list: List[Dict]) -> np.ndarray:
+        """Stack contract features into a float32 (n, 3) model input"""
+        return np.array([
+            (
+                features.get('area', 0),
+                features.get('complexity', 1),
+                features.get('workers', 1)
+            )
+            for features in features_list
+        ], dtype=np.float32)
+    
+    def weather_feature_matrix(self, weather_data: Dict) -> np.ndarray:
+        """
+        Get the float32 weather feature matrix for a forecast
+        
+        Rows come from the feature store (keyed by grid cell, date and
+        feature schema version); only rows it does not hold are rebuilt
+        from the daily forecast dicts.
+        """
+        days = weather_data.get('daily', [])
+        coordinates = location_coordinates(weather_data.get('location', {}))
+        if coordinates is None:
+            return NullFeatureStore().get_matrix(0.0, 0.0, days)
+        return get_feature_store().get_matrix(coordinates[0], coordinates[1], days)
     
     def _analyze_weather(self, weather_data: Dict) -> float:
         """Analyze weather data for impact prediction"""
-        # Weather analysis logic here
-        return 0.0
+        matrix = self.weather_feature_matrix(weather_data)
+        if not len(matrix):
+            return 0.0
+        # Mean daily probability of precipitation over the contract period
+        return float(np.nanmean(matrix[:, RAIN_PROB_COLUMN]))
 
     def retrain_model(self, df):
         """
@@ -106,36 +185,26 @@ class MLPredictor:
             current_app.logger.warning("TensorFlow not available, skipping model retraining.")
             return
         
-        import tensorflow as tf
-        from tensorflow.keras.models import Sequential
-        from tensorflow.keras.layers import Dense, Dropout
-        from tensorflow.keras.optimizers import Adam
         from sklearn.model_selection import train_test_split
+        from app.services.training_pipeline import FEATURE_COLUMNS, TARGET_COLUMN, build_rain_model
         
         try:
             # Extract features and target
-            X = df[['tavg', 'tmin', 'tmax', 'prcp']].values
-            y = df['chuva'].values
+            X = df[FEATURE_COLUMNS].values
+            y = df[TARGET_COLUMN].values
             
             # Split data into train and test sets
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
             # Build the model
-            model = Sequential([
-                Dense(32, activation='relu', input_shape=(4,)),
-                Dropout(0.2),
-                Dense(16, activation='relu'),
-                Dropout(0.2),
-                Dense(1, activation='sigmoid')
-            ])
-            
-            model.compile(optimizer=Adam(), loss='binary_crossentropy', metrics=['accuracy'])
+            model = build_rain_model()
             
             # Train the model
             model.fit(X_train, y_train, epochs=10, batch_size=32, validation_data=(X_test, y_test), verbose=1)
             
             # Save the model
-            model_path = os.path.join(os.getcwd(), 'ml_rain_predictor.h5')
+            model_path = current_app.config.get('ML_RAIN_MODEL_PATH') or \
+                os.path.join(os.getcwd(), 'ml_rain_predictor.h5')
             model.save(model_path)
             
             # Update the model attribute
@@ -1,11 +1,11 @@
-from app.blockchain.web3_client import Web3Client
+from app.blockchain.web3_client import get_web3_client
 from app.utils.logger import get_logger
 
 logger = get_logger()
 
 class OracleService:
     def __init__(self):
-        self.web3_client = Web3Client()
+        self.web3_client = get_web3_client()
         self.contract = self.web3_client.get_storage_contract()
 
     def store_oracle_data(self, oracle_type: str, data_hash: str, adjusted_days: int, original_duration: int, recommended_duration: int):
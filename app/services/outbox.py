@@ -0,0 +1,341 @@
+import logging
+import os
+import random
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import or_
+
+from app import db
+from app.services import anchor_service
+from app.models.chain_event import ChainEvent
+from app.models.contract import Contract
+from app.models.outbox import OutboxMessage
+from app.models.pending_transaction import PendingTransaction
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[OutboxMessage], Optional[Dict]]] = {}
+
+def handler(kind: str):
+    """Register the function that performs one kind of outbox message"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+def enqueue(kind: str, aggregate_type: str, aggregate_id: int, payload: Optional[Dict] = None,
+            idempotency_key: Optional[str] = None) -> OutboxMessage:
+    """
+    Record a side effect in the current DB transaction
+
+    Nothing is sent until the caller commits; a rollback discards the
+    message with the rest of the change. Enqueuing the same idempotency
+    key twice returns the existing message.
+    """
+    key = idempotency_key or f"{kind}:{aggregate_type}:{aggregate_id}"
+    existing = OutboxMessage.query.filter_by(idempotency_key=key).first()
+    if existing:
+        return existing
+
+    message = OutboxMessage(
+        kind=kind,
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        payload=payload or {},
+        idempotency_key=key,
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(message)
+    return message
+
+def messages_for(aggregate_type: str, aggregate_id: int) -> List[OutboxMessage]:
+    return OutboxMessage.query \
+        .filter_by(aggregate_type=aggregate_type, aggregate_id=aggregate_id) \
+        .order_by(OutboxMessage.id) \
+        .all()
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter (seconds)"""
+    return random.uniform(0, min(cap, base * (2 ** (attempts - 1))))
+
+class OutboxDispatcher:
+    """
+    Drains the outbox with a pool of worker threads
+
+    Due messages are claimed with a conditional update (pending -> processing),
+    so several dispatchers across processes never run the same message at
+    once. A handler's DB changes and the message's completion are committed
+    together; failures are retried with backoff until max_attempts, then
+    the message is marked dead. Messages left in processing by a crashed
+    worker are reclaimed after lock_timeout.
+    """
+
+    def __init__(self, workers: int = 4, batch_size: int = 20, interval: float = 1.0,
+                 max_attempts: int = 8, backoff_base: float = 5.0, backoff_max: float = 900.0,
+                 lock_timeout: float = 300.0):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock_timeout = lock_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'OutboxDispatcher':
+        return cls(
+            workers=config.get('OUTBOX_WORKERS', 4),
+            batch_size=config.get('OUTBOX_BATCH_SIZE', 20),
+            interval=config.get('OUTBOX_POLL_INTERVAL', 1.0),
+            max_attempts=config.get('OUTBOX_MAX_ATTEMPTS', 8),
+            backoff_base=config.get('OUTBOX_BACKOFF_BASE', 5.0),
+            backoff_max=config.get('OUTBOX_BACKOFF_MAX', 900.0),
+            lock_timeout=config.get('OUTBOX_LOCK_TIMEOUT', 300.0)
+        )
+
+    def claim(self) -> List[int]:
+        """Claim up to batch_size due messages for this worker"""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lock_timeout)
+        candidates = db.session.query(OutboxMessage.id).filter(
+            or_(
+                (OutboxMessage.status == 'pending') & (OutboxMessage.next_attempt_at <= now),
+                (OutboxMessage.status == 'processing') & (OutboxMessage.locked_at < stale)
+            )
+        ).order_by(OutboxMessage.next_attempt_at).limit(self.batch_size).all()
+
+        claimed = []
+        for (message_id,) in candidates:
+            updated = OutboxMessage.query.filter(
+                OutboxMessage.id == message_id,
+                or_(
+                    OutboxMessage.status == 'pending',
+                    (OutboxMessage.status == 'processing') & (OutboxMessage.locked_at < stale)
+                )
+            ).update({'status': 'processing', 'locked_by': self.worker_id, 'locked_at': now},
+                     synchronize_session=False)
+            if updated:
+                claimed.append(message_id)
+        db.session.commit()
+        return claimed
+
+    def process(self, message_id: int) -> bool:
+        """
+        Run one claimed message
+
+        Returns:
+            bool: True if the side effect completed
+        """
+        message = OutboxMessage.query.get(message_id)
+        if message is None or message.status != 'processing' or message.locked_by != self.worker_id:
+            return False
+
+        func = _handlers.get(message.kind)
+        try:
+            if func is None:
+                raise ValueError(f"No outbox handler for '{message.kind}'")
+            result = func(message)
+            message.status = 'done'
+            message.result = result
+            message.last_error = None
+            message.completed_at = datetime.utcnow()
+            message.attempts = (message.attempts or 0) + 1
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            message = OutboxMessage.query.get(message_id)
+            message.attempts = (message.attempts or 0) + 1
+            message.last_error = str(e)
+            if message.attempts >= self.max_attempts:
+                message.status = 'dead'
+                logger.error(f"Outbox message {message.id} ({message.kind}) gave up: {str(e)}")
+            else:
+                message.status = 'pending'
+                message.next_attempt_at = datetime.utcnow() + timedelta(
+                    seconds=backoff_delay(message.attempts, self.backoff_base, self.backoff_max)
+                )
+                logger.warning(f"Outbox message {message.id} ({message.kind}) failed, will retry: {str(e)}")
+            message.locked_by = None
+            message.locked_at = None
+            db.session.commit()
+            return False
+
+    def _process_in_context(self, app, message_id: int) -> bool:
+        with app.app_context():
+            try:
+                return self.process(message_id)
+            finally:
+                db.session.remove()
+
+    def run_once(self, app=None) -> int:
+        """
+        Claim and run one batch of messages
+
+        Returns:
+            int: Number of messages claimed
+        """
+        claimed = self.claim()
+        if not claimed:
+            return 0
+        if self._executor is None or app is None:
+            for message_id in claimed:
+                self.process(message_id)
+        else:
+            wait([self._executor.submit(self._process_in_context, app, message_id) for message_id in claimed])
+        return len(claimed)
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stop.is_set():
+                try:
+                    claimed = self.run_once(app)
+                except Exception as e:
+                    logger.error(f"Outbox pass failed: {str(e)}")
+                    db.session.rollback()
+                    claimed = 0
+                finally:
+                    db.session.remove()
+                if claimed < self.batch_size:
+                    self._wake.wait(self.interval)
+                    self._wake.clear()
+
+    def notify(self) -> None:
+        """Wake the dispatcher after new messages were committed"""
+        self._wake.set()
+
+    def start(self, app) -> None:
+        """Start the dispatcher thread and worker pool if they are not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbox')
+                self._thread = threading.Thread(target=self._run, args=(app,), name='outbox-dispatcher', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+_dispatcher: Optional[OutboxDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """Get the process-wide outbox dispatcher"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = OutboxDispatcher.from_config(current_app.config)
+    return _dispatcher
+
+def dispatch_in_background() -> None:
+    """Start (or wake) the in-process dispatcher unless a separate worker drains the outbox"""
+    if current_app.config.get('OUTBOX_IN_PROCESS', True):
+        dispatcher = get_outbox_dispatcher()
+        dispatcher.start(current_app._get_current_object())
+        dispatcher.notify()
+
+def _contract(message: OutboxMessage) -> Contract:
+    contract = Contract.query.get(message.aggregate_id)
+    if contract is None:
+        raise ValueError(f"Contract {message.aggregate_id} not found")
+    return contract
+
+@handler('storacha_upload')
+def upload_contract_pdf(message: OutboxMessage) -> Dict:
+    """Render the contract PDF, upload it and queue the steps that need its CID"""
+    from app.services.pdf_generator import generate_contract_pdf
+    from app.services.storacha import StorachaClient
+
+    contract = _contract(message)
+    if not contract.initial_cid:
+        pdf_content = generate_contract_pdf(contract=contract, weather_prediction=contract.weather_prediction)
+        contract.initial_cid = StorachaClient().upload_content(
+            content=pdf_content,
+            filename=f"contract_{contract.id}.pdf"
+        )
+
+    enqueue('chain_register', 'contract', contract.id)
+    enqueue('email', 'contract', contract.id, {'template': 'contract_review'},
+            idempotency_key=f"email:contract_review:{contract.id}")
+    return {'cid': contract.initial_cid}
+
+def _adopt_registration(web3_client, contract: Contract) -> bool:
+    """
+    Take over a registration sent by an earlier attempt, instead of sending another
+
+    A tracked register_contract transaction that has not failed is adopted
+    with its status. Otherwise, if the contract is already stored on chain
+    (the earlier attempt was mined but its DB changes were lost), the
+    transaction is taken from the indexed ContractStored event when known.
+
+    Returns:
+        bool: True if the contract needs no new registration
+    """
+    tracked = PendingTransaction.query.filter(
+        PendingTransaction.method == 'register_contract',
+        PendingTransaction.entity_type == 'contract',
+        PendingTransaction.entity_key == str(contract.id),
+        PendingTransaction.status != 'failed'
+    ).order_by(PendingTransaction.id.desc()).first()
+    if tracked is not None:
+        contract.blockchain_tx = contract.blockchain_latest_tx = tracked.tx_hash
+        contract.blockchain_status = tracked.status
+        contract.blockchain_sender = contract.blockchain_sender or tracked.sender
+        return True
+
+    details, = web3_client.read_batch().contract_row(contract.id).execute()
+    if not details['timestamp']:
+        return False
+    stored = ChainEvent.query.filter_by(contract_id=contract.id, event_type='ContractStored') \
+        .order_by(ChainEvent.block_number).first()
+    contract.blockchain_tx = stored.tx_hash if stored else None
+    contract.set_blockchain_status(confirmed=True, tx_hash=contract.blockchain_tx)
+    logger.info(f"Contract {contract.id} is already registered on chain, not sending it again")
+    return True
+
+@handler('chain_register')
+def register_contract_on_chain(message: OutboxMessage) -> Dict:
+    from app.blockchain.web3_client import get_web3_client
+
+    contract = _contract(message)
+    if not contract.initial_cid:
+        raise ValueError("Contract has no CID to register yet")
+    if not contract.blockchain_tx:
+        web3_client = get_web3_client()
+        if not _adopt_registration(web3_client, contract):
+            contract.blockchain_tx = web3_client.register_contract(contract_id=contract.id, cid=contract.initial_cid)
+            contract.set_blockchain_status(confirmed=not web3_client.async_transactions, tx_hash=contract.blockchain_tx)
+    if anchor_service.batched_mode():
+        anchor_service.queue_contract(contract.id, contract.initial_cid)
+        anchor_service.anchor_in_background()
+    return {'tx_hash': contract.blockchain_tx}
+
+@handler('email')
+def send_contract_notification(message: OutboxMessage) -> Dict:
+    from app.services.email_service import send_contract_email
+
+    contract = _contract(message)
+    if not send_contract_email(recipient_email=contract.provider_email, contract=contract, cid=contract.initial_cid):
+        raise RuntimeError("Email delivery failed")
+    return {'recipient': contract.provider_email}
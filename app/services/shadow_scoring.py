@@ -0,0 +1,188 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from flask import current_app
+
+from app.utils.metrics import latency_summary
+
+logger = logging.getLogger(__name__)
+
+class _VersionStats:
+    """Running prediction statistics for a single model version"""
+
+    def __init__(self, role: str, latency_window: int):
+        self.role = role
+        self.batches = 0
+        self.predictions = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=latency_window)
+        # Agreement against the served model (shadow versions only)
+        self.compared = 0
+        self.agreed = 0
+        self.abs_diff_total = 0.0
+
+    def to_dict(self) -> Dict:
+        stats = {
+            'role': self.role,
+            'batches': self.batches,
+            'predictions': self.predictions,
+            'errors': self.errors,
+            'latency_ms': latency_summary(self.latencies, percentiles=(50, 95))
+        }
+        if self.role == 'shadow':
+            stats['agreement'] = {
+                'compared': self.compared,
+                'agreed': self.agreed,
+                'rate': self.agreed / self.compared if self.compared else None,
+                'mean_abs_diff': self.abs_diff_total / self.compared if self.compared else None
+            }
+        return stats
+
+class ShadowScorer:
+    """
+    Scores a candidate model on live feature batches off the request path.
+
+    The served path only enqueues work; a single daemon thread loads the
+    candidate model and runs its predictions, so a slow or broken candidate
+    can never delay a response. When the queue is full, batches are dropped
+    and counted instead of blocking.
+    """
+
+    def __init__(self, loader: Callable, version: str, tolerance: float = 1.0,
+                 max_queue: int = 1000, latency_window: int = 1000):
+        """
+        Args:
+            loader: Callable returning the candidate model (called in the worker thread)
+            version: Version label of the candidate model
+            tolerance: Maximum absolute difference counted as agreement
+            max_queue: Maximum number of pending batches
+            latency_window: Number of recent latencies kept per version
+        """
+        self.version = version
+        self.tolerance = tolerance
+        self.latency_window = latency_window
+        self.dropped = 0
+        self._loader = loader
+        self._model = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats: Dict[str, _VersionStats] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='ml-shadow-scorer', daemon=True)
+        self._thread.start()
+
+    def _version_stats(self, version: str, role: str) -> _VersionStats:
+        stats = self._stats.get(version)
+        if stats is None:
+            stats = self._stats[version] = _VersionStats(role, self.latency_window)
+        return stats
+
+    def record_served(self, version: str, batch_size: int, latency_ms: float) -> None:
+        """Record latency of the served model for side-by-side comparison"""
+        with self._lock:
+            stats = self._version_stats(version, 'served')
+            stats.batches += 1
+            stats.predictions += batch_size
+            stats.latencies.append(latency_ms)
+
+    def submit(self, features: np.ndarray, served: np.ndarray) -> bool:
+        """
+        Queue a feature batch for shadow scoring without blocking
+
+        Args:
+            features: Model input batch exactly as fed to the served model
+            served: Predictions returned by the served model
+
+        Returns:
+            bool: True if queued, False if the batch was dropped
+        """
+        try:
+            self._queue.put_nowait((features, np.asarray(served, dtype=np.float64).ravel()))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        """Worker loop: load the candidate model once, then score batches"""
+        try:
+            self._model = self._loader()
+            logger.info(f"Shadow model {self.version} loaded")
+        except Exception as e:
+            logger.error(f"Failed to load shadow model {self.version}: {str(e)}")
+            return
+
+        while True:
+            features, served = self._queue.get()
+            if features is None:
+                break
+            self._score(features, served)
+
+    def _score(self, features: np.ndarray, served: np.ndarray) -> None:
+        started = time.perf_counter()
+        try:
+            candidate = np.asarray(self._model.predict(features, verbose=0), dtype=np.float64).ravel()
+        except Exception as e:
+            with self._lock:
+                self._version_stats(self.version, 'shadow').errors += 1
+            logger.error(f"Shadow prediction failed for {self.version}: {str(e)}")
+            return
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        diff = np.abs(candidate - served)
+        with self._lock:
+            stats = self._version_stats(self.version, 'shadow')
+            stats.batches += 1
+            stats.predictions += candidate.size
+            stats.latencies.append(latency_ms)
+            stats.compared += diff.size
+            stats.agreed += int((diff <= self.tolerance).sum())
+            stats.abs_diff_total += float(diff.sum())
+
+    def get_stats(self) -> Dict:
+        """Return agreement and latency statistics per model version"""
+        with self._lock:
+            return {
+                'shadow_version': self.version,
+                'loaded': self._model is not None,
+                'tolerance': self.tolerance,
+                'queued': self._queue.qsize(),
+                'dropped': self.dropped,
+                'versions': {version: stats.to_dict() for version, stats in self._stats.items()}
+            }
+
+    def stop(self) -> None:
+        """Stop the worker thread after pending batches are scored"""
+        self._queue.put((None, None))
+
+_scorer: Optional[ShadowScorer] = None
+_scorer_lock = threading.Lock()
+
+def get_shadow_scorer() -> Optional[ShadowScorer]:
+    """
+    Get the process-wide shadow scorer for the configured candidate model
+
+    Returns:
+        ShadowScorer: Scorer instance, or None if shadow mode is disabled
+    """
+    global _scorer
+    model_path = current_app.config.get('ML_SHADOW_MODEL_PATH')
+    if not model_path:
+        return None
+
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                from app.services.ml_service import load_keras_model, model_version
+                _scorer = ShadowScorer(
+                    loader=lambda: load_keras_model(model_path),
+                    version=model_version(model_path),
+                    tolerance=current_app.config.get('ML_SHADOW_TOLERANCE_DAYS', 1.0),
+                    max_queue=current_app.config.get('ML_SHADOW_QUEUE_SIZE', 1000)
+                )
+    return _scorer
@@ -1,14 +1,140 @@
 import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app, has_app_context
 import json
-from typing import Optional, Union, Dict
+from typing import Optional, Union, Dict, Iterable, Tuple
 from werkzeug.datastructures import FileStorage
 import io
 import logging
 
+from app.services.content_store import Content, get_content_store
+from app.utils.metrics import latency_summary
+
 logger = logging.getLogger(__name__)
 
+# Defaults for use outside an app context
+SESSION_DEFAULTS = {
+    'STORACHA_POOL_SIZE': 20,
+    'STORACHA_CONNECT_TIMEOUT': 5.0,
+    'STORACHA_READ_TIMEOUT': 60.0,
+    'STORACHA_RETRIES': 3,
+    'STORACHA_RETRY_BACKOFF': 0.5,
+    'STORACHA_AVAILABLE_TTL': 3600.0,
+    'STORACHA_UNAVAILABLE_TTL': 30.0,
+    'STORACHA_AVAILABILITY_CACHE_SIZE': 10000
+}
+
+def _config(key: str):
+    if has_app_context():
+        return current_app.config.get(key, SESSION_DEFAULTS[key])
+    return SESSION_DEFAULTS[key]
+
+class _EndpointStats:
+    """Request count, errors and recent latencies of one Storacha endpoint"""
+
+    def __init__(self, latency_window: int = 1000):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency_ms': latency_summary(self.latencies)
+        }
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_stats: Dict[str, _EndpointStats] = {}
+_stats_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session for Storacha requests
+
+    Connections are kept alive in a pool of STORACHA_POOL_SIZE. GET and
+    HEAD requests are retried STORACHA_RETRIES times with exponential
+    backoff on connection errors and 429/5xx responses; uploads and pins
+    are not, since repeating them is not safe.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=_config('STORACHA_RETRIES'),
+                    backoff_factor=_config('STORACHA_RETRY_BACKOFF'),
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['GET', 'HEAD']),
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=_config('STORACHA_POOL_SIZE'),
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+def _reset_session():
+    """Drop the session (and its sockets) inherited from a parent process"""
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_session)
+
+def _record(endpoint: str, latency_ms: float, failed: bool) -> None:
+    with _stats_lock:
+        stats = _stats.get(endpoint)
+        if stats is None:
+            stats = _stats[endpoint] = _EndpointStats()
+        stats.requests += 1
+        stats.latencies.append(latency_ms)
+        if failed:
+            stats.errors += 1
+
+# CID -> (available, expires at); see StorachaClient.check_many
+_availability: 'OrderedDict[str, Tuple[bool, float]]' = OrderedDict()
+_availability_lock = threading.Lock()
+
+def _cached_availability(cids) -> Dict[str, bool]:
+    now = time.monotonic()
+    results = {}
+    with _availability_lock:
+        for cid in cids:
+            entry = _availability.get(cid)
+            if entry is not None and entry[1] > now:
+                results[cid] = entry[0]
+    return results
+
+def _cache_availability(results: Dict[str, bool]) -> None:
+    now = time.monotonic()
+    ttls = {True: _config('STORACHA_AVAILABLE_TTL'), False: _config('STORACHA_UNAVAILABLE_TTL')}
+    max_size = _config('STORACHA_AVAILABILITY_CACHE_SIZE')
+    with _availability_lock:
+        for cid, available in results.items():
+            _availability[cid] = (available, now + ttls[available])
+            _availability.move_to_end(cid)
+        while len(_availability) > max_size:
+            _availability.popitem(last=False)
+
+def get_request_stats() -> Dict:
+    """Request count, errors and latency per endpoint ("GET /content", ...) in this process"""
+    with _stats_lock:
+        return {endpoint: stats.to_dict() for endpoint, stats in sorted(_stats.items())}
+
 class StorachaError(Exception):
     """Base exception for Storacha client errors"""
     pass
@@ -20,9 +146,13 @@ class StorachaAuthError(StorachaError):
 class StorachaClient:
     """Client for interacting with Storacha IPFS service with bridge token authentication"""
     
-    def __init__(self):
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Args:
+            api_key: Authorization token; defaults to STORACHA_AUTHORIZATION_TOKEN
+        """
         self.x_auth_secret = os.getenv('STORACHA_X_AUTH_SECRET')
-        self.auth_token = os.getenv('STORACHA_AUTHORIZATION_TOKEN')
+        self.auth_token = api_key or os.getenv('STORACHA_AUTHORIZATION_TOKEN')
         
         if not self.x_auth_secret or not self.auth_token:
             raise StorachaAuthError("Missing Storacha authentication credentials")
@@ -33,11 +163,17 @@ class StorachaClient:
             'Authorization': self.auth_token,
             'Accept': 'application/json'
         }
+        self.session = get_session()
+        self.timeout: Tuple[float, float] = (_config('STORACHA_CONNECT_TIMEOUT'), _config('STORACHA_READ_TIMEOUT'))
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """
         Make an authenticated request to Storacha API
         
+        Requests go through the shared session with connect and read
+        timeouts (see get_session), and their latency is recorded per
+        endpoint.
+        
         Args:
             method: HTTP method
             endpoint: API endpoint
@@ -51,15 +187,20 @@ class StorachaClient:
             StorachaError: For other API errors
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        # Metrics are kept per route, not per CID
+        name = f"{method} /{endpoint.strip('/').split('/')[0]}"
         
         # Ensure headers are included
         if 'headers' in kwargs:
             kwargs['headers'].update(self.headers)
         else:
             kwargs['headers'] = self.headers
+        kwargs.setdefault('timeout', self.timeout)
         
+        started = time.perf_counter()
+        response = None
         try:
-            response = requests.request(method, url, **kwargs)
+            response = self.session.request(method, url, **kwargs)
             
             # Handle authentication errors
             if response.status_code == 401:
@@ -76,6 +217,9 @@ class StorachaClient:
         except requests.RequestException as e:
             logger.error(f"Request to Storacha failed: {str(e)}")
             raise StorachaError(f"Request failed: {str(e)}")
+        finally:
+            _record(name, (time.perf_counter() - started) * 1000.0,
+                    response is None or response.status_code >= 400)
     
     def upload_file(self, file: FileStorage) -> Optional[str]:
         """
@@ -94,8 +238,11 @@ class StorachaClient:
         try:
             logger.info(f"Uploading file: {file.filename}")
             
+            # Read the body up front when it is also written to the content store
+            store = get_content_store()
+            body = file.stream.read() if store is not None else file.stream
             files = {
-                'file': (file.filename, file.stream, file.content_type)
+                'file': (file.filename, body, file.content_type)
             }
             
             response = self._make_request('POST', '/upload', files=files)
@@ -104,6 +251,8 @@ class StorachaClient:
             if 'cid' not in result:
                 raise StorachaError("No CID in response")
             
+            if store is not None:
+                self._store_content(result['cid'], body)
             logger.info(f"File uploaded successfully. CID: {result['cid']}")
             return result['cid']
             
@@ -139,6 +288,7 @@ class StorachaClient:
             if 'cid' not in result:
                 raise StorachaError("No CID in response")
             
+            self._store_content(result['cid'], content)
             logger.info(f"Content uploaded successfully. CID: {result['cid']}")
             return result['cid']
             
@@ -146,20 +296,45 @@ class StorachaClient:
             logger.error(f"Content upload failed: {str(e)}")
             raise
     
-    def get_content(self, cid: str) -> Optional[bytes]:
+    def _store_content(self, cid: str, content: bytes) -> None:
+        """Write content through to the local content store, if enabled"""
+        store = get_content_store()
+        if store is None:
+            return
+        try:
+            store.put(cid, content)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Content store write failed for {cid}: {str(e)}")
+    
+    def get_content(self, cid: str) -> Optional[Content]:
         """
         Retrieve content from Storacha by CID
         
+        Content is served from the local content store when it holds the
+        CID (as a read-only mmap for large files), and stored there after
+        a network fetch.
+        
         Args:
             cid: IPFS CID to retrieve
             
         Returns:
-            bytes: File content if successful, None otherwise
+            bytes or mmap: File content if successful, None otherwise
         """
         try:
+            store = get_content_store()
+            if store is not None:
+                try:
+                    content = store.get(cid)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Content store read failed for {cid}: {str(e)}")
+                    content = None
+                if content is not None:
+                    return content
+            
             logger.info(f"Retrieving content for CID: {cid}")
             
             response = self._make_request('GET', f'/content/{cid}')
+            self._store_content(cid, response.content)
             return response.content
             
         except Exception as e:
@@ -168,7 +343,7 @@ class StorachaClient:
     
     def check_cid_availability(self, cid: str) -> bool:
         """
-        Check if a CID is available on IPFS
+        Check if a CID is available on IPFS (see check_many)
         
         Args:
             cid: IPFS CID to check
@@ -176,6 +351,41 @@ class StorachaClient:
         Returns:
             bool: True if available, False otherwise
         """
+        return self.check_many([cid])[cid]
+    
+    def check_many(self, cids: Iterable[Optional[str]]) -> Dict[str, bool]:
+        """
+        Check the availability of several CIDs in one concurrent round
+        
+        Results are cached process-wide: available CIDs for
+        STORACHA_AVAILABLE_TTL seconds, unavailable ones only for
+        STORACHA_UNAVAILABLE_TTL, since a fresh upload may not be
+        retrievable yet. HEAD requests for the uncached CIDs run in
+        parallel over the shared session.
+        
+        Args:
+            cids: IPFS CIDs to check (None and duplicates are skipped)
+            
+        Returns:
+            dict: CID -> True if available, False otherwise
+        """
+        cids = list(dict.fromkeys(cid for cid in cids if cid))
+        results = _cached_availability(cids)
+        missing = [cid for cid in cids if cid not in results]
+        if len(missing) == 1:
+            checked = {missing[0]: self._head_available(missing[0])}
+        elif missing:
+            workers = min(len(missing), _config('STORACHA_POOL_SIZE'))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                checked = dict(zip(missing, executor.map(self._head_available, missing)))
+        else:
+            checked = {}
+        _cache_availability(checked)
+        results.update(checked)
+        return results
+    
+    def _head_available(self, cid: str) -> bool:
+        """One uncached availability check (HEAD /content/<cid>)"""
         try:
             logger.info(f"Checking availability of CID: {cid}")
             
@@ -0,0 +1,482 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ['tavg', 'tmin', 'tmax', 'prcp']
+TARGET_COLUMN = 'chuva'
+ARCHIVE_URL = 'https://archive-api.open-meteo.com/v1/archive'
+ARCHIVE_DAILY_FIELDS = 'temperature_2m_mean,temperature_2m_min,temperature_2m_max,precipitation_sum'
+
+# Every n-th row of each chunk is held out for validation
+VALIDATION_EVERY = 5
+
+# Redis keys shared by every worker process
+JOB_KEY_PREFIX = 'ml:training_job:'
+TRAINING_LOCK_KEY = 'ml:training_lock'
+
+def build_rain_model(input_dim: int = len(FEATURE_COLUMNS)):
+    """Build and compile the binary rain classifier"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential([
+        Dense(32, activation='relu', input_shape=(input_dim,)),
+        Dropout(0.2),
+        Dense(16, activation='relu'),
+        Dropout(0.2),
+        Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer=Adam(), loss='binary_crossentropy', metrics=['accuracy'])
+    return model
+
+def prepare_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill missing values and derive the rain target for one chunk"""
+    df = df.copy()
+    df['prcp'] = df['prcp'].fillna(0)
+    for column in ('tavg', 'tmin', 'tmax'):
+        df[column] = df[column].fillna(df[column].mean())
+    if TARGET_COLUMN not in df:
+        df[TARGET_COLUMN] = (df['prcp'] > 0).astype(int)
+    return df.dropna(subset=FEATURE_COLUMNS)
+
+def fetch_archive_range(latitude: float, longitude: float, start_date: date,
+                        end_date: date, session: Optional[requests.Session] = None) -> Dict:
+    """
+    Fetch raw daily history for one location and date range from Open-Meteo
+
+    Returns:
+        dict: Raw archive API response
+    """
+    params = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'daily': ARCHIVE_DAILY_FIELDS
+    }
+    response = (session or requests).get(ARCHIVE_URL, params=params, timeout=60)
+    response.raise_for_status()
+    return response.json()
+
+def archive_response_to_frame(response: Dict) -> pd.DataFrame:
+    """Convert a raw archive response into the training column layout"""
+    daily = response['daily']
+    return pd.DataFrame({
+        'tavg': daily['temperature_2m_mean'],
+        'tmin': daily['temperature_2m_min'],
+        'tmax': daily['temperature_2m_max'],
+        'prcp': daily['precipitation_sum']
+    }, index=pd.to_datetime(daily['time']))
+
+def iter_csv_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV training file in chunks"""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        yield chunk
+
+def iter_parquet_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet training file in record batches"""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [c for c in FEATURE_COLUMNS + [TARGET_COLUMN] if c in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+def split_date_range(start_date: date, end_date: date, chunk_days: int = 365) -> List[Tuple[date, date]]:
+    """Split [start_date, end_date] into consecutive inclusive chunks"""
+    ranges = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        ranges.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return ranges
+
+def iter_archive_chunks(latitude: float, longitude: float, start_date: date,
+                        end_date: date, chunk_days: int = 365) -> Iterator[pd.DataFrame]:
+    """Stream the Open-Meteo historical archive one date range at a time"""
+    session = requests.Session()
+    for chunk_start, chunk_end in split_date_range(start_date, end_date, chunk_days):
+        yield archive_response_to_frame(
+            fetch_archive_range(latitude, longitude, chunk_start, chunk_end, session)
+        )
+
+def materialize_chunks(chunks: Callable[[], Iterator[pd.DataFrame]], path: str,
+                       chunk_size: int = 10000) -> Callable[[], Iterator[pd.DataFrame]]:
+    """
+    Write one pass of a chunk source to a local Parquet file
+
+    Used for the archive source, so training does not download the
+    history again for every epoch and for the validation split.
+
+    Returns:
+        callable: A chunk source reading the file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks():
+            columns = [c for c in FEATURE_COLUMNS + [TARGET_COLUMN] if c in chunk]
+            table = pa.Table.from_pandas(chunk[columns].astype('float64'), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("Training source returned no data")
+    return lambda: iter_parquet_chunks(path, chunk_size)
+
+def iter_record_chunks(records: List[Dict], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream inline training records in chunks"""
+    for offset in range(0, len(records), chunk_size):
+        yield pd.DataFrame.from_records(records[offset:offset + chunk_size])
+
+def resolve_training_path(path: str, data_dir: str) -> str:
+    """
+    Resolve a training file path inside the configured data directory
+
+    Raises:
+        ValueError: If the path escapes the data directory
+    """
+    root = os.path.realpath(data_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Training data must be inside {data_dir}")
+    return resolved
+
+def make_chunk_source(source: Dict, chunk_size: int, data_dir: str) -> Callable[[], Iterator[pd.DataFrame]]:
+    """
+    Build a re-iterable chunk source from a request description
+
+    Args:
+        source: {'type': 'csv'|'parquet'|'archive'|'records', ...}
+        chunk_size: Rows per chunk
+        data_dir: Directory that file sources must live in
+
+    Returns:
+        callable: Returns a fresh chunk iterator on every call (one per epoch)
+    """
+    source_type = source.get('type')
+    if source_type in ('csv', 'parquet'):
+        path = resolve_training_path(source['path'], data_dir)
+        if not os.path.exists(path):
+            raise ValueError(f"Training file not found: {source['path']}")
+        reader = iter_csv_chunks if source_type == 'csv' else iter_parquet_chunks
+        return lambda: reader(path, chunk_size)
+    if source_type == 'archive':
+        start_date = datetime.strptime(source['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(source['end_date'], '%Y-%m-%d').date()
+        return lambda: iter_archive_chunks(
+            float(source['latitude']), float(source['longitude']), start_date, end_date
+        )
+    if source_type == 'records':
+        records = source.get('records') or []
+        if not records:
+            raise ValueError("No training records provided")
+        return lambda: iter_record_chunks(records, chunk_size)
+    raise ValueError(f"Unsupported training source: {source_type}")
+
+def _split_arrays(chunks: Callable[[], Iterator[pd.DataFrame]], validation: bool,
+                  on_rows: Optional[Callable[[int], None]] = None):
+    """Yield (features, target) float32 arrays for the train or validation split"""
+    for chunk in chunks():
+        chunk = prepare_chunk(chunk)
+        holdout = np.arange(len(chunk)) % VALIDATION_EVERY == 0
+        mask = holdout if validation else ~holdout
+        if not mask.any():
+            continue
+        if on_rows is not None:
+            on_rows(int(mask.sum()))
+        yield (
+            chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float32)[mask],
+            chunk[TARGET_COLUMN].to_numpy(dtype=np.float32)[mask]
+        )
+
+def make_dataset(chunks: Callable[[], Iterator[pd.DataFrame]], batch_size: int, validation: bool = False,
+                 on_rows: Optional[Callable[[int], None]] = None):
+    """
+    Build a streaming tf.data pipeline over a chunk source
+
+    `on_rows(n)` is called with the row count of every chunk handed to the
+    pipeline, so partial batches are counted exactly.
+    """
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_generator(
+        lambda: _split_arrays(chunks, validation, on_rows),
+        output_signature=(
+            tf.TensorSpec(shape=(None, len(FEATURE_COLUMNS)), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32)
+        )
+    )
+    return dataset.unbatch().batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+class TrainingJob:
+    """State and progress of one background training run"""
+
+    def __init__(self, source: Dict, epochs: int, warm_start: bool):
+        self.id = uuid.uuid4().hex
+        self.source_type = source.get('type')
+        self.epochs = epochs
+        self.warm_start = warm_start
+        self.status = 'queued'  # queued, running, completed, failed
+        self.epoch = 0
+        self.rows_seen = 0
+        self.metrics: Dict = {}
+        self.model_path: Optional[str] = None
+        self.warm_started_from: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == 'completed':
+            return 1.0
+        return self.epoch / self.epochs if self.epochs else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'source_type': self.source_type,
+            'progress': round(self.progress, 4),
+            'epoch': self.epoch,
+            'epochs': self.epochs,
+            'rows_seen': self.rows_seen,
+            'metrics': self.metrics,
+            'warm_start': self.warm_start,
+            'warm_started_from': self.warm_started_from,
+            'model_path': self.model_path,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TrainingJob':
+        """Rebuild a job from to_dict output (as stored in Redis)"""
+        def parse(value):
+            return datetime.fromisoformat(value) if value else None
+
+        job = cls.__new__(cls)
+        job.id = data['job_id']
+        job.source_type = data['source_type']
+        job.epochs = data['epochs']
+        job.warm_start = data['warm_start']
+        job.status = data['status']
+        job.epoch = data['epoch']
+        job.rows_seen = data['rows_seen']
+        job.metrics = data['metrics']
+        job.model_path = data['model_path']
+        job.warm_started_from = data['warm_started_from']
+        job.error = data['error']
+        job.created_at = parse(data['created_at'])
+        job.started_at = parse(data['started_at'])
+        job.finished_at = parse(data['finished_at'])
+        return job
+
+def _progress_callback(job: TrainingJob, on_update: Callable[[TrainingJob], None]):
+    """Keras callback that mirrors epoch progress onto the job"""
+    import tensorflow as tf
+
+    class ProgressCallback(tf.keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            job.epoch = epoch + 1
+            job.metrics = {k: float(v) for k, v in (logs or {}).items()}
+            on_update(job)
+
+    return ProgressCallback()
+
+def run_training(job: TrainingJob, chunks: Callable[[], Iterator[pd.DataFrame]],
+                 model_path: str, batch_size: int = 256,
+                 on_update: Optional[Callable[[TrainingJob], None]] = None) -> None:
+    """
+    Train (or continue training) the rain model from a chunk source
+
+    The new model is written next to the current one and swapped in with
+    an atomic rename, so readers never load a partially written file.
+    An archive source is downloaded once into a temporary Parquet file
+    first. `on_update(job)` is called when the job starts, after every
+    epoch and when it finishes.
+    """
+    on_update = on_update or (lambda job: None)
+    job.status = 'running'
+    job.started_at = datetime.utcnow()
+    on_update(job)
+    materialized = None
+    try:
+        import tensorflow as tf
+
+        if job.source_type == 'archive':
+            fd, materialized = tempfile.mkstemp(prefix=f"training-{job.id}-", suffix='.parquet')
+            os.close(fd)
+            chunks = materialize_chunks(chunks, materialized)
+
+        def count_rows(n: int) -> None:
+            job.rows_seen += n
+
+        if job.warm_start and os.path.exists(model_path):
+            model = tf.keras.models.load_model(model_path)
+            job.warm_started_from = model_path
+        else:
+            model = build_rain_model()
+
+        model.fit(
+            make_dataset(chunks, batch_size, on_rows=count_rows),
+            validation_data=make_dataset(chunks, batch_size, validation=True),
+            epochs=job.epochs,
+            callbacks=[_progress_callback(job, on_update)],
+            verbose=0
+        )
+
+        tmp_path = f"{model_path}.{job.id}.tmp.h5"
+        model.save(tmp_path)
+        os.replace(tmp_path, model_path)
+
+        job.model_path = model_path
+        job.status = 'completed'
+        logger.info(f"Training job {job.id} completed, model saved to {model_path}")
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        logger.error(f"Training job {job.id} failed: {str(e)}")
+    finally:
+        if materialized is not None and os.path.exists(materialized):
+            os.remove(materialized)
+        job.finished_at = datetime.utcnow()
+        on_update(job)
+
+class TrainingJobManager:
+    """
+    Runs training jobs one at a time on a background thread
+
+    With Redis, job state is stored under JOB_KEY_PREFIX for `job_ttl`
+    seconds, so any worker process can report on any job, and a Redis
+    lock serializes training across processes, so two workers never
+    write ML_RAIN_MODEL_PATH at once. The lock expires after
+    `lock_timeout` seconds unless renewed, which happens every epoch.
+    Without Redis both stay within the process.
+    """
+
+    def __init__(self, redis_client=None, max_jobs: int = 100, job_ttl: int = 7 * 86400,
+                 lock_timeout: int = 6 * 3600):
+        self.redis = redis_client
+        self.max_jobs = max_jobs
+        self.job_ttl = job_ttl
+        self.lock_timeout = lock_timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ml-training')
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: TrainingJob) -> None:
+        """Publish a job's current state"""
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(JOB_KEY_PREFIX + job.id, self.job_ttl, json.dumps(job.to_dict()))
+        except Exception as e:
+            logger.warning(f"Could not store training job {job.id}: {str(e)}")
+
+    def _run(self, job: TrainingJob, chunks: Callable[[], Iterator[pd.DataFrame]],
+             model_path: str, batch_size: int) -> None:
+        lock = None
+        if self.redis is not None:
+            # Waits (with the job queued) while another process trains
+            lock = self.redis.lock(TRAINING_LOCK_KEY, timeout=self.lock_timeout)
+            lock.acquire()
+
+        def on_update(updated: TrainingJob) -> None:
+            self.save(updated)
+            if lock is not None and updated.status == 'running':
+                try:
+                    lock.reacquire()
+                except Exception as e:
+                    logger.warning(f"Could not renew the training lock: {str(e)}")
+
+        try:
+            run_training(job, chunks, model_path, batch_size, on_update)
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except Exception as e:
+                    logger.warning(f"Could not release the training lock: {str(e)}")
+
+    def submit(self, chunks: Callable[[], Iterator[pd.DataFrame]], source: Dict,
+               model_path: str, epochs: int = 10, warm_start: bool = True,
+               batch_size: int = 256) -> TrainingJob:
+        """Queue a training job and return immediately"""
+        job = TrainingJob(source, epochs, warm_start)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self.save(job)
+        self._executor.submit(self._run, job, chunks, model_path, batch_size)
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        """Get a job by id, including jobs submitted to other processes"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self.redis is None:
+            return job
+        try:
+            data = self.redis.get(JOB_KEY_PREFIX + job_id)
+        except Exception as e:
+            logger.warning(f"Could not read training job {job_id}: {str(e)}")
+            return None
+        return TrainingJob.from_dict(json.loads(data)) if data else None
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_jobs"""
+        finished = [j for j in self._jobs.values() if j.status in ('completed', 'failed')]
+        finished.sort(key=lambda j: j.created_at)
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0).id]
+
+_manager: Optional[TrainingJobManager] = None
+_manager_lock = threading.Lock()
+
+def get_training_jobs() -> TrainingJobManager:
+    """Get the process-wide training job manager (backed by the app's Redis cache)"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                cache = getattr(current_app, 'cache', None)
+                _manager = TrainingJobManager(
+                    redis_client=cache.redis if cache else None,
+                    job_ttl=current_app.config.get('ML_TRAINING_JOB_TTL', 7 * 86400),
+                    lock_timeout=current_app.config.get('ML_TRAINING_LOCK_TIMEOUT', 6 * 3600)
+                )
+    return _manager
+
+def _reset_manager():
+    """Drop the manager (and its executor, whose thread did not survive) inherited from a parent process"""
+    global _manager, _manager_lock
+    _manager = None
+    _manager_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_manager)
@@ -4,6 +4,8 @@ from typing import Dict, Optional, List
 import requests
 from app.utils.error_handlers import WeatherAPIError
 from app.utils.cache import cached, cache_weather, should_refresh_weather
+from app.services.feature_store import get_feature_store
+from app.services.climatology import get_climatology
 
 class WeatherService:
     """Service for interacting with OpenWeatherMap API with caching"""
@@ -134,6 +136,10 @@ class WeatherService:
         """
         Process and filter forecast data
         
+        Days past the forecast horizon are filled from the climatology table
+        (rain frequency and mean precipitation for the grid cell and
+        day-of-year), so the summary covers the whole contract period.
+        
         Args:
             data: Raw forecast data
             start_date: Start date for forecast
@@ -148,13 +154,13 @@ class WeatherService:
                 raise WeatherAPIError("No forecast data available")
             
             # Filter days and extract relevant information
-            processed_days = []
+            forecast_days = {}
             end_date = start_date + timedelta(days=days)
             
-            for day_data in daily_data[:days]:
+            for day_data in daily_data:
                 date = datetime.fromtimestamp(day_data['dt']).date()
                 if start_date <= date < end_date:
-                    processed_days.append({
+                    forecast_days[date] = {
                         'date': date.isoformat(),
                         'temp': {
                             'min': day_data['temp']['min'],
@@ -169,16 +175,34 @@ class WeatherService:
                             'main': day_data['weather'][0]['main'],
                             'description': day_data['weather'][0]['description'],
                             'icon': day_data['weather'][0]['icon']
-                        }
-                    })
+                        },
+                        'source': 'forecast'
+                    }
+            
+            # Blend in climatology for the days the forecast does not cover
+            climatology = get_climatology()
+            processed_days = []
+            for offset in range(days):
+                date = start_date + timedelta(days=offset)
+                day = forecast_days.get(date)
+                if day is None and climatology is not None:
+                    day = climatology.climatology_day(data['lat'], data['lon'], date)
+                if day is not None:
+                    processed_days.append(day)
             
             if not processed_days:
                 raise WeatherAPIError("No forecast data available for specified dates")
             
+            # Precompute model input rows for every contract in this grid cell
+            try:
+                get_feature_store().put_days(data['lat'], data['lon'], list(forecast_days.values()))
+            except Exception as e:
+                current_app.logger.warning(f"Feature store update failed: {str(e)}")
+            
             # Calculate aggregate statistics
             total_rain_prob = sum(day['rain_prob'] for day in processed_days)
             total_rain_amount = sum(day['rain_amount'] for day in processed_days)
-            avg_temp = sum(day['temp']['day'] for day in processed_days) / len(processed_days)
+            temps = [day['temp']['day'] for day in processed_days if day['temp']['day'] is not None]
             
             return {
                 'location': {
@@ -188,9 +212,12 @@ class WeatherService:
                 'daily': processed_days,
                 'summary': {
                     'total_days': days,
-                    'avg_rain_probability': total_rain_prob / days,
+                    'covered_days': len(processed_days),
+                    'forecast_days': len(forecast_days),
+                    'climatology_days': len(processed_days) - len(forecast_days),
+                    'avg_rain_probability': total_rain_prob / len(processed_days),
                     'total_rain_amount': total_rain_amount,
-                    'avg_temperature': avg_temp,
+                    'avg_temperature': sum(temps) / len(temps) if temps else None,
                     'start_date': start_date.isoformat(),
                     'end_date': end_date.isoformat()
                 }
@@ -3,7 +3,7 @@ from typing import Any, Optional, Callable
 import json
 from datetime import datetime, timedelta
 import redis
-from flask import current_app
+from flask import current_app, has_request_context, request
 
 class Cache:
     """Redis cache implementation"""
@@ -100,18 +100,26 @@ def cache_key(*args, **kwargs) -> str:
     key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
     return ":".join(key_parts)
 
-def cached(expires_in: int = 3600):
+def cached(expires_in: int = 3600, skip_if: Optional[Callable[[], bool]] = None):
     """
     Cache decorator
     
     Args:
         expires_in: Cache expiration time in seconds (default: 1 hour)
+        skip_if: Called per request; when it returns True the function
+            runs and its result is neither read from nor written to the cache
     """
     def decorator(func: Callable):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if skip_if is not None and skip_if():
+                return func(*args, **kwargs)
+            
             # Generate cache key
             key = f"{func.__module__}:{func.__name__}:{cache_key(*args, **kwargs)}"
+            if has_request_context() and request.query_string:
+                # Query flags (e.g. strict=true) select a different response
+                key = f"{key}:{request.query_string.decode()}"
             
             # Get cache instance
             cache = current_app.cache
@@ -0,0 +1,53 @@
+from typing import Dict, Optional, Tuple
+
+# Grid resolution in degrees (~11 km at the equator)
+GRID_RESOLUTION = 0.1
+
+def grid_index(lat: float, lon: float, resolution: float = GRID_RESOLUTION) -> Tuple[int, int]:
+    """
+    Snap coordinates to integer grid indices
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        resolution: Cell size in degrees
+
+    Returns:
+        tuple: (row, column) indices of the containing cell
+    """
+    return int(round(lat / resolution)), int(round(lon / resolution))
+
+def grid_cell(lat: float, lon: float, resolution: float = GRID_RESOLUTION) -> str:
+    """
+    Get a stable string key for the grid cell containing a coordinate
+
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        resolution: Cell size in degrees
+
+    Returns:
+        str: Cell key, e.g. '-295_-520'
+    """
+    row, column = grid_index(lat, lon, resolution)
+    return f"{row}_{column}"
+
+def location_coordinates(location: Dict) -> Optional[Tuple[float, float]]:
+    """
+    Extract (lat, lon) from the location formats used across the app
+
+    Supports {'coordinates': {'lat', 'lon'}}, {'lat', 'lon'} and
+    {'latitude', 'longitude'}.
+
+    Returns:
+        tuple: (lat, lon) if present, None otherwise
+    """
+    if not location:
+        return None
+    if 'coordinates' in location:
+        return float(location['coordinates']['lat']), float(location['coordinates']['lon'])
+    if 'lat' in location and 'lon' in location:
+        return float(location['lat']), float(location['lon'])
+    if 'latitude' in location and 'longitude' in location:
+        return float(location['latitude']), float(location['longitude'])
+    return None
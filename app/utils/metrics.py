@@ -0,0 +1,22 @@
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+def latency_summary(latencies: Iterable[float], percentiles: Sequence[int] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+    """
+    Mean and percentiles of recorded latencies
+
+    Args:
+        latencies: Latencies in milliseconds (e.g. a bounded deque)
+        percentiles: Percentiles to report, as 'p50', 'p95', ...
+
+    Returns:
+        dict: {'mean': ..., 'p50': ..., ...}; every value is None when there are no latencies
+    """
+    values = np.asarray(latencies, dtype=np.float64)
+    if not values.size:
+        return dict({'mean': None}, **{f"p{p}": None for p in percentiles})
+    summary = {'mean': float(values.mean())}
+    for p, value in zip(percentiles, np.percentile(values, list(percentiles))):
+        summary[f"p{p}"] = float(value)
+    return summary
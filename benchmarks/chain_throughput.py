@@ -0,0 +1,335 @@
+"""
+Blockchain throughput and gas benchmark
+
+Deploys StorageContract to a local chain (in-process eth-tester/py-evm by
+default, or a running Ganache) and drives the Web3Client write and read
+paths. Reports latency, throughput and gas per method for serial,
+nonce-pipelined and batched registration:
+
+    python -m benchmarks.chain_throughput --output results/chain.json
+    python -m benchmarks.chain_throughput --ganache http://localhost:8545 \\
+        --transactions 500 --concurrency 16 --senders 4 --compare results/chain.json
+
+The contract is compiled with py-solc-x unless --artifact points to a
+compiled JSON artifact (abi and bytecode).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from web3 import Web3
+
+from app import create_app, db
+from benchmarks.common import git_commit, latency_stats
+from config import Config
+
+TRANSACTIONS = 200
+CONCURRENCY = 8
+BATCH_SIZE = 50
+READS = 500
+SOLC_VERSION = '0.8.19'
+CONTRACT_SOURCE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'app', 'blockchain', 'contracts', 'StorageContract.sol'
+)
+
+# Relative changes reported as regressions by --compare
+REGRESSION_TOLERANCES = {
+    'latency_p50_pct': 0.25,
+    'throughput_pct': 0.20,
+    'gas_pct': 0.05
+}
+
+def compile_contract(source: str = CONTRACT_SOURCE) -> dict:
+    """Compile StorageContract.sol with py-solc-x (installs solc on first use)"""
+    try:
+        import solcx
+    except ImportError:
+        raise SystemExit("py-solc-x is required to compile the contract (pip install py-solc-x), "
+                         "or pass --artifact with a compiled contract")
+    if SOLC_VERSION not in [str(version) for version in solcx.get_installed_solc_versions()]:
+        solcx.install_solc(SOLC_VERSION)
+    compiled = solcx.compile_files([source], output_values=['abi', 'bin'], solc_version=SOLC_VERSION)
+    contract = next(value for key, value in compiled.items() if key.endswith(':StorageContract'))
+    return {'abi': contract['abi'], 'bytecode': contract['bin']}
+
+def load_artifact(path: str = None) -> str:
+    """Path of a compiled artifact, compiling the contract into a temp file if needed"""
+    if path:
+        return path
+    path = os.path.join(tempfile.mkdtemp(), 'StorageContract.json')
+    with open(path, 'w') as f:
+        json.dump(compile_contract(), f)
+    return path
+
+def make_provider(ganache_url: str = None):
+    if ganache_url:
+        from app.blockchain.web3_client import _make_provider
+        return _make_provider(ganache_url, pool_size=CONCURRENCY * 2, timeout=30)
+    from web3 import EthereumTesterProvider
+    return EthereumTesterProvider()
+
+def deploy(w3: Web3, artifact_path: str) -> str:
+    with open(artifact_path) as f:
+        artifact = json.load(f)
+    contract = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    tx_hash = contract.constructor().transact({'from': w3.eth.accounts[0]})
+    return w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress']
+
+def make_app(provider, artifact_path: str, senders: int):
+    """Flask app and Web3Client bound to the benchmark chain"""
+    from app.blockchain.web3_client import Web3Client
+
+    w3 = Web3(provider)
+    address = deploy(w3, artifact_path)
+
+    class BenchConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        CONTRACT_ADDRESS = address
+        CONTRACT_ARTIFACT_PATH = artifact_path
+        CHAIN_ID = w3.eth.chain_id
+        BLOCKCHAIN_PRIVATE_KEY = None
+        BLOCKCHAIN_PRIVATE_KEYS = []
+        BLOCKCHAIN_SENDER_POOL_SIZE = senders
+        BLOCKCHAIN_TRACKER_IN_PROCESS = False
+        INDEXER_IN_PROCESS = False
+        OUTBOX_IN_PROCESS = False
+        ANCHOR_IN_PROCESS = False
+        FEE_ORACLE_BACKGROUND = False
+        GANACHE_WS_URL = None
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        client = Web3Client(provider)
+    return app, client
+
+def gas_used(client, tx_hash: str) -> int:
+    return client.w3.eth.get_transaction_receipt(tx_hash)['gasUsed']
+
+def bench_serial(app, client, ids) -> dict:
+    """One register_contract at a time, each waiting for its receipt"""
+    client.async_transactions = False
+    latencies = []
+    with app.app_context():
+        started = time.perf_counter()
+        for contract_id in ids:
+            call_started = time.perf_counter()
+            client.register_contract(contract_id, f"bafyserial{contract_id}")
+            latencies.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+    return dict(latency_stats(latencies), tx_per_s=len(ids) / elapsed)
+
+def bench_pipelined(app, client, ids, concurrency: int = CONCURRENCY) -> dict:
+    """
+    `concurrency` register_contract calls in flight, each with a locally allocated nonce
+
+    Latency is measured from the call to its receipt.
+    """
+    client.async_transactions = True
+
+    def register(contract_id):
+        with app.app_context():
+            try:
+                call_started = time.perf_counter()
+                tx_hash = client.register_contract(contract_id, f"bafypipelined{contract_id}")
+                client.w3.eth.wait_for_transaction_receipt(tx_hash)
+                return time.perf_counter() - call_started
+            finally:
+                db.session.rollback()  # Drop the PendingTransaction rows
+                db.session.remove()
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(register, ids))
+        elapsed = time.perf_counter() - started
+    finally:
+        client.async_transactions = False
+    return dict(latency_stats(latencies), tx_per_s=len(ids) / elapsed, concurrency=concurrency)
+
+def bench_batched(app, client, ids, batch_size: int = BATCH_SIZE) -> dict:
+    """register_contracts in batches of `batch_size`; latency is per batch call"""
+    client.async_transactions = False
+    latencies = []
+    gas = 0
+    transactions = set()
+    with app.app_context():
+        started = time.perf_counter()
+        for i in range(0, len(ids), batch_size):
+            call_started = time.perf_counter()
+            results = client.register_contracts([
+                {'contract_id': contract_id, 'cid': f"bafybatched{contract_id}"}
+                for contract_id in ids[i:i + batch_size]
+            ])
+            latencies.append(time.perf_counter() - call_started)
+            transactions.update(result['tx_hash'] for result in results if result['tx_hash'])
+        elapsed = time.perf_counter() - started
+        gas = sum(gas_used(client, tx_hash) for tx_hash in transactions)
+    return dict(
+        latency_stats(latencies),
+        tx_per_s=len(transactions) / elapsed,
+        contracts_per_s=len(ids) / elapsed,
+        batch_size=batch_size,
+        transactions=len(transactions),
+        gas_per_contract=gas / len(ids)
+    )
+
+def bench_gas(app, client, first_id: int) -> dict:
+    """Gas used by one call of each write method"""
+    client.async_transactions = False
+    signed_id, cancelled_id = first_id, first_id + 1
+    with app.app_context():
+        calls = {
+            'register_contract': lambda: client.register_contract(signed_id, 'bafygasoriginal'),
+            'request_signature': lambda: client.request_signature(signed_id),
+            'sign_contract': lambda: client.sign_contract(
+                signed_id, 'bafygasoriginal', 'bafygassigned', {'method': 'email', 'signer': 'bench'}
+            ),
+            'cancel_contract': lambda: (
+                client.register_contract(cancelled_id, 'bafygascancelled'),
+                client.cancel_contract(cancelled_id)
+            )[1],
+            'register_cid': lambda: client.register_cid('bafygasfile'),
+            'anchor_root': lambda: client.anchor_root(os.urandom(32), 256)
+        }
+        return {method: gas_used(client, call()) for method, call in calls.items()}
+
+def bench_reads(app, client, ids, reads: int = READS, concurrency: int = CONCURRENCY) -> dict:
+    """Contract read paths, uncached and cached, single calls and one JSON-RPC batch"""
+    ids = [ids[i % len(ids)] for i in range(reads)]
+
+    def timed(fn):
+        def call(contract_id):
+            with app.app_context():
+                call_started = time.perf_counter()
+                fn(contract_id)
+                return time.perf_counter() - call_started
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(call, ids))
+        return dict(latency_stats(latencies), reads_per_s=len(ids) / (time.perf_counter() - started))
+
+    ttl = client.reads.ttl
+    results = {}
+    try:
+        client.reads.ttl = 0  # Nothing is stored
+        results['contract_details'] = timed(client.get_contract_details)
+        results['details_and_signature'] = timed(
+            lambda contract_id: (client.get_contract_details(contract_id), client.get_signature_details(contract_id))
+        )
+        results['details_and_signature_batched'] = timed(
+            lambda contract_id: client.read_batch().contract_details(contract_id).signature_details(contract_id).execute()
+        )
+        client.reads.ttl = 60
+        client.reads.clear()
+        results['contract_details_cached'] = timed(client.get_contract_details)
+    finally:
+        client.reads.ttl = ttl
+        client.reads.clear()
+    return results
+
+def run(ganache_url: str = None, artifact_path: str = None, transactions: int = TRANSACTIONS,
+        concurrency: int = CONCURRENCY, batch_size: int = BATCH_SIZE, senders: int = 1,
+        reads: int = READS) -> dict:
+    import web3
+
+    artifact_path = load_artifact(artifact_path)
+    app, client = make_app(make_provider(ganache_url), artifact_path, senders)
+
+    # Fresh id ranges per mode, above anything a reused Ganache may hold
+    base = int(time.time()) * 1000
+    serial_ids = list(range(base, base + transactions))
+    pipelined_ids = list(range(base + transactions, base + 2 * transactions))
+    batched_ids = list(range(base + 2 * transactions, base + 3 * transactions))
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'web3': web3.__version__,
+            'chain': ganache_url or 'eth-tester',
+            'transactions': transactions,
+            'concurrency': concurrency,
+            'senders': len(client.senders)
+        },
+        'writes': {
+            'serial': bench_serial(app, client, serial_ids),
+            'pipelined': bench_pipelined(app, client, pipelined_ids, concurrency),
+            'batched': bench_batched(app, client, batched_ids, batch_size)
+        },
+        'gas': bench_gas(app, client, base + 3 * transactions)
+    }
+    results['gas']['register_contracts_per_item'] = results['writes']['batched']['gas_per_contract']
+    results['reads'] = bench_reads(app, client, serial_ids, reads, concurrency)
+    return results
+
+def compare(current: dict, baseline: dict, tolerances=REGRESSION_TOLERANCES) -> list:
+    """List regressions of `current` against `baseline` beyond the tolerances"""
+    regressions = []
+    for mode, stats in current.get('writes', {}).items():
+        before = baseline.get('writes', {}).get(mode)
+        if not before:
+            continue
+        if stats['p50_ms'] > before['p50_ms'] * (1 + tolerances['latency_p50_pct']):
+            regressions.append(f"{mode} p50 {before['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms")
+        if stats['tx_per_s'] < before['tx_per_s'] * (1 - tolerances['throughput_pct']):
+            regressions.append(f"{mode} throughput {before['tx_per_s']:.1f} tx/s -> {stats['tx_per_s']:.1f} tx/s")
+
+    for method, gas in current.get('gas', {}).items():
+        before = baseline.get('gas', {}).get(method)
+        if before and gas > before * (1 + tolerances['gas_pct']):
+            regressions.append(f"{method} gas {before:.0f} -> {gas:.0f}")
+
+    for path, stats in current.get('reads', {}).items():
+        before = baseline.get('reads', {}).get(path)
+        if before and stats['p50_ms'] > before['p50_ms'] * (1 + tolerances['latency_p50_pct']):
+            regressions.append(f"read {path} p50 {before['p50_ms']:.3f}ms -> {stats['p50_ms']:.3f}ms")
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark blockchain throughput, latency and gas')
+    parser.add_argument('--ganache', help='Node URL (default: in-process eth-tester chain)')
+    parser.add_argument('--artifact', help='Compiled contract JSON (default: compile with py-solc-x)')
+    parser.add_argument('--transactions', type=int, default=TRANSACTIONS, help='Contracts registered per mode')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--senders', type=int, default=1, help='Unlocked accounts in the sender pool')
+    parser.add_argument('--reads', type=int, default=READS)
+    parser.add_argument('--output', default='bench_chain_throughput.json')
+    parser.add_argument('--compare', help='Baseline results file; exit 1 on regressions')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv or [])
+    results = run(args.ganache, args.artifact, args.transactions, args.concurrency,
+                  args.batch_size, args.senders, args.reads)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    for mode, stats in results['writes'].items():
+        print(f"{mode:>10}: p50 {stats['p50_ms']:.2f}ms, p99 {stats['p99_ms']:.2f}ms, {stats['tx_per_s']:.1f} tx/s")
+    for method, gas in results['gas'].items():
+        print(f"{method:>28}: {gas:.0f} gas")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,18 @@
+"""Helpers shared by the benchmark scripts"""
+import subprocess
+
+import numpy as np
+
+from app.utils.metrics import latency_summary
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+def latency_stats(latencies) -> dict:
+    """Call count, mean and p50/p95/p99 of latencies given in seconds, in ms"""
+    latencies_ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    summary = latency_summary(latencies_ms)
+    return dict({'calls': int(latencies_ms.size)}, **{f"{key}_ms": value for key, value in summary.items()})
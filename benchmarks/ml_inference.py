@@ -0,0 +1,431 @@
+"""
+ML inference benchmark and accuracy regression suite
+
+Benchmarks the serving path, MLPredictor.predict_duration and
+predict_duration_batch on a duration model loaded with load_keras_model,
+and the rain classifier as a second target. Runs offline against
+synthetic or archived hold-out sets and writes machine-readable results
+that can be compared between commits:
+
+    python -m benchmarks.ml_inference --output results/ml.json
+    python -m benchmarks.ml_inference --duration-model app/ml/models/duration_predictor.h5 \\
+        --model ml_rain_predictor.h5 --holdout data/training/weather_history.parquet \\
+        --compare results/ml.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from app.services.delay_simulation import DelaySimulator
+from app.services.ml_service import MLPredictor
+from app.services.training_pipeline import (
+    FEATURE_COLUMNS, TARGET_COLUMN, VALIDATION_EVERY, build_rain_model, prepare_chunk
+)
+from benchmarks.common import git_commit, latency_stats
+
+HOLDOUT_SIZE = 5000
+HOLDOUT_SEED = 1234
+BATCH_SIZES = (1, 32, 256, 2048)
+SINGLE_ITEM_CALLS = 200
+
+# Relative/absolute changes reported as regressions by --compare
+REGRESSION_TOLERANCES = {
+    'latency_p50_pct': 0.20,
+    'throughput_pct': 0.20,
+    'accuracy_abs': 0.01,
+    'brier_abs': 0.01,
+    'ece_abs': 0.02,
+    'mae_days_abs': 0.5
+}
+
+class DenseNumpyModel:
+    """Pure NumPy forward pass of a Sequential Dense/Dropout Keras model"""
+
+    ACTIVATIONS = {
+        'linear': lambda x: x,
+        'relu': lambda x: np.maximum(x, 0),
+        'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+        'tanh': np.tanh
+    }
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    @classmethod
+    def from_keras(cls, model) -> 'DenseNumpyModel':
+        layers = []
+        for layer in model.layers:
+            weights = layer.get_weights()
+            if not weights:
+                continue  # Dropout and other inference no-ops
+            kernel, bias = weights
+            activation = layer.get_config().get('activation', 'linear')
+            layers.append((kernel.astype(np.float32), bias.astype(np.float32), cls.ACTIVATIONS[activation]))
+        return cls(layers)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def synthetic_holdout(size: int = HOLDOUT_SIZE, seed: int = HOLDOUT_SEED) -> pd.DataFrame:
+    """Deterministic synthetic daily weather with the training column layout"""
+    rng = np.random.default_rng(seed)
+    tavg = rng.normal(20.0, 5.0, size)
+    humid_day = rng.random(size) < 1.0 / (1.0 + np.exp(-(tavg - 22.0) / 4.0))
+    prcp = np.where(humid_day, rng.exponential(5.0, size), 0.0)
+    return pd.DataFrame({
+        'tavg': tavg,
+        'tmin': tavg - rng.uniform(2.0, 6.0, size),
+        'tmax': tavg + rng.uniform(2.0, 6.0, size),
+        'prcp': prcp
+    })
+
+def load_holdout(path: str = None, size: int = HOLDOUT_SIZE):
+    """
+    Load the fixed hold-out set as float32 (X, y)
+
+    Archived data uses the same rows the training pipeline holds out
+    (every VALIDATION_EVERY-th row), capped at `size` rows.
+    """
+    if path:
+        df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        df = prepare_chunk(df).iloc[::VALIDATION_EVERY].head(size)
+        source = path
+    else:
+        df = prepare_chunk(synthetic_holdout(size))
+        source = f"synthetic(size={size}, seed={HOLDOUT_SEED})"
+    return (
+        df[FEATURE_COLUMNS].to_numpy(dtype=np.float32),
+        df[TARGET_COLUMN].to_numpy(dtype=np.float32),
+        source
+    )
+
+def synthetic_contracts(size: int = HOLDOUT_SIZE, seed: int = HOLDOUT_SEED):
+    """
+    Deterministic synthetic contract features (as MLPredictor takes them)
+    and their durations in days
+    """
+    rng = np.random.default_rng(seed)
+    area = rng.uniform(10.0, 500.0, size)
+    complexity = rng.integers(1, 4, size)
+    workers = rng.integers(1, 6, size)
+    duration = np.ceil(area * complexity / (25.0 * workers)) + rng.normal(0.0, 0.5, size)
+    features = [
+        {'area': float(a), 'complexity': int(c), 'workers': int(w)}
+        for a, c, w in zip(area, complexity, workers)
+    ]
+    return features, duration.astype(np.float32)
+
+def time_calls(fn, args_list) -> list:
+    latencies = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def bench_path(predict, X, batch_sizes=BATCH_SIZES, predict_one=None) -> dict:
+    """
+    Single-item latency plus batched latency and throughput for one predict function
+
+    X is an array or a list of feature dicts; single items go through
+    `predict_one(X[i])` if given, otherwise `predict(X[i:i + 1])`.
+    """
+    predict(X[:1])  # Warm up (graph tracing, allocations)
+    rows = min(SINGLE_ITEM_CALLS, len(X))
+    if predict_one is not None:
+        single = time_calls(predict_one, [(X[i],) for i in range(rows)])
+    else:
+        single = time_calls(predict, [(X[i:i + 1],) for i in range(rows)])
+    results = {
+        'single': latency_stats(single),
+        'batched': {}
+    }
+    for batch_size in batch_sizes:
+        batches = [(X[i:i + batch_size],) for i in range(0, len(X) - batch_size + 1, batch_size)] or [(X,)]
+        latencies = time_calls(predict, batches)
+        items = sum(len(b[0]) for b in batches)
+        stats = latency_stats(latencies)
+        stats['throughput_per_s'] = items / sum(latencies)
+        results['batched'][str(batch_size)] = stats
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def calibration(y: np.ndarray, p: np.ndarray, bins: int = 10) -> dict:
+    """Accuracy, Brier score, log loss and expected calibration error"""
+    p = np.clip(p.astype(np.float64).ravel(), 1e-7, 1 - 1e-7)
+    y = y.astype(np.float64).ravel()
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    bin_ids = np.clip(np.digitize(p, edges[1:-1]), 0, bins - 1)
+
+    reliability = []
+    ece = 0.0
+    for b in range(bins):
+        mask = bin_ids == b
+        if not mask.any():
+            continue
+        confidence, frequency = float(p[mask].mean()), float(y[mask].mean())
+        ece += mask.mean() * abs(confidence - frequency)
+        reliability.append({'bin': b, 'count': int(mask.sum()), 'mean_predicted': confidence, 'observed': frequency})
+
+    return {
+        'samples': int(y.size),
+        'accuracy': float(((p >= 0.5) == (y == 1)).mean()),
+        'brier': float(np.mean((p - y) ** 2)),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        'ece': float(ece),
+        'reliability': reliability
+    }
+
+def bench_delay_simulation(contracts: int = 2000, scenarios: int = 1000) -> dict:
+    """Single-core throughput of the Monte Carlo delay engine"""
+    rng = np.random.default_rng(HOLDOUT_SEED)
+    planned = rng.integers(5, 30, contracts).tolist()
+    daily = [[{'rain_prob': float(p)} for p in rng.random(8)] for _ in range(contracts)]
+    simulator = DelaySimulator(n_scenarios=scenarios, seed=HOLDOUT_SEED)
+
+    started = time.perf_counter()
+    simulator.simulate([date(2024, 1, 1)] * contracts, planned, daily)
+    elapsed = time.perf_counter() - started
+    return {
+        'contracts': contracts,
+        'scenarios': scenarios,
+        'seconds': elapsed,
+        'contracts_per_s': contracts / elapsed,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def build_duration_model():
+    """Small regression model with the duration predictor's (area, complexity, workers) input"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense
+
+    model = Sequential([
+        Dense(32, activation='relu', input_shape=(3,)),
+        Dense(16, activation='relu'),
+        Dense(1)
+    ])
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+def train_reference_duration_model(path: str, seed: int = HOLDOUT_SEED) -> None:
+    """Train a reference duration model on synthetic contracts disjoint from the hold-out set"""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(seed)
+    features, duration = synthetic_contracts(20000, seed=seed + 1)
+    model = build_duration_model()
+    model.fit(MLPredictor._prepare_feature_batch(features), duration,
+              epochs=5, batch_size=256, verbose=0)
+    model.save(path)
+
+def bench_duration_predictor(model_path: str = None, holdout_size: int = HOLDOUT_SIZE) -> dict:
+    """
+    Latency, throughput and error of the served duration predictor
+
+    MLPredictor loads the model with load_keras_model, as the API does, in
+    a minimal app context with shadow scoring off. Contract features go
+    through _prepare_feature_batch on every call, so its cost is included.
+    """
+    from flask import Flask
+
+    if not model_path:
+        model_path = os.path.join(tempfile.mkdtemp(), 'reference_duration_model.h5')
+        train_reference_duration_model(model_path)
+    features, duration = synthetic_contracts(holdout_size)
+
+    app = Flask('ml_inference_benchmark')
+    app.config.update(ML_MODEL_PATH=model_path, ML_SHADOW_MODEL_PATH=None)
+    with app.app_context():
+        rss_before = peak_rss_mb()
+        started = time.perf_counter()
+        predictor = MLPredictor()
+        load_seconds = time.perf_counter() - started
+        if not hasattr(predictor, 'model'):
+            raise RuntimeError(f"MLPredictor did not load {model_path} (is TensorFlow available?)")
+
+        inference = {
+            'duration_service': bench_path(
+                predictor.predict_duration_batch, features, predict_one=predictor.predict_duration
+            ),
+            'duration_keras': bench_path(
+                lambda batch: predictor.model.predict(predictor._prepare_feature_batch(batch), verbose=0),
+                features
+            )
+        }
+        predicted = np.asarray(predictor.predict_duration_batch(features), dtype=np.float32)
+
+    return {
+        'model_path': model_path,
+        'model_version': predictor.model_version,
+        'model_size_bytes': os.path.getsize(model_path),
+        'model_load': {
+            'seconds': load_seconds,
+            'rss_increase_mb': peak_rss_mb() - rss_before
+        },
+        'inference': inference,
+        'accuracy': {
+            'samples': int(duration.size),
+            'mae_days': float(np.mean(np.abs(predicted - duration))),
+            'within_one_day': float(np.mean(np.abs(predicted - duration) <= 1.0))
+        }
+    }
+
+def train_reference_model(path: str, seed: int = HOLDOUT_SEED) -> None:
+    """Train a small reference model on synthetic data disjoint from the hold-out set"""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(seed)
+    df = prepare_chunk(synthetic_holdout(20000, seed=seed + 1))
+    model = build_rain_model()
+    model.fit(df[FEATURE_COLUMNS].to_numpy(np.float32), df[TARGET_COLUMN].to_numpy(np.float32),
+              epochs=3, batch_size=256, verbose=0)
+    model.save(path)
+
+def run(model_path: str = None, holdout_path: str = None, holdout_size: int = HOLDOUT_SIZE,
+        skip_simulation: bool = False, duration_model_path: str = None) -> dict:
+    import tensorflow as tf
+
+    duration = bench_duration_predictor(duration_model_path, holdout_size)
+
+    if not model_path:
+        model_path = os.path.join(tempfile.mkdtemp(), 'reference_model.h5')
+        train_reference_model(model_path)
+
+    X, y, source = load_holdout(holdout_path, holdout_size)
+
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    model = tf.keras.models.load_model(model_path)
+    load_seconds = time.perf_counter() - started
+    numpy_model = DenseNumpyModel.from_keras(model)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'tensorflow': tf.__version__,
+            'model_path': model_path,
+            'model_size_bytes': os.path.getsize(model_path),
+            'holdout': source,
+            'duration_model_path': duration['model_path'],
+            'duration_model_version': duration['model_version'],
+            'duration_model_size_bytes': duration['model_size_bytes']
+        },
+        'model_load': {
+            'seconds': load_seconds,
+            'rss_increase_mb': peak_rss_mb() - rss_before,
+            'duration': duration['model_load']
+        },
+        'inference': {
+            **duration['inference'],
+            'keras': bench_path(lambda x: model.predict(x, verbose=0), X),
+            'keras_call': bench_path(lambda x: model(x, training=False).numpy(), X),
+            'numpy': bench_path(numpy_model.predict, X)
+        }
+    }
+
+    keras_p = model.predict(X, verbose=0, batch_size=2048)
+    numpy_p = numpy_model.predict(X)
+    results['accuracy'] = {
+        'keras': calibration(y, keras_p),
+        'numpy': calibration(y, numpy_p),
+        'max_backend_abs_diff': float(np.abs(keras_p.ravel() - numpy_p.ravel()).max())
+    }
+    results['duration_accuracy'] = duration['accuracy']
+
+    if not skip_simulation:
+        results['delay_simulation'] = bench_delay_simulation()
+
+    results['meta']['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def compare(current: dict, baseline: dict, tolerances=REGRESSION_TOLERANCES) -> list:
+    """List regressions of `current` against `baseline` beyond the tolerances"""
+    regressions = []
+    for backend, paths in current.get('inference', {}).items():
+        base_paths = baseline.get('inference', {}).get(backend)
+        if not base_paths:
+            continue
+        now, before = paths['single']['p50_ms'], base_paths['single']['p50_ms']
+        if now > before * (1 + tolerances['latency_p50_pct']):
+            regressions.append(f"{backend} single p50 {before:.3f}ms -> {now:.3f}ms")
+        for batch_size, stats in paths['batched'].items():
+            base_stats = base_paths['batched'].get(batch_size)
+            if base_stats and stats['throughput_per_s'] < base_stats['throughput_per_s'] * (1 - tolerances['throughput_pct']):
+                regressions.append(
+                    f"{backend} batch {batch_size} throughput "
+                    f"{base_stats['throughput_per_s']:.0f}/s -> {stats['throughput_per_s']:.0f}/s"
+                )
+
+    for backend, metrics in current.get('accuracy', {}).items():
+        base_metrics = baseline.get('accuracy', {}).get(backend)
+        if not isinstance(metrics, dict) or not base_metrics:
+            continue
+        if metrics['accuracy'] < base_metrics['accuracy'] - tolerances['accuracy_abs']:
+            regressions.append(f"{backend} accuracy {base_metrics['accuracy']:.4f} -> {metrics['accuracy']:.4f}")
+        if metrics['brier'] > base_metrics['brier'] + tolerances['brier_abs']:
+            regressions.append(f"{backend} brier {base_metrics['brier']:.4f} -> {metrics['brier']:.4f}")
+        if metrics['ece'] > base_metrics['ece'] + tolerances['ece_abs']:
+            regressions.append(f"{backend} ECE {base_metrics['ece']:.4f} -> {metrics['ece']:.4f}")
+
+    mae, base_mae = (r.get('duration_accuracy', {}).get('mae_days') for r in (current, baseline))
+    if mae is not None and base_mae is not None and mae > base_mae + tolerances['mae_days_abs']:
+        regressions.append(f"duration MAE {base_mae:.3f} -> {mae:.3f} days")
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark ML inference latency and accuracy')
+    parser.add_argument('--duration-model', help='Duration model file, as ML_MODEL_PATH (default: train a reference model)')
+    parser.add_argument('--model', help='Rain model file (default: train a reference model)')
+    parser.add_argument('--holdout', help='Archived CSV/Parquet dataset (default: synthetic)')
+    parser.add_argument('--holdout-size', type=int, default=HOLDOUT_SIZE)
+    parser.add_argument('--output', default='bench_ml_inference.json')
+    parser.add_argument('--compare', help='Baseline results file; exit 1 on regressions')
+    parser.add_argument('--skip-simulation', action='store_true')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv or [])
+    results = run(args.model, args.holdout, args.holdout_size, args.skip_simulation, args.duration_model)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    for backend, paths in results['inference'].items():
+        print(f"{backend:>16}: single p50 {paths['single']['p50_ms']:.3f}ms, "
+              f"batch 256 {paths['batched']['256']['throughput_per_s']:.0f}/s")
+    print(f"Duration MAE {results['duration_accuracy']['mae_days']:.3f} days")
+    print(f"Rain accuracy {results['accuracy']['keras']['accuracy']:.4f}, "
+          f"Brier {results['accuracy']['keras']['brier']:.4f}, ECE {results['accuracy']['keras']['ece']:.4f}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -35,10 +35,73 @@ class Config:
     # Blockchain
     GANACHE_URL = os.environ.get('GANACHE_URL') or 'http://ganache:8545'
     CHAIN_ID = int(os.environ.get('CHAIN_ID', 1337))
-    GAS_PRICE = int(os.environ.get('GAS_PRICE', 20000000000))
+    GAS_PRICE = int(os.environ.get('GAS_PRICE', 20000000000))  # Fallback when the node cannot be sampled
+    # Gas ceiling per storeContracts transaction (below Ganache's 6721975 block gas limit)
+    CONTRACT_BATCH_GAS_LIMIT = int(os.environ.get('CONTRACT_BATCH_GAS_LIMIT', 6000000))
+    FEE_ORACLE_BACKGROUND = os.environ.get('FEE_ORACLE_BACKGROUND', 'true').lower() == 'true'
+    FEE_ORACLE_INTERVAL = float(os.environ.get('FEE_ORACLE_INTERVAL', 5.0))
+    FEE_ORACLE_MAX_AGE = float(os.environ.get('FEE_ORACLE_MAX_AGE', 30.0))
+    FEE_HISTORY_BLOCKS = int(os.environ.get('FEE_HISTORY_BLOCKS', 20))
+    # Sign transactions locally with this key; unset uses the node's unlocked account
+    BLOCKCHAIN_PRIVATE_KEY = os.environ.get('BLOCKCHAIN_PRIVATE_KEY')
+    # Extra sender accounts; writes are spread across them by contract id
+    BLOCKCHAIN_PRIVATE_KEYS = [key for key in os.environ.get('BLOCKCHAIN_PRIVATE_KEYS', '').split(',') if key]
+    # Without private keys, use this many of the node's unlocked accounts
+    BLOCKCHAIN_SENDER_POOL_SIZE = int(os.environ.get('BLOCKCHAIN_SENDER_POOL_SIZE', 1))
+    # Return transaction hashes right after broadcast and confirm them in the background
+    BLOCKCHAIN_ASYNC_TX = os.environ.get('BLOCKCHAIN_ASYNC_TX', 'false').lower() == 'true'
+    BLOCKCHAIN_TRACKER_IN_PROCESS = os.environ.get('BLOCKCHAIN_TRACKER_IN_PROCESS', 'true').lower() == 'true'
+    BLOCKCHAIN_TRACKER_BATCH_SIZE = int(os.environ.get('BLOCKCHAIN_TRACKER_BATCH_SIZE', 100))
+    BLOCKCHAIN_TRACKER_INTERVAL = float(os.environ.get('BLOCKCHAIN_TRACKER_INTERVAL', 2.0))
+    BLOCKCHAIN_TX_TIMEOUT = int(os.environ.get('BLOCKCHAIN_TX_TIMEOUT', 600))
+    CONFIRMATION_DEPTH = int(os.environ.get('CONFIRMATION_DEPTH', 12))  # Blocks until a transaction is final
+    # CID anchoring: 'direct' (one transaction per item) or 'batched' (Merkle roots)
+    ANCHOR_MODE = os.environ.get('ANCHOR_MODE', 'direct')
+    ANCHOR_WINDOW_SECONDS = int(os.environ.get('ANCHOR_WINDOW_SECONDS', 300))
+    ANCHOR_MAX_LEAVES = int(os.environ.get('ANCHOR_MAX_LEAVES', 1024))
+    ANCHOR_POLL_INTERVAL = float(os.environ.get('ANCHOR_POLL_INTERVAL', 10))
+    ANCHOR_IN_PROCESS = os.environ.get('ANCHOR_IN_PROCESS', 'true').lower() == 'true'
+    # WebSocket endpoint for live newHeads/logs subscriptions; unset polls over HTTP only
+    GANACHE_WS_URL = os.environ.get('GANACHE_WS_URL')
+    WS_RECONNECT_MAX = float(os.environ.get('WS_RECONNECT_MAX', 30.0))
+    # Contract event indexer (chain_events table)
+    INDEXER_IN_PROCESS = os.environ.get('INDEXER_IN_PROCESS', 'true').lower() == 'true'
+    INDEXER_START_BLOCK = int(os.environ.get('INDEXER_START_BLOCK', 0))
+    INDEXER_BLOCK_RANGE = int(os.environ.get('INDEXER_BLOCK_RANGE', 2000))
+    INDEXER_REORG_DEPTH = int(os.environ.get('INDEXER_REORG_DEPTH', 12))
+    INDEXER_POLL_INTERVAL = float(os.environ.get('INDEXER_POLL_INTERVAL', 2.0))
+    # Decoded contract reads, invalidated by indexed events and confirmed writes
+    CHAIN_READ_CACHE_TTL = float(os.environ.get('CHAIN_READ_CACHE_TTL', 30))
+    CHAIN_READ_CACHE_SIZE = int(os.environ.get('CHAIN_READ_CACHE_SIZE', 10000))
+    CONTRACT_ARTIFACT_PATH = os.environ.get('CONTRACT_ARTIFACT_PATH')
+    WEB3_POOL_SIZE = int(os.environ.get('WEB3_POOL_SIZE', 10))
+    WEB3_REQUEST_TIMEOUT = float(os.environ.get('WEB3_REQUEST_TIMEOUT', 30))
+    
+    # Outbox for side effects (IPFS upload, chain registration, email)
+    OUTBOX_IN_PROCESS = os.environ.get('OUTBOX_IN_PROCESS', 'true').lower() == 'true'
+    OUTBOX_WORKERS = int(os.environ.get('OUTBOX_WORKERS', 4))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 20))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 1.0))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_BACKOFF_BASE = float(os.environ.get('OUTBOX_BACKOFF_BASE', 5.0))
+    OUTBOX_BACKOFF_MAX = float(os.environ.get('OUTBOX_BACKOFF_MAX', 900.0))
+    OUTBOX_LOCK_TIMEOUT = float(os.environ.get('OUTBOX_LOCK_TIMEOUT', 300.0))
     
     # Storage
     STORACHA_API_KEY = os.environ.get('STORACHA_API_KEY')
+    STORACHA_POOL_SIZE = int(os.environ.get('STORACHA_POOL_SIZE', 20))
+    STORACHA_CONNECT_TIMEOUT = float(os.environ.get('STORACHA_CONNECT_TIMEOUT', 5.0))
+    STORACHA_READ_TIMEOUT = float(os.environ.get('STORACHA_READ_TIMEOUT', 60.0))
+    STORACHA_RETRIES = int(os.environ.get('STORACHA_RETRIES', 3))  # GET and HEAD only
+    STORACHA_RETRY_BACKOFF = float(os.environ.get('STORACHA_RETRY_BACKOFF', 0.5))
+    # Cached CID availability: positive results for long, negative ones briefly
+    STORACHA_AVAILABLE_TTL = float(os.environ.get('STORACHA_AVAILABLE_TTL', 3600))
+    STORACHA_UNAVAILABLE_TTL = float(os.environ.get('STORACHA_UNAVAILABLE_TTL', 30))
+    STORACHA_AVAILABILITY_CACHE_SIZE = int(os.environ.get('STORACHA_AVAILABILITY_CACHE_SIZE', 10000))
+    # Local content-addressed cache of IPFS content; empty disables it
+    CONTENT_STORE_PATH = os.environ.get('CONTENT_STORE_PATH', 'data/content_store')
+    CONTENT_STORE_MAX_BYTES = int(os.environ.get('CONTENT_STORE_MAX_BYTES', 1024 ** 3))
+    CONTENT_STORE_MMAP_THRESHOLD = int(os.environ.get('CONTENT_STORE_MMAP_THRESHOLD', 8 * 1024 * 1024))
     IPFS_GATEWAY_URL = os.environ.get('IPFS_GATEWAY_URL')
     
     # Email
@@ -54,3 +117,30 @@ class Config:
     # Machine Learning
     ML_MODEL_PATH = os.environ.get('ML_MODEL_PATH', 'app/ml/models/duration_predictor.h5')
     MINIMUM_CONFIDENCE_THRESHOLD = float(os.environ.get('MINIMUM_CONFIDENCE_THRESHOLD', 0.7))
+    
+    # Climatology table used past the forecast horizon (built by train_model.py)
+    CLIMATOLOGY_PATH = os.environ.get('CLIMATOLOGY_PATH', 'data/climatology.npz')
+    
+    # Monte Carlo delay simulation
+    DELAY_SIMULATION_SCENARIOS = int(os.environ.get('DELAY_SIMULATION_SCENARIOS', 1000))
+    DELAY_SIMULATION_SEED = int(os.environ['DELAY_SIMULATION_SEED']) if os.environ.get('DELAY_SIMULATION_SEED') else None
+    BASE_RAIN_PROBABILITY = float(os.environ.get('BASE_RAIN_PROBABILITY', 0.3))
+    
+    # Feature store for prepared model inputs: redis, memmap or none
+    FEATURE_STORE_BACKEND = os.environ.get('FEATURE_STORE_BACKEND', 'redis')
+    FEATURE_STORE_PATH = os.environ.get('FEATURE_STORE_PATH', 'data/feature_store')
+    FEATURE_STORE_TTL = int(os.environ.get('FEATURE_STORE_TTL', 10800))
+    
+    # Rain model training (background jobs)
+    ML_RAIN_MODEL_PATH = os.environ.get('ML_RAIN_MODEL_PATH', 'ml_rain_predictor.h5')
+    ML_TRAINING_DATA_DIR = os.environ.get('ML_TRAINING_DATA_DIR', 'data/training')
+    ML_TRAINING_CHUNK_SIZE = int(os.environ.get('ML_TRAINING_CHUNK_SIZE', 10000))
+    ML_TRAINING_EPOCHS = int(os.environ.get('ML_TRAINING_EPOCHS', 10))
+    ML_WARM_START_EPOCHS = int(os.environ.get('ML_WARM_START_EPOCHS', 3))
+    ML_TRAINING_JOB_TTL = int(os.environ.get('ML_TRAINING_JOB_TTL', 7 * 86400))  # Job status kept in Redis
+    ML_TRAINING_LOCK_TIMEOUT = int(os.environ.get('ML_TRAINING_LOCK_TIMEOUT', 6 * 3600))  # Renewed every epoch
+    
+    # Shadow scoring of a candidate model (disabled when no path is set)
+    ML_SHADOW_MODEL_PATH = os.environ.get('ML_SHADOW_MODEL_PATH')
+    ML_SHADOW_TOLERANCE_DAYS = float(os.environ.get('ML_SHADOW_TOLERANCE_DAYS', 1.0))
+    ML_SHADOW_QUEUE_SIZE = int(os.environ.get('ML_SHADOW_QUEUE_SIZE', 1000))
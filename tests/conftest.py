@@ -11,6 +11,11 @@ class TestConfig(Config):
     STORACHA_API_KEY = 'test_key'
     OPENWEATHER_API_KEY = 'test_key'
     ML_MODEL_PATH = os.path.join(tempfile.gettempdir(), 'test_model.h5')
+    OUTBOX_IN_PROCESS = False
+    INDEXER_IN_PROCESS = False
+    BLOCKCHAIN_TRACKER_IN_PROCESS = False
+    FEE_ORACLE_BACKGROUND = False
+    CONTENT_STORE_PATH = ''
 
 @pytest.fixture
 def app():
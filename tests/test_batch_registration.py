@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+from app.models.pending_transaction import PendingTransaction
+from app.blockchain.read_cache import ChainReadCache
+from app.blockchain.sender_pool import SenderPool
+from app.blockchain.web3_client import Web3Client
+
+SENDER = '0x' + '1' * 40
+
+def make_receipt(tx_hash, status, block_number, events):
+    return {'transactionHash': tx_hash, 'status': status, 'blockNumber': block_number,
+            'blockHash': '0x%064x' % block_number, 'gasUsed': 150000, 'events': events}
+
+def make_client(receipts, send_errors=None):
+    """`send_errors` maps a broadcast's position to the exception it raises"""
+    client = Web3Client.__new__(Web3Client)
+    client._senders = SenderPool([SENDER])
+    client.reads = ChainReadCache()
+    client.fees = MagicMock()
+    client.fees.estimate_gas.return_value = 121000  # 100000 per item plus the base cost
+    client.contract = MagicMock()
+    client.w3 = MagicMock()
+    client.w3.to_hex.side_effect = lambda value: value
+    sends = [(receipt['transactionHash'], i) for i, receipt in enumerate(receipts)]
+    for position, error in sorted((send_errors or {}).items()):
+        sends.insert(position, error)
+    client._broadcast = MagicMock(side_effect=sends)
+    client.w3.eth.wait_for_transaction_receipt.side_effect = receipts
+    client.contract.events.ContractStored.return_value.process_receipt.side_effect = [
+        receipt['events'] for receipt in receipts if receipt['status'] == 1
+    ]
+    return client
+
+def test_batch_is_chunked_by_gas_and_events_map_back_to_items(app):
+    app.config['CONTRACT_BATCH_GAS_LIMIT'] = 21000 + 2 * 120000
+    receipts = [
+        make_receipt('0xt1', 1, 5, [
+            {'args': {'contractId': 11}, 'logIndex': 0},
+            {'args': {'contractId': 12}, 'logIndex': 1}
+        ]),
+        make_receipt('0xt2', 1, 6, [
+            {'args': {'contractId': 14}, 'logIndex': 0}
+        ])
+    ]
+    client = make_client(receipts)
+
+    with app.app_context():
+        results = client.register_contracts([
+            {'contract_id': 11, 'cid': 'bafy11'},
+            {'contract_id': 12, 'cid': 'bafy12'},
+            {'contract_id': 13, 'cid': 'bafy13'},
+            {'contract_id': 14, 'cid': 'bafy14'}
+        ])
+
+    assert client._broadcast.call_count == 2
+    assert [(r['contract_id'], r['status'], r['tx_hash'], r['log_index']) for r in results] == [
+        (11, 'registered', '0xt1', 0),
+        (12, 'registered', '0xt1', 1),
+        (13, 'skipped', '0xt2', None),
+        (14, 'registered', '0xt2', 0)
+    ]
+
+def test_reverted_chunk_marks_its_items_failed(app):
+    client = make_client([make_receipt('0xt1', 0, 5, [])])
+
+    with app.app_context():
+        results = client.register_contracts([{'contract_id': 1, 'cid': 'bafy1'}])
+
+    assert results[0]['status'] == 'failed'
+
+def test_unsent_chunks_fail_alone_and_sent_ones_are_tracked(app, init_database):
+    app.config['CONTRACT_BATCH_GAS_LIMIT'] = 21000 + 120000
+    client = make_client(
+        [make_receipt('0xt2', 1, 6, [{'args': {'contractId': 1}, 'logIndex': 0}])],
+        send_errors={0: ValueError({'code': -32000, 'message': 'insufficient funds for gas'})}
+    )
+
+    with app.app_context():
+        from app.models.contract import Contract
+        results = client.register_contracts([{'contract_id': 99, 'cid': 'bafy99'}, {'contract_id': 1, 'cid': 'bafy1'}])
+
+        assert [(r['contract_id'], r['status'], r['tx_hash']) for r in results] == [
+            (99, 'failed', None),
+            (1, 'registered', '0xt2')
+        ]
+        tracked = PendingTransaction.query.one()
+        assert (tracked.tx_hash, tracked.method, tracked.status, tracked.nonce) == ('0xt2', 'register_contracts', 'included', 0)
+        contract = Contract.query.get(1)
+        assert (contract.blockchain_tx, contract.blockchain_latest_tx, contract.blockchain_status) == ('0xt2', '0xt2', 'included')
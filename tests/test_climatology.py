@@ -0,0 +1,43 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from app.services.climatology import ClimatologyTable, day_of_year
+
+def history(lat, lon, rainy_months):
+    dates = pd.date_range('2014-01-01', '2023-12-31', freq='D')
+    prcp = np.where(dates.month.isin(rainy_months), 5.0, 0.0)
+    return pd.DataFrame({
+        'latitude': lat,
+        'longitude': lon,
+        'date': dates,
+        'prcp': prcp
+    })
+
+def test_day_of_year_reserves_leap_day():
+    assert day_of_year(date(2023, 1, 1)) == 0
+    assert day_of_year(date(2024, 2, 29)) == 59
+    assert day_of_year(date(2023, 3, 1)) == 60
+    assert day_of_year(date(2023, 12, 31)) == 365
+
+def test_lookup_per_cell_and_day(tmp_path):
+    df = pd.concat([history(-29.47, -51.96, [6, 7]), history(-23.55, -46.63, [1])])
+    table = ClimatologyTable.build(df)
+
+    path = str(tmp_path / 'climatology.npz')
+    table.save(path)
+    table = ClimatologyTable.load(path)
+
+    frequency, precipitation = table.lookup(-29.47, -51.96, date(2025, 7, 10))
+    assert frequency == 1.0
+    assert precipitation == 5.0
+    assert table.lookup(-29.47, -51.96, date(2025, 10, 10))[0] == 0.0
+    assert table.lookup(-23.55, -46.63, date(2025, 1, 15))[0] == 1.0
+    assert table.lookup(10.0, 10.0, date(2025, 1, 15)) is None
+
+def test_climatology_day_matches_forecast_shape():
+    table = ClimatologyTable.build(history(0.0, 0.0, [3]))
+    day = table.climatology_day(0.0, 0.0, date(2025, 3, 15))
+
+    assert day['source'] == 'climatology'
+    assert day['rain_prob'] == 1.0
+    assert set(day['temp']) == {'min', 'max', 'day'}
@@ -0,0 +1,71 @@
+import mmap
+import os
+from unittest.mock import patch
+
+import pytest
+from app.services.content_store import ContentStore
+
+CID = 'bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi'
+
+def test_round_trip_in_a_flatfs_shard(tmp_path):
+    store = ContentStore(str(tmp_path), max_bytes=1024)
+    assert store.get(CID) is None
+
+    store.put(CID, b'%PDF-1.4 contract')
+    assert store.get(CID) == b'%PDF-1.4 contract'
+    assert os.path.exists(os.path.join(str(tmp_path), CID[-3:-1], CID))
+
+def test_corrupt_entries_are_dropped(tmp_path):
+    store = ContentStore(str(tmp_path), max_bytes=1024)
+    store.put(CID, b'original')
+    with open(os.path.join(str(tmp_path), CID[-3:-1], CID), 'wb') as f:
+        f.write(b'tampered')
+
+    assert store.get(CID) is None
+    assert not os.path.exists(os.path.join(str(tmp_path), CID[-3:-1], CID))
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    store = ContentStore(str(tmp_path), max_bytes=250)
+    cids = ['QmOldest0001', 'QmRecent0002', 'QmNewest0003']
+    for i, cid in enumerate(cids[:2]):
+        store.put(cid, bytes(100))
+        os.utime(os.path.join(str(tmp_path), cid[-3:-1], cid), (1000 + i, 1000 + i))
+    # Reading the oldest entry makes it the most recently used
+    assert store.get(cids[0]) is not None
+
+    store.put(cids[2], bytes(100))
+    assert store.get(cids[0]) is not None
+    assert store.get(cids[1]) is None
+    assert store.get(cids[2]) is not None
+
+def test_large_files_are_memory_mapped(tmp_path):
+    store = ContentStore(str(tmp_path), max_bytes=1024 ** 2, mmap_threshold=4096)
+    store.put(CID, b'x' * 8192)
+
+    content = store.get(CID)
+    assert isinstance(content, mmap.mmap)
+    assert content[:4] == b'xxxx' and len(content) == 8192
+    content.close()
+
+def test_invalid_cids_are_rejected(tmp_path):
+    store = ContentStore(str(tmp_path), max_bytes=1024)
+    with pytest.raises(ValueError):
+        store.get('../../etc/passwd')
+
+def test_client_serves_stored_content_without_a_request(tmp_path, monkeypatch):
+    from app.services import storacha
+
+    monkeypatch.setenv('STORACHA_X_AUTH_SECRET', 'test_secret')
+    monkeypatch.setenv('STORACHA_AUTHORIZATION_TOKEN', 'test_token')
+    store = ContentStore(str(tmp_path), max_bytes=1024 ** 2)
+    monkeypatch.setattr(storacha, 'get_content_store', lambda: store)
+    client = storacha.StorachaClient()
+
+    with patch.object(client.session, 'request') as mock_request:
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = {'cid': CID}
+        assert client.upload_content(b'signed pdf', 'signed.pdf') == CID
+
+        mock_request.reset_mock()
+        assert client.get_content(CID) == b'signed pdf'
+        mock_request.assert_not_called()
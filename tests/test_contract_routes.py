@@ -4,8 +4,9 @@ from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 from app.models.contract import Contract, ContractAdjustment
 from app.models.weather_prediction import WeatherPrediction
+from app.services.outbox import OutboxDispatcher
 
-def test_generate_contract(client, init_database, mock_weather_data, mock_storacha_cid, mock_blockchain_tx):
+def test_generate_contract(app, client, init_database, mock_weather_data, mock_storacha_cid, mock_blockchain_tx):
     """Test contract generation endpoint"""
     contract_data = {
         'creator_id': 1,
@@ -49,30 +50,44 @@ def test_generate_contract(client, init_database, mock_weather_data, mock_storac
                 'metadata': {}
             }
             
-            # Mock PDF generation and Storacha upload
-            with patch('app.services.pdf_generator.generate_contract_pdf') as mock_pdf:
-                mock_pdf.return_value = b'PDF content'
-                
-                with patch('app.services.storacha.StorachaClient.upload_content') as mock_upload:
-                    mock_upload.return_value = mock_storacha_cid
-                    
-                    # Mock blockchain registration
-                    with patch('app.blockchain.web3_client.Web3Client.register_contract') as mock_register:
-                        mock_register.return_value = mock_blockchain_tx
-                        
-                        # Test successful contract generation
-                        response = client.post(
-                            '/api/contrato/gerar',
-                            json=contract_data
-                        )
-                        
-                        assert response.status_code == 201
-                        data = json.loads(response.data)
-                        assert 'contract' in data
-                        assert data['contract']['title'] == 'Test Painting Contract'
-                        assert data['contract']['initial_cid'] == mock_storacha_cid
-                        assert data['contract']['blockchain_tx'] == mock_blockchain_tx
-                        assert 'weather_prediction' in data
+            # Test successful contract generation
+            response = client.post(
+                '/api/contrato/gerar',
+                json=contract_data
+            )
+            
+            assert response.status_code == 201
+            data = json.loads(response.data)['data']
+            assert 'contract' in data
+            assert data['contract']['title'] == 'Test Painting Contract'
+            assert 'weather_prediction' in data
+            # Side effects are queued, not performed inline
+            assert data['contract']['initial_cid'] is None
+            assert [m['kind'] for m in data['outbox']] == ['storacha_upload']
+    
+    # Drain the outbox: the upload queues chain registration and email
+    web3_client = MagicMock(async_transactions=False)
+    web3_client.register_contract.return_value = mock_blockchain_tx
+    web3_client.read_batch.return_value.contract_row.return_value.execute.return_value = [{'timestamp': 0}]
+    with app.app_context():
+        with patch('app.services.pdf_generator.generate_contract_pdf', return_value=b'PDF content'), \
+                patch('app.services.storacha.StorachaClient') as mock_storacha, \
+                patch('app.blockchain.web3_client.get_web3_client', return_value=web3_client), \
+                patch('app.services.email_service.send_contract_email', return_value=True):
+            mock_storacha.return_value.upload_content.return_value = mock_storacha_cid
+            dispatcher = OutboxDispatcher()
+            assert dispatcher.run_once() == 1
+            assert dispatcher.run_once() == 2
+        
+        contract = Contract.query.get(data['contract']['id'])
+        assert contract.initial_cid == mock_storacha_cid
+        assert contract.blockchain_tx == mock_blockchain_tx
+    
+    response = client.get(f"/api/contrato/{data['contract']['id']}/outbox")
+    assert response.status_code == 200
+    status = json.loads(response.data)['data']
+    assert status['complete']
+    assert sorted(m['kind'] for m in status['messages']) == ['chain_register', 'email', 'storacha_upload']
     
     # Test missing required fields
     invalid_data = contract_data.copy()
@@ -96,6 +111,47 @@ def test_generate_contract(client, init_database, mock_weather_data, mock_storac
     assert 'error' in data
     assert 'Invalid date format' in data['error']
 
+def test_chain_register_adopts_an_earlier_transaction(app, init_database, mock_storacha_cid, mock_blockchain_tx):
+    """A retried registration takes over the transaction already sent instead of sending another"""
+    from app import db
+    from app.models.pending_transaction import PendingTransaction
+    from app.services.outbox import enqueue
+
+    web3_client = MagicMock(async_transactions=True)
+    with app.app_context():
+        contract = Contract.query.first()
+        contract.initial_cid = mock_storacha_cid
+        db.session.add(PendingTransaction(tx_hash=mock_blockchain_tx, method='register_contract',
+                                          entity_type='contract', entity_key=str(contract.id), status='included'))
+        enqueue('chain_register', 'contract', contract.id)
+        db.session.commit()
+
+        with patch('app.blockchain.web3_client.get_web3_client', return_value=web3_client):
+            assert OutboxDispatcher().run_once() == 1
+
+        contract = Contract.query.first()
+        assert (contract.blockchain_tx, contract.blockchain_status) == (mock_blockchain_tx, 'included')
+    web3_client.register_contract.assert_not_called()
+
+def test_chain_register_skips_contracts_already_on_chain(app, init_database, mock_storacha_cid):
+    """A registration mined before its DB changes were lost is not sent again"""
+    from app import db
+    from app.services.outbox import enqueue
+
+    web3_client = MagicMock(async_transactions=False)
+    web3_client.read_batch.return_value.contract_row.return_value.execute.return_value = [{'timestamp': 1700000000}]
+    with app.app_context():
+        contract = Contract.query.first()
+        contract.initial_cid = mock_storacha_cid
+        enqueue('chain_register', 'contract', contract.id)
+        db.session.commit()
+
+        with patch('app.blockchain.web3_client.get_web3_client', return_value=web3_client):
+            assert OutboxDispatcher().run_once() == 1
+
+        assert Contract.query.first().blockchain_status == 'included'
+    web3_client.register_contract.assert_not_called()
+
 def test_get_contract_status(client, init_database, mock_storacha_cid):
     """Test contract status endpoint"""
     # Create test contract with weather prediction
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from app.services.delay_simulation import DelaySimulator, simulate_delays
+
+def test_dry_forecast_has_no_delay():
+    pop = np.zeros((2, 21), dtype=np.float32)
+    delays, capped = simulate_delays(pop, np.array([7, 5]), n_scenarios=100, rng=np.random.default_rng(0))
+
+    assert delays.shape == (2, 100)
+    assert (delays == 0).all()
+    assert not capped.any()
+
+def test_certain_rain_is_capped_at_horizon():
+    pop = np.ones((1, 21), dtype=np.float32)
+    delays, capped = simulate_delays(pop, np.array([7]), n_scenarios=50, rng=np.random.default_rng(0))
+
+    assert (delays == 21 - 7).all()
+    assert capped.all()
+
+def test_finishing_on_the_last_day_is_not_capped():
+    # Dry only on the last 7 days of the horizon: every scenario finishes on day 21
+    pop = np.concatenate([np.ones((1, 14)), np.zeros((1, 7))], axis=1).astype(np.float32)
+    delays, capped = simulate_delays(pop, np.array([7]), n_scenarios=50, rng=np.random.default_rng(0))
+
+    assert (delays == 21 - 7).all()
+    assert not capped.any()
+
+def test_distribution_percentiles_and_dates():
+    simulator = DelaySimulator(n_scenarios=5000, seed=42)
+    daily = [{'rain_prob': 0.5} for _ in range(10)]
+
+    result = simulator.simulate_contract(date(2024, 1, 1), 10, daily)
+
+    # With p=0.5 the expected number of rainy days before 10 dry ones is 10
+    assert 8 <= result['mean_delay_days'] <= 12
+    assert result['p50_delay_days'] <= result['p90_delay_days']
+    assert result['p50_completion_date'] == (date(2024, 1, 11) + timedelta(days=result['p50_delay_days'])).isoformat()
+    assert sum(result['histogram']) == 5000
+
+def test_batch_matches_contract_count():
+    simulator = DelaySimulator(n_scenarios=200, seed=1)
+    results = simulator.simulate(
+        [date(2024, 1, 1)] * 3,
+        [5, 10, 15],
+        [[{'rain_prob': 0.1}] * 5, [], [{'rain_prob': 0.9}] * 3]
+    )
+
+    assert len(results) == 3
+    assert results[0]['mean_delay_days'] < results[2]['mean_delay_days']
+
+@pytest.mark.parametrize('planned_days', [0, -3, None, '', 'ten', 2.5])
+def test_invalid_planned_days_are_rejected(planned_days):
+    with pytest.raises(ValueError):
+        DelaySimulator(n_scenarios=10).simulate_contract(date(2024, 1, 1), planned_days, [])
+
+@pytest.mark.parametrize('n_scenarios', [0, -1, None, 'many'])
+def test_invalid_scenario_counts_are_rejected(n_scenarios):
+    with pytest.raises(ValueError):
+        DelaySimulator(n_scenarios=n_scenarios)
@@ -0,0 +1,205 @@
+from unittest.mock import MagicMock
+from app import db
+from app.blockchain import chain_mirror
+from app.blockchain.event_indexer import EventIndexer
+from app.models.chain_event import ChainEvent, IndexerCheckpoint
+from app.models.chain_mirror import MirroredContract, MirroredFile
+
+class FakeReadBatch:
+    """Mapping reads answered from FakeChain state at a block"""
+
+    def __init__(self, chain, block_number):
+        self.chain = chain
+        self.block_number = block_number
+        self.rows = []
+
+    def contract_row(self, contract_id):
+        self.rows.append(self.chain.state_at(self.chain.contracts, contract_id, self.block_number, timestamp=0))
+        return self
+
+    def signature_row(self, contract_id):
+        self.rows.append(self.chain.state_at(self.chain.signatures, contract_id, self.block_number,
+                                             timestamp=0, metadata=None))
+        return self
+
+    def file_row(self, cid):
+        self.rows.append(self.chain.state_at(self.chain.files, cid, self.block_number, timestamp=0))
+        return self
+
+    def execute(self):
+        return self.rows
+
+class FakeChain:
+    """Blocks (number -> hash) and decoded contract logs, as a Web3Client would return them"""
+
+    def __init__(self, head):
+        self.hashes = {n: f"0x{n:02d}a" for n in range(head + 1)}
+        self.logs = []
+        self.file_logs = []
+        # key -> [(block number, row)]: mapping state from that block on
+        self.contracts, self.signatures, self.files = {}, {}, {}
+
+    @staticmethod
+    def state_at(rows, key, block_number, **empty):
+        states = [row for number, row in rows.get(key, []) if number <= block_number]
+        return states[-1] if states else empty
+
+    def add_log(self, block_number, contract_id, event_type='ContractStored', fields=None):
+        self.logs.append({
+            'type': event_type,
+            'contract_id': contract_id,
+            'fields': fields or {},
+            'block_number': block_number,
+            'block_hash': self.hashes[block_number],
+            'tx_hash': f"0xtx{block_number}{len(self.logs)}",
+            'log_index': 0
+        })
+
+    def store_contract(self, block_number, contract_id, status='Draft'):
+        self.add_log(block_number, contract_id, 'StatusChanged' if contract_id in self.contracts else 'ContractStored')
+        self.contracts.setdefault(contract_id, []).append((block_number, {
+            'cid': f"bafy{contract_id}", 'timestamp': 1000 + block_number, 'status': status,
+            'creator': '0xabc', 'party_a': '0xabc', 'party_b': '0xdef',
+            'is_party_a_signed': False, 'is_party_b_signed': False
+        }))
+
+    def store_file(self, block_number, cid):
+        self.file_logs.append({'cid': cid, 'block_number': block_number, 'block_hash': self.hashes[block_number]})
+        self.files.setdefault(cid, []).append((block_number, {
+            'cid': cid, 'owner': '0xabc', 'timestamp': 1000 + block_number
+        }))
+
+    def reorg(self, from_block, suffix='b'):
+        for n in self.hashes:
+            if n >= from_block:
+                self.hashes[n] = f"0x{n:02d}{suffix}"
+        self.logs = [log for log in self.logs if log['block_number'] < from_block]
+        self.file_logs = [log for log in self.file_logs if log['block_number'] < from_block]
+        for rows in (self.contracts, self.signatures, self.files):
+            for key in rows:
+                rows[key] = [(number, row) for number, row in rows[key] if number < from_block]
+
+    def client(self):
+        client = MagicMock()
+        client.get_blocks.side_effect = lambda numbers: {
+            n: {'number': n, 'hash': self.hashes[n], 'timestamp': 1000 + n} for n in numbers
+        }
+        type(client.w3.eth).block_number = property(lambda _: max(self.hashes))
+        client.get_contract_logs.side_effect = lambda start, end: [
+            log for log in self.logs if start <= log['block_number'] <= end
+        ]
+        client.get_file_logs.side_effect = lambda start, end: [
+            log for log in self.file_logs if start <= log['block_number'] <= end
+        ]
+        client.read_batch.side_effect = lambda block_number: FakeReadBatch(self, block_number)
+        return client
+
+def test_events_are_indexed_in_block_ranges(app):
+    chain = FakeChain(head=25)
+    chain.add_log(3, 1, fields={'cid': 'bafy1', 'creator': '0xabc'})
+    chain.add_log(12, 2)
+    chain.add_log(20, 1, 'StatusChanged', {'new_status': 'Signed'})
+    client = chain.client()
+
+    with app.app_context():
+        indexer = EventIndexer(block_range=10)
+        assert indexer.run_once(client) == 1
+        assert indexer.lag == 16
+        indexer.run_once(client)
+        indexer.run_once(client)
+        assert indexer.lag == 0
+        assert IndexerCheckpoint.query.filter_by(name='contract_events').one().block_number == 25
+
+        events = [event.to_dict() for event in ChainEvent.for_contract(1)]
+        assert [event['type'] for event in events] == ['ContractStored', 'StatusChanged']
+        assert events[0]['cid'] == 'bafy1'
+        assert events[0]['timestamp'] == 1003
+
+        # Caught up: nothing new to index
+        assert indexer.run_once(client) == 0
+
+def test_reorg_rewinds_to_the_last_canonical_block(app):
+    chain = FakeChain(head=20)
+    chain.add_log(15, 1)
+    chain.add_log(19, 1, 'StatusChanged', {'new_status': 'Cancelled'})
+    client = chain.client()
+
+    with app.app_context():
+        indexer = EventIndexer(reorg_depth=12)
+        assert indexer.run_once(client) == 2
+
+        chain.reorg(18)
+        chain.add_log(18, 1, 'StatusChanged', {'new_status': 'Signed'})
+        indexer.run_once(client)
+
+        events = [event.to_dict() for event in ChainEvent.for_contract(1)]
+        assert [(event['block_number'], event.get('new_status')) for event in events] == [(15, None), (18, 'Signed')]
+
+def test_mirror_reflects_the_checkpoint_block(app):
+    chain = FakeChain(head=30)
+    chain.store_contract(5, 1)
+    chain.store_file(7, 'bafyfile')
+    chain.store_contract(25, 1, 'Signed')
+    client = chain.client()
+
+    with app.app_context():
+        indexer = EventIndexer(block_range=10)
+        indexer.run_once(client)
+        assert chain_mirror.mirror_block() == 9
+        assert MirroredContract.query.get(1).status == 'Draft'
+        assert MirroredFile.query.filter_by(cid='bafyfile').one().timestamp == 1007
+
+        # Answered from the mirror, without reading the chain
+        verification = chain_mirror.verify_contract(client, 1, 'bafy1')
+        assert verification['is_valid'] and verification['method'] == 'mirror'
+        assert verification['as_of_block'] == 9
+        client.verify_contract.assert_not_called()
+
+        indexer.run_once(client)
+        indexer.run_once(client)
+        details, signature, as_of_block = chain_mirror.contract_state(client, 1)
+        assert (details['status'], as_of_block) == ('Signed', 29)
+        assert signature['timestamp'] == 0
+
+        # strict reads the chain
+        client.verify_cid.return_value = {'is_valid': True, 'method': 'direct'}
+        assert chain_mirror.verify_cid(client, 'bafyfile', strict=True)['as_of_block'] is None
+
+def test_reorg_rewinds_the_mirror(app):
+    chain = FakeChain(head=20)
+    chain.store_contract(10, 1)
+    chain.store_contract(18, 1, 'Cancelled')
+    chain.store_contract(19, 2)
+    client = chain.client()
+
+    with app.app_context():
+        indexer = EventIndexer(reorg_depth=12)
+        indexer.run_once(client)
+        assert MirroredContract.query.get(1).status == 'Cancelled'
+
+        chain.reorg(17)
+        indexer.run_once(client)
+        db.session.expire_all()
+
+        assert MirroredContract.query.get(1).status == 'Draft'
+        assert MirroredContract.query.get(2) is None
+
+def test_strict_requests_skip_the_response_cache(app):
+    from unittest.mock import MagicMock
+    from app.blockchain.chain_mirror import strict_requested
+    from app.utils.cache import cached
+
+    calls = []
+
+    @cached(expires_in=60, skip_if=strict_requested)
+    def status():
+        calls.append(1)
+        return 'live'
+
+    with app.test_request_context('/contrato/status/bafy?strict=true'):
+        app.cache = MagicMock()
+        assert status() == 'live'
+        assert status() == 'live'
+        app.cache.get.assert_not_called()
+        app.cache.set.assert_not_called()
+    assert len(calls) == 2
@@ -0,0 +1,53 @@
+import numpy as np
+from app.services.feature_store import (
+    FeatureStore, MemmapFeatureBackend, FEATURE_SCHEMA_VERSION, RAIN_PROB_COLUMN
+)
+
+def forecast_day(date, rain_prob):
+    return {
+        'date': date,
+        'temp': {'min': 15.0, 'max': 25.0, 'day': 20.0},
+        'humidity': 70,
+        'wind_speed': 5,
+        'rain_prob': rain_prob,
+        'rain_amount': 2.0
+    }
+
+def test_rows_are_shared_within_a_grid_cell(tmp_path):
+    store = FeatureStore(MemmapFeatureBackend(str(tmp_path), FEATURE_SCHEMA_VERSION))
+    days = [forecast_day('2024-01-01', 0.3), forecast_day('2024-01-02', 0.8)]
+    store.put_days(-29.4669, -51.9644, days)
+
+    # A nearby contract in the same cell reads the stored rows, not its own dicts
+    other_days = [{'date': '2024-01-01'}, {'date': '2024-01-02'}]
+    matrix = store.get_matrix(-29.4701, -51.9612, other_days)
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (2, 7)
+    np.testing.assert_allclose(matrix[:, RAIN_PROB_COLUMN], [0.3, 0.8], rtol=1e-6)
+
+def test_missing_rows_are_built_and_written_back(tmp_path):
+    backend = MemmapFeatureBackend(str(tmp_path), FEATURE_SCHEMA_VERSION)
+    store = FeatureStore(backend)
+
+    matrix = store.get_matrix(0.0, 0.0, [forecast_day('2024-02-01', 0.5)])
+    assert matrix[0, RAIN_PROB_COLUMN] == 0.5
+
+    from datetime import date
+    from app.utils.grid import grid_cell
+    stored = backend.get_many(grid_cell(0.0, 0.0), [date(2024, 2, 1)])
+    assert stored[0] is not None
+    assert stored[0][RAIN_PROB_COLUMN] == 0.5
+
+def test_memmap_rows_expire_after_the_ttl(tmp_path):
+    import time
+    from unittest.mock import patch
+
+    store = FeatureStore(MemmapFeatureBackend(str(tmp_path), FEATURE_SCHEMA_VERSION, ttl=3600))
+    store.put_days(0.0, 0.0, [forecast_day('2024-03-01', 0.9)])
+    later = time.time() + 3 * 3600
+
+    # Three hours later the stored row is stale, so the caller's fresher forecast is used
+    with patch('app.services.feature_store.time.time', return_value=later):
+        matrix = store.get_matrix(0.0, 0.0, [forecast_day('2024-03-01', 0.2)])
+    assert matrix[0, RAIN_PROB_COLUMN] == np.float32(0.2)
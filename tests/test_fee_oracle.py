@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock, PropertyMock
+from app.blockchain.fee_oracle import FeeOracle, argument_shape
+
+def make_oracle(**kwargs):
+    w3 = MagicMock()
+    w3.eth.gas_price = 2000000000
+    w3.eth.fee_history.return_value = {'baseFeePerGas': [900000000, 1000000000], 'reward': [[100], [300], [200]]}
+    return FeeOracle(w3, background=False, **kwargs), w3
+
+def test_fees_are_sampled_once_within_max_age():
+    oracle, w3 = make_oracle(max_age=30)
+
+    assert oracle.gas_price() == 2000000000
+    fees = oracle.fees()
+
+    assert fees['base_fee'] == 1000000000
+    assert fees['priority_fee'] == 200
+    assert w3.eth.fee_history.call_count == 1
+
+def test_fallback_price_when_the_node_is_unreachable():
+    oracle, w3 = make_oracle()
+    type(w3.eth).gas_price = PropertyMock(side_effect=ConnectionError('node down'))
+    oracle.fallback_gas_price = 5
+
+    assert oracle.fees()['source'] == 'fallback'
+    assert oracle.gas_price() == 5
+
+def test_gas_estimates_are_memoized_by_argument_shape():
+    oracle, _ = make_oracle()
+    function = MagicMock()
+    function.estimate_gas.return_value = 120000
+
+    assert oracle.estimate_gas(function, 'storeContract', [1, 'bafyaaa'], '0xabc') == 120000
+    assert oracle.estimate_gas(function, 'storeContract', [2, 'bafybbb'], '0xabc') == 120000
+    function.estimate_gas.assert_called_once()
+
+    # A longer CID changes the calldata size
+    assert argument_shape([1, 'a' * 40]) != argument_shape([1, 'a' * 20])
+
+def test_reverting_estimate_falls_back_to_default():
+    oracle, _ = make_oracle()
+    function = MagicMock()
+    function.estimate_gas.side_effect = ValueError('execution reverted: Contract already registered')
+
+    assert oracle.estimate_gas(function, 'storeContract', [1, 'bafy'], '0xabc', default=150000) == 150000
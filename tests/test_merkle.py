@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock
+from app.blockchain.merkle import MerkleTree, leaf_hash, verify_proof
+from app.models.anchor import AnchorProof
+from app.services.anchor_service import AnchorService, item_data, queue_cid, queue_contract
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 8, 33])
+def test_every_leaf_proves_against_the_root(size):
+    data = [f"file:cid{i}".encode() for i in range(size)]
+    tree = MerkleTree([leaf_hash(d) for d in data])
+
+    for i, d in enumerate(data):
+        assert verify_proof(d, tree.proof(i), tree.root)
+
+def test_proofs_do_not_verify_other_leaves():
+    tree = MerkleTree([leaf_hash(f"file:cid{i}".encode()) for i in range(5)])
+
+    assert not verify_proof(b'file:cid1', tree.proof(0), tree.root)
+    assert not verify_proof(b'file:unknown', tree.proof(0), tree.root)
+
+def test_inner_nodes_are_not_valid_leaves():
+    leaves = [leaf_hash(f"file:cid{i}".encode()) for i in range(4)]
+    tree = MerkleTree(leaves)
+
+    assert not verify_proof(tree.levels[1][0], [tree.levels[1][1]], tree.root)
+
+def test_queued_cids_are_anchored_in_one_batch(app):
+    with app.app_context():
+        for i in range(5):
+            queue_cid(f"bafycid{i}")
+        from app import db
+        db.session.commit()
+
+        client = MagicMock(async_transactions=False)
+        client.anchor_root.return_value = '0xabc'
+        batch = AnchorService(window=0).run_once(client)
+
+        assert batch.status == 'anchored'
+        assert batch.leaf_count == 5
+        client.anchor_root.assert_called_once()
+
+        proof = AnchorProof.find_anchored('file', 'bafycid3')
+        assert verify_proof(
+            item_data('file', 'bafycid3'),
+            [bytes.fromhex(p[2:]) for p in proof.proof],
+            bytes.fromhex(batch.root[2:])
+        )
+
+def test_anchored_contracts_report_their_chain_status(app):
+    from unittest.mock import patch
+    from app.blockchain.web3_client import Web3Client
+
+    with app.app_context():
+        queue_contract(1, 'bafydoc')
+        from app import db
+        db.session.commit()
+        anchorer = MagicMock(async_transactions=False)
+        anchorer.anchor_root.return_value = '0xabc'
+        AnchorService(window=0).run_once(anchorer)
+
+        with patch('app.blockchain.web3_client.Web3Client._load_contract'):
+            client = Web3Client(MagicMock())
+        client.contract = MagicMock()
+        client.contract.functions.anchoredRoots.return_value.call.return_value = (1, 1700000000, '0x' + '11' * 20)
+        # The DB row is still a draft; the chain says the contract was signed
+        client.contract.functions.contracts.return_value.call.return_value = (
+            1, 'bafydoc', 1700000000, 2, '0x' + '11' * 20, '0x' + '11' * 20, '0x' + '11' * 20, True, True
+        )
+
+        verification = client.verify_contract(1, 'bafydoc')
+
+    assert (verification['method'], verification['is_valid'], verification['status']) == ('merkle', True, 'Signed')
@@ -0,0 +1,41 @@
+from app.services.ml_service import MLPredictor
+
+class AreaModel:
+    """Model stub predicting one day per 10 m² and counting its calls"""
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, features, verbose=0):
+        self.calls += 1
+        return features[:, :1] / 10.0
+
+def test_batch_prediction_is_one_model_call(app):
+    with app.app_context():
+        predictor = MLPredictor()
+        predictor.model = model = AreaModel()
+
+        durations = predictor.predict_duration_batch([
+            {'area': 70, 'complexity': 1, 'workers': 2},
+            {'area': 124, 'complexity': 2, 'workers': 3},
+            {'area': 10}
+        ])
+
+    assert durations == [7, 12, 1]
+    assert model.calls == 1
+    assert predictor.predict_duration_batch([]) == []
+
+def test_batch_prediction_without_a_model_uses_the_mock(app):
+    with app.app_context():
+        # TestConfig.ML_MODEL_PATH does not exist, so no model is loaded
+        predictor = MLPredictor()
+        assert predictor.predict_duration_batch([{'area': 50}, {'area': 80}]) == [7, 7]
+
+class FailingModel:
+    def predict(self, features, verbose=0):
+        raise RuntimeError('model unavailable')
+
+def test_failed_batch_prediction_falls_back_to_the_mock(app):
+    with app.app_context():
+        predictor = MLPredictor()
+        predictor.model = FailingModel()
+        assert predictor.predict_duration_batch([{'area': 50}, {'area': 80}]) == [7, 7]
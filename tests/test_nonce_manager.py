@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from app.blockchain.nonce_manager import NonceManager, is_nonce_error
+
+ACCOUNT = '0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1'
+
+def make_manager(chain_nonce=5):
+    w3 = MagicMock()
+    w3.eth.get_transaction_count.return_value = chain_nonce
+    return NonceManager(w3, chain_id=1337), w3
+
+def test_nonces_are_allocated_locally_after_first_use():
+    manager, w3 = make_manager()
+
+    assert [manager.allocate(ACCOUNT) for _ in range(3)] == [5, 6, 7]
+    w3.eth.get_transaction_count.assert_called_once_with(ACCOUNT, 'pending')
+
+def test_concurrent_allocations_are_unique():
+    manager, _ = make_manager(chain_nonce=0)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        nonces = list(executor.map(lambda _: manager.allocate(ACCOUNT), range(200)))
+
+    assert sorted(nonces) == list(range(200))
+
+def test_resync_resets_counter_from_chain():
+    manager, w3 = make_manager()
+    manager.allocate(ACCOUNT)
+    latest = manager.allocate(ACCOUNT)
+
+    w3.eth.get_transaction_count.return_value = 3
+    assert manager.resync(ACCOUNT, latest) == 3
+    assert manager.allocate(ACCOUNT) == 3
+
+def test_unsent_nonces_are_given_back_only_if_latest():
+    manager, _ = make_manager()
+    first = manager.allocate(ACCOUNT)
+    second = manager.allocate(ACCOUNT)
+
+    # Another sender holds `second`, so `first` cannot be reused
+    assert not manager.release(ACCOUNT, first)
+    assert manager.release(ACCOUNT, second)
+    assert manager.allocate(ACCOUNT) == second
+
+def test_resync_never_hands_out_nonces_in_flight():
+    manager, w3 = make_manager()
+    first = manager.allocate(ACCOUNT)
+    manager.allocate(ACCOUNT)
+
+    # The chain is behind the counter, but a later nonce is still being sent
+    w3.eth.get_transaction_count.return_value = 5
+    assert manager.resync(ACCOUNT, first) == 7
+
+    # The chain moved ahead (transactions sent elsewhere): always follow it
+    w3.eth.get_transaction_count.return_value = 9
+    assert manager.resync(ACCOUNT, first) == 9
+    assert manager.allocate(ACCOUNT) == 9
+
+def test_nonce_errors_are_recognized():
+    assert is_nonce_error(ValueError({'code': -32000, 'message': 'nonce too low'}))
+    assert is_nonce_error(ValueError("the tx doesn't have the correct nonce. account has nonce of: 4"))
+    assert not is_nonce_error(ValueError({'code': -32000, 'message': 'insufficient funds for gas'}))
@@ -0,0 +1,37 @@
+from app.blockchain.read_cache import ChainReadCache
+
+def test_reads_are_cached_per_contract_until_invalidated():
+    cache = ChainReadCache(ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {'status': 'Draft'}
+
+    assert cache.get_or_load(1, 'details', load) == {'status': 'Draft'}
+    cache.get_or_load(1, 'details', load)
+    cache.get_or_load(2, 'details', load)
+    assert len(calls) == 2
+
+    cache.invalidate(1)
+    cache.get_or_load(1, 'details', load)
+    cache.get_or_load(2, 'details', load)
+    assert len(calls) == 3
+
+def test_a_read_overtaken_by_an_invalidation_is_not_stored():
+    cache = ChainReadCache(ttl=60)
+
+    def load():
+        # The contract changes while the node is being read
+        cache.invalidate(1)
+        return {'status': 'Draft'}
+
+    cache.get_or_load(1, 'details', load)
+    assert cache.get(1, 'details') is None
+
+def test_callers_get_copies():
+    cache = ChainReadCache(ttl=60)
+    cache.put(1, 'signature', {'metadata': {'method': 'email'}})
+
+    cache.get(1, 'signature')['metadata']['method'] = 'changed'
+    assert cache.get(1, 'signature')['metadata']['method'] == 'email'
@@ -0,0 +1,119 @@
+from unittest.mock import MagicMock
+from app import db
+from app.blockchain.receipt_tracker import ReceiptTracker
+from app.models.contract import Contract
+from app.models.pending_transaction import PendingTransaction
+
+def make_client(receipts, head=10, hashes=None):
+    """`hashes` maps block number to the canonical block hash"""
+    client = MagicMock()
+    client.get_receipts.side_effect = lambda tx_hashes: {tx_hash: receipts.get(tx_hash) for tx_hash in tx_hashes}
+    client.w3.eth.block_number = head
+    client.get_blocks.side_effect = lambda numbers: {
+        n: {'number': n, 'hash': (hashes or {}).get(n, block_hash(n))} for n in numbers
+    }
+    return client
+
+def block_hash(number):
+    return '0x%064x' % number
+
+def receipt(block_number, status=1, gas_used=90000):
+    """A receipt as decoded by ReadBatch.get_receipt"""
+    return {'status': status, 'block_number': block_number, 'block_hash': block_hash(block_number),
+            'gas_used': gas_used}
+
+def test_pending_transactions_are_resolved_from_receipts(app, init_database):
+    with app.app_context():
+        db.session.add_all([
+            PendingTransaction(tx_hash='0xaa', method='register_contract', entity_type='contract', entity_key='1'),
+            PendingTransaction(tx_hash='0xbb', method='cancel_contract', entity_type='contract', entity_key='1'),
+            PendingTransaction(tx_hash='0xcc', method='request_signature', entity_type='contract', entity_key='1')
+        ])
+        db.session.commit()
+
+        client = make_client({'0xaa': receipt(10), '0xbb': receipt(11, status=0, gas_used=30000)})
+        tracker = ReceiptTracker()
+        seen = []
+        tracker.add_callback(lambda tx: seen.append((tx.tx_hash, tx.status)))
+
+        assert tracker.run_once(client) == 2
+        # All pending receipts are fetched in one batch
+        client.get_receipts.assert_called_once()
+        assert sorted(seen) == [('0xaa', 'included'), ('0xbb', 'failed')]
+        assert PendingTransaction.query.filter_by(tx_hash='0xcc').one().status == 'pending'
+
+        contract = Contract.query.get(1)
+        assert contract.blockchain_tx == '0xaa'
+        assert PendingTransaction.query.filter_by(tx_hash='0xaa').one().block_hash == block_hash(10)
+
+        # Already resolved rows are not applied again
+        assert tracker.run_once(client) == 0
+
+def test_included_transactions_become_final_at_depth(app, init_database):
+    with app.app_context():
+        db.session.add(PendingTransaction(tx_hash='0xaa', method='register_contract',
+                                          entity_type='contract', entity_key='1'))
+        db.session.commit()
+
+        tracker = ReceiptTracker(depth=3)
+        assert tracker.run_once(make_client({'0xaa': receipt(10)}, head=10)) == 1
+        tx = PendingTransaction.query.filter_by(tx_hash='0xaa').one()
+        assert (tx.status, tx.confirmations) == ('included', 1)
+
+        assert tracker.run_once(make_client({'0xaa': receipt(10)}, head=11)) == 0
+        assert PendingTransaction.query.filter_by(tx_hash='0xaa').one().confirmations == 2
+
+        assert tracker.run_once(make_client({'0xaa': receipt(10)}, head=12)) == 1
+        assert PendingTransaction.query.filter_by(tx_hash='0xaa').one().status == 'final'
+        assert Contract.query.get(1).blockchain_status == 'final'
+
+def test_reorged_transactions_go_back_to_pending(app, init_database):
+    with app.app_context():
+        db.session.add(PendingTransaction(tx_hash='0xaa', method='register_contract',
+                                          entity_type='contract', entity_key='1'))
+        db.session.commit()
+
+        tracker = ReceiptTracker(depth=12)
+        tracker.run_once(make_client({'0xaa': receipt(10)}, head=10))
+
+        # Block 10 was replaced and the transaction is not mined again yet
+        assert tracker.run_once(make_client({}, head=11, hashes={10: '0xother'})) == 1
+        tx = PendingTransaction.query.filter_by(tx_hash='0xaa').one()
+        assert (tx.status, tx.block_number) == ('pending', None)
+        assert Contract.query.get(1).blockchain_status == 'pending'
+
+def test_reorged_transactions_get_a_fresh_timeout(app, init_database):
+    from datetime import datetime, timedelta
+
+    with app.app_context():
+        old = datetime.utcnow() - timedelta(hours=1)
+        db.session.add(PendingTransaction(tx_hash='0xaa', method='register_contract', entity_type='contract',
+                                          entity_key='1', status='included', block_number=10,
+                                          block_hash=block_hash(10), created_at=old, broadcast_at=old))
+        db.session.commit()
+
+        tracker = ReceiptTracker(depth=12, timeout=600)
+        tracker.run_once(make_client({}, head=11, hashes={10: '0xother'}))
+
+        # Broadcast an hour ago, but only dropped just now: still waiting to be mined again
+        assert tracker.run_once(make_client({}, head=11)) == 0
+        assert PendingTransaction.query.filter_by(tx_hash='0xaa').one().status == 'pending'
+
+def test_contract_status_follows_its_latest_transaction(app, init_database):
+    with app.app_context():
+        contract = Contract.query.get(1)
+        contract.blockchain_tx = '0xaa'
+        contract.update_status('pending_signature', '0xbb', confirmed=False)
+        db.session.add_all([
+            PendingTransaction(tx_hash='0xaa', method='register_contract', entity_type='contract', entity_key='1'),
+            PendingTransaction(tx_hash='0xbb', method='request_signature', entity_type='contract', entity_key='1')
+        ])
+        db.session.commit()
+
+        # The registration is mined first; the contract still waits on the request
+        ReceiptTracker().run_once(make_client({'0xaa': receipt(10)}))
+        contract = Contract.query.get(1)
+        assert (contract.blockchain_latest_tx, contract.blockchain_status) == ('0xbb', 'pending')
+
+        ReceiptTracker().run_once(make_client({'0xbb': receipt(11)}))
+        assert Contract.query.get(1).blockchain_status == 'included'
@@ -0,0 +1,111 @@
+from unittest.mock import MagicMock
+import pytest
+from web3 import Web3
+from app.blockchain.read_cache import ChainReadCache
+from app.blockchain.rpc_batch import ReadBatch
+from app.utils.error_handlers import BlockchainError
+
+ABI = [
+    {
+        'type': 'function', 'name': 'getContract', 'stateMutability': 'view',
+        'inputs': [{'name': 'contractId', 'type': 'uint256'}],
+        'outputs': [
+            {'name': 'id', 'type': 'uint256'}, {'name': 'cid', 'type': 'string'},
+            {'name': 'timestamp', 'type': 'uint256'}, {'name': 'status', 'type': 'uint8'},
+            {'name': 'creator', 'type': 'address'}, {'name': 'partyA', 'type': 'address'},
+            {'name': 'partyB', 'type': 'address'}, {'name': 'isPartyASigned', 'type': 'bool'},
+            {'name': 'isPartyBSigned', 'type': 'bool'}
+        ]
+    },
+    {
+        'type': 'function', 'name': 'getSignature', 'stateMutability': 'view',
+        'inputs': [{'name': 'contractId', 'type': 'uint256'}],
+        'outputs': [
+            {'name': 'id', 'type': 'uint256'}, {'name': 'originalCid', 'type': 'string'},
+            {'name': 'signedCid', 'type': 'string'}, {'name': 'timestamp', 'type': 'uint256'},
+            {'name': 'metadata', 'type': 'string'}, {'name': 'signer', 'type': 'address'}
+        ]
+    }
+]
+ACCOUNT = '0x' + '11' * 20
+
+def make_client(results):
+    w3 = Web3()
+    client = MagicMock()
+    client.w3.codec = w3.codec
+    client.w3.to_int = w3.to_int
+    client.w3.eth.block_number = 42
+    client.reads = ChainReadCache()
+    client.contract = w3.eth.contract(address=Web3.to_checksum_address('0x' + '22' * 20), abi=ABI)
+    client.w3.provider.make_batch_request.side_effect = lambda calls: [
+        {'jsonrpc': '2.0', 'id': i, **result} for i, result in enumerate(results)
+    ]
+    return client
+
+def test_reads_are_sent_as_one_batch_pinned_to_a_block():
+    w3 = Web3()
+    contract = w3.codec.encode(
+        ['uint256', 'string', 'uint256', 'uint8', 'address', 'address', 'address', 'bool', 'bool'],
+        [7, 'bafyorig', 100, 2, ACCOUNT, ACCOUNT, ACCOUNT, True, True]
+    )
+    signature = w3.codec.encode(
+        ['uint256', 'string', 'string', 'uint256', 'string', 'address'],
+        [7, 'bafyorig', 'bafysigned', 120, '{"method": "email"}', ACCOUNT]
+    )
+    client = make_client([
+        {'result': w3.to_hex(contract)},
+        {'result': w3.to_hex(signature)},
+        {'result': {'number': '0x29', 'hash': '0xabc', 'parentHash': '0xdef', 'timestamp': '0x64'}}
+    ])
+
+    details, signature_details, block = ReadBatch(client) \
+        .contract_details(7) \
+        .signature_details(7) \
+        .get_block(41) \
+        .execute()
+
+    calls = client.w3.provider.make_batch_request.call_args[0][0]
+    assert [method for method, _ in calls] == ['eth_call', 'eth_call', 'eth_getBlockByNumber']
+    assert calls[0][1][1] == calls[1][1][1] == hex(42)
+    assert details['status'] == 'Signed'
+    assert details['cid'] == 'bafyorig'
+    assert signature_details['metadata'] == {'method': 'email'}
+    assert block == {'number': 41, 'hash': '0xabc', 'parent_hash': '0xdef', 'timestamp': 100}
+
+def test_a_failed_call_raises_blockchain_error():
+    client = make_client([{'error': {'code': -32000, 'message': 'execution reverted: Contract not found'}}])
+
+    with pytest.raises(BlockchainError):
+        ReadBatch(client).contract_details(99).execute()
+
+def test_cached_reads_are_not_sent_again():
+    w3 = Web3()
+    contract = w3.codec.encode(
+        ['uint256', 'string', 'uint256', 'uint8', 'address', 'address', 'address', 'bool', 'bool'],
+        [7, 'bafyorig', 100, 1, ACCOUNT, ACCOUNT, ACCOUNT, True, False]
+    )
+    client = make_client([{'result': w3.to_hex(contract)}])
+
+    first, = ReadBatch(client).contract_details(7).execute()
+    second, = ReadBatch(client).contract_details(7).execute()
+
+    assert first == second
+    assert client.w3.provider.make_batch_request.call_count == 1
+
+    # A change at a later block than the cached read drops it
+    client.reads.invalidate(7, block_number=43)
+    ReadBatch(client).contract_details(7).execute()
+    assert client.w3.provider.make_batch_request.call_count == 2
+
+def test_receipts_are_decoded_in_one_batch():
+    client = make_client([
+        {'result': {'status': '0x1', 'blockNumber': '0x2a', 'blockHash': '0xabc', 'gasUsed': '0x15f90'}},
+        {'result': None}
+    ])
+
+    mined, unmined = ReadBatch(client).get_receipt('0xaa').get_receipt('0xbb').execute()
+
+    calls = client.w3.provider.make_batch_request.call_args[0][0]
+    assert calls == [('eth_getTransactionReceipt', ['0xaa']), ('eth_getTransactionReceipt', ['0xbb'])]
+    assert mined == {'status': 1, 'block_number': 42, 'block_hash': '0xabc', 'gas_used': 90000}
+    assert unmined is None
@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+from app import db
+from app.blockchain.sender_pool import SenderPool
+from app.models.contract import Contract
+
+ACCOUNTS = [f"0x{i:040x}" for i in range(1, 5)]
+
+def test_routing_is_stable_and_spreads_contracts():
+    pool = SenderPool(ACCOUNTS)
+
+    assert pool.for_key(6) == pool.for_key(6) == ACCOUNTS[2]
+    assert {pool.for_key(contract_id) for contract_id in range(8)} == set(ACCOUNTS)
+    assert pool.for_key('bafycid') == pool.for_key('bafycid')
+    assert pool.for_key(None) == pool.default == ACCOUNTS[0]
+
+def test_node_accounts_are_used_without_private_keys():
+    w3 = MagicMock()
+    w3.eth.accounts = ACCOUNTS + ['0x' + 'f' * 40]
+
+    pool = SenderPool.from_config(w3, {'BLOCKCHAIN_SENDER_POOL_SIZE': 4})
+
+    assert pool.accounts == ACCOUNTS
+    assert pool.private_key(ACCOUNTS[0]) is None
+
+def test_contracts_keep_the_account_that_registered_them(app, init_database):
+    from app.blockchain.web3_client import Web3Client
+
+    with app.app_context():
+        client = Web3Client.__new__(Web3Client)
+        client._senders = SenderPool(ACCOUNTS)
+
+        contract = Contract.query.get(1)
+        assert client.sender_for_contract(1) == ACCOUNTS[1]
+
+        contract.blockchain_sender = ACCOUNTS[3]
+        db.session.commit()
+        assert client.sender_for_contract(1) == ACCOUNTS[3]
+
+        # Registered before the pool existed: the default account is a party
+        contract.blockchain_sender = None
+        contract.blockchain_tx = '0xabc'
+        db.session.commit()
+        assert client.sender_for_contract(1) == ACCOUNTS[0]
@@ -0,0 +1,53 @@
+import time
+import numpy as np
+from app.services.shadow_scoring import ShadowScorer
+
+class ConstantModel:
+    """Model stub returning a fixed offset from the first feature"""
+    def __init__(self, offset, delay=0.0):
+        self.offset = offset
+        self.delay = delay
+
+    def predict(self, features, verbose=0):
+        time.sleep(self.delay)
+        return features[:, :1] + self.offset
+
+def wait_for(scorer, batches, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = scorer.get_stats()['versions'].get(scorer.version)
+        if stats and stats['batches'] >= batches:
+            return stats
+        time.sleep(0.01)
+    raise AssertionError('Shadow scorer did not process batches in time')
+
+def test_agreement_recorded_per_version():
+    scorer = ShadowScorer(loader=lambda: ConstantModel(0.5), version='candidate', tolerance=1.0)
+    features = np.array([[5.0, 1.0, 1.0], [7.0, 2.0, 1.0]])
+
+    scorer.record_served('served-1', len(features), 2.0)
+    assert scorer.submit(features, features[:, 0])
+
+    stats = wait_for(scorer, 1)
+    assert stats['role'] == 'shadow'
+    assert stats['agreement']['compared'] == 2
+    assert stats['agreement']['rate'] == 1.0
+    assert stats['agreement']['mean_abs_diff'] == 0.5
+
+    served = scorer.get_stats()['versions']['served-1']
+    assert served['role'] == 'served'
+    assert served['latency_ms']['p50'] == 2.0
+    scorer.stop()
+
+def test_submit_never_blocks_on_slow_model():
+    scorer = ShadowScorer(loader=lambda: ConstantModel(0.0, delay=0.5), version='slow', max_queue=1)
+    features = np.ones((1, 3))
+
+    started = time.perf_counter()
+    results = [scorer.submit(features, [1.0]) for _ in range(5)]
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.1
+    assert not all(results)
+    assert scorer.get_stats()['dropped'] >= 1
+    scorer.stop()
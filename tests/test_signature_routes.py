@@ -85,8 +85,8 @@ def test_get_signature_status(client, init_database, mock_storacha_cid):
     db.session.commit()
     
     # Mock IPFS availability checks
-    with patch('app.services.storacha.StorachaClient.check_cid_availability') as mock_check:
-        mock_check.return_value = True
+    with patch('app.services.storacha.StorachaClient.check_many') as mock_check:
+        mock_check.side_effect = lambda cids: {cid: True for cid in cids if cid}
         
         # Mock blockchain verification
         with patch('app.blockchain.web3_client.Web3Client.verify_signature') as mock_verify:
@@ -138,8 +138,8 @@ def test_validate_signature(client, init_database, mock_storacha_cid):
         }
         
         # Mock IPFS availability
-        with patch('app.services.storacha.StorachaClient.check_cid_availability') as mock_check:
-            mock_check.return_value = True
+        with patch('app.services.storacha.StorachaClient.check_many') as mock_check:
+            mock_check.side_effect = lambda cids: {cid: True for cid in cids if cid}
             
             # Test signature validation
             response = client.get(
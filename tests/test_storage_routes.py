@@ -150,7 +150,7 @@ def test_upload_model():
     # Test blockchain status update
     upload.update_blockchain_status('0xtxhash')
     assert upload.blockchain_tx == '0xtxhash'
-    assert upload.status == 'confirmed'
+    assert upload.status == 'included'
     
     # Test to_dict method
     upload_dict = upload.to_dict()
@@ -158,40 +158,93 @@ def test_upload_model():
     assert upload_dict['filename'] == 'test.txt'
     assert upload_dict['cid'] == 'testcid'
     assert upload_dict['blockchain_tx'] == '0xtxhash'
-    assert upload_dict['status'] == 'confirmed'
+    assert upload_dict['status'] == 'included'
 
-def test_storacha_integration():
+def test_storacha_integration(monkeypatch):
     """Test StorachaClient functionality"""
-    from app.services.storacha import StorachaClient
+    from app.services.storacha import StorachaClient, get_request_stats
     
+    monkeypatch.setenv('STORACHA_X_AUTH_SECRET', 'test_secret')
     client = StorachaClient(api_key='test_key')
+    assert client.headers['Authorization'] == 'test_key'
     
     # Test file upload
     test_file = BytesIO(b'test content')
     test_file.filename = 'test.txt'
+    test_file.stream = test_file
+    test_file.content_type = 'text/plain'
     
-    with patch('requests.post') as mock_post:
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {'cid': 'testcid'}
+    with patch.object(client.session, 'request') as mock_request:
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = {'cid': 'testcid'}
         
         cid = client.upload_file(test_file)
         assert cid == 'testcid'
+        # Every request carries connect and read timeouts
+        assert mock_request.call_args.kwargs['timeout'] == client.timeout
     
     # Test content upload
-    with patch('requests.post') as mock_post:
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {'cid': 'testcid2'}
+    with patch.object(client.session, 'request') as mock_request:
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = {'cid': 'testcid2'}
         
         cid = client.upload_content(b'test content', 'test.txt')
         assert cid == 'testcid2'
     
     # Test CID availability check
-    with patch('requests.head') as mock_head:
-        mock_head.return_value.status_code = 200
+    with patch.object(client.session, 'request') as mock_request:
+        mock_request.return_value.status_code = 200
         
         is_available = client.check_cid_availability('testcid')
         assert is_available is True
         
-        mock_head.return_value.status_code = 404
+        mock_request.return_value.status_code = 404
         is_available = client.check_cid_availability('nonexistentcid')
         assert is_available is False
+    
+    # Latency is recorded per endpoint, not per CID
+    stats = get_request_stats()
+    assert stats['HEAD /content']['requests'] >= 2
+    assert stats['HEAD /content']['errors'] >= 1
+    assert stats['POST /upload']['latency_ms']['p50'] is not None
+
+def test_storacha_clients_share_one_session(monkeypatch):
+    from app.services.storacha import StorachaClient
+    
+    monkeypatch.setenv('STORACHA_X_AUTH_SECRET', 'test_secret')
+    monkeypatch.setenv('STORACHA_AUTHORIZATION_TOKEN', 'test_token')
+    first, second = StorachaClient(), StorachaClient()
+    assert first.session is second.session
+    
+    retry = first.session.get_adapter('https://api.storacha.io').max_retries
+    assert 'HEAD' in retry.allowed_methods and 'POST' not in retry.allowed_methods
+
+def test_check_many_runs_in_parallel_and_caches(monkeypatch):
+    import time
+    from app.services import storacha
+    
+    monkeypatch.setenv('STORACHA_X_AUTH_SECRET', 'test_secret')
+    monkeypatch.setenv('STORACHA_AUTHORIZATION_TOKEN', 'test_token')
+    # Negative results expire immediately; positive ones are kept
+    monkeypatch.setitem(storacha.SESSION_DEFAULTS, 'STORACHA_UNAVAILABLE_TTL', 0.0)
+    client = storacha.StorachaClient()
+    cids = ['bafymanyavailable1', 'bafymanyavailable2', 'bafymanymissing3']
+    
+    def head(method, url, **kwargs):
+        time.sleep(0.2)
+        response = MagicMock()
+        response.status_code = 404 if url.endswith('missing3') else 200
+        return response
+    
+    with patch.object(client.session, 'request', side_effect=head) as mock_request:
+        started = time.perf_counter()
+        result = client.check_many(cids + [None, cids[0]])
+        assert time.perf_counter() - started < 0.5
+        assert result == {cids[0]: True, cids[1]: True, cids[2]: False}
+        assert mock_request.call_count == 3
+        
+        # Only the unavailable CID is checked again
+        assert client.check_many(cids) == result
+        assert mock_request.call_count == 4
+        assert client.check_cid_availability(cids[0]) is True
+        assert mock_request.call_count == 4
@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+import pytest
+from app.blockchain.subscriptions import ChainSubscriber
+
+def make_subscriber():
+    client = MagicMock()
+    indexer = MagicMock()
+    subscriptions = {}
+    subscriber = ChainSubscriber('ws://localhost:8545', client, indexer)
+    subscriber.handle_message({'jsonrpc': '2.0', 'id': 1, 'result': '0xheads'}, subscriptions)
+    subscriber.handle_message({'jsonrpc': '2.0', 'id': 2, 'result': '0xlogs'}, subscriptions)
+    return subscriber, client, indexer, subscriptions
+
+def notification(subscription, result):
+    return {'jsonrpc': '2.0', 'method': 'eth_subscription', 'params': {'subscription': subscription, 'result': result}}
+
+def test_new_heads_wake_the_indexer():
+    subscriber, client, indexer, subscriptions = make_subscriber()
+
+    subscriber.handle_message(notification('0xheads', {'number': '0x10'}), subscriptions)
+
+    indexer.notify.assert_called_once()
+    client.reads.invalidate.assert_not_called()
+
+def test_logs_invalidate_their_contract():
+    subscriber, client, indexer, subscriptions = make_subscriber()
+    log = {'topics': ['0xevent', '0x' + '0' * 62 + '07'], 'blockNumber': '0x1f', 'removed': False}
+
+    subscriber.handle_message(notification('0xlogs', log), subscriptions)
+
+    client.reads.invalidate.assert_called_once_with(7, 31)
+    indexer.notify.assert_called_once()
+
+def test_removed_logs_clear_the_cache():
+    subscriber, client, _, subscriptions = make_subscriber()
+
+    subscriber.handle_message(notification('0xlogs', {'topics': [], 'blockNumber': '0x1f', 'removed': True}), subscriptions)
+
+    client.reads.clear.assert_called_once()
+
+def test_subscription_errors_force_a_reconnect():
+    subscriber = ChainSubscriber('ws://localhost:8545', MagicMock())
+
+    with pytest.raises(ConnectionError):
+        subscriber.handle_message({'jsonrpc': '2.0', 'id': 2, 'error': {'message': 'logs not supported'}}, {})
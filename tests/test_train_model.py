@@ -1,35 +1,79 @@
-import os
-import pytest
+from datetime import date
 import pandas as pd
 from unittest import mock
 from train_model import collect_weather_data, main
 
-def test_collect_weather_data():
-    df = collect_weather_data()
+def fake_archive(latitude, longitude, start_date, end_date, session=None):
+    """Archive response with one rainy day in three, standing in for Open-Meteo"""
+    days = pd.date_range(start_date, end_date, freq='D')
+    return {
+        'daily': {
+            'time': [day.strftime('%Y-%m-%d') for day in days],
+            'temperature_2m_mean': [20.0] * len(days),
+            'temperature_2m_min': [None if i == 0 else 15.0 for i in range(len(days))],
+            'temperature_2m_max': [25.0] * len(days),
+            'precipitation_sum': [2.5 if i % 3 == 0 else 0.0 for i in range(len(days))]
+        }
+    }
+
+def test_collect_weather_data(tmp_path):
+    with mock.patch('train_model.fetch_archive_range', side_effect=fake_archive):
+        df = collect_weather_data(start_date=date(2020, 1, 1), end_date=date(2021, 6, 30),
+                                  cache_dir=str(tmp_path), requests_per_second=0)
     expected_columns = ['tavg', 'tmin', 'tmax', 'prcp', 'chuva']
     # Check columns
     assert list(df.columns) == expected_columns
     # Check no NaN values in critical fields
     assert df[expected_columns].isna().sum().sum() == 0
+    assert len(df) == (date(2021, 6, 30) - date(2020, 1, 1)).days + 1
+
+@mock.patch('train_model.MLPredictor')
+def test_training_process(mock_predictor, tmp_path):
+    output = tmp_path / 'training' / 'weather_history.parquet'
+    climatology = tmp_path / 'climatology.npz'
+    argv = [
+        '--start', '2020-01-01', '--end', '2020-12-31', '--rate', '0',
+        '--cache-dir', str(tmp_path / 'weather_cache'),
+        '--output', str(output),
+        '--climatology-output', str(climatology)
+    ]
+
+    with mock.patch('train_model.fetch_archive_range', side_effect=fake_archive) as mock_fetch:
+        main(argv)
+
+    mock_fetch.assert_called_once()
+    mock_predictor.return_value.retrain_model.assert_called_once()
+    assert output.exists() and climatology.exists()
+
+def test_split_date_range_covers_range_without_gaps():
+    from datetime import timedelta
+    from train_model import split_date_range
 
-@mock.patch('train_model.MLPredictor.retrain_model')
-def test_training_process(mock_retrain_model):
-    # Mock retrain_model to just pass
-    mock_retrain_model.return_value = None
+    ranges = split_date_range(date(2020, 1, 1), date(2022, 6, 30), chunk_days=365)
 
-    # Run main, should call retrain_model without exceptions
-    main()
+    assert ranges[0][0] == date(2020, 1, 1)
+    assert ranges[-1][1] == date(2022, 6, 30)
+    for (_, previous_end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert next_start == previous_end + timedelta(days=1)
 
-    # Assert retrain_model was called once
-    mock_retrain_model.assert_called_once()
+def test_fetch_chunk_resumes_from_disk_cache(tmp_path):
+    from train_model import RateLimiter, fetch_chunk
 
-    # Since retrain_model is mocked, model file may not exist, so create dummy file
-    model_path = os.path.join(os.getcwd(), 'ml_rain_predictor.h5')
-    with open(model_path, 'w') as f:
-        f.write('dummy model content')
+    response = {
+        'daily': {
+            'time': ['2020-01-01', '2020-01-02'],
+            'temperature_2m_mean': [20.0, 21.0],
+            'temperature_2m_min': [15.0, 16.0],
+            'temperature_2m_max': [25.0, 26.0],
+            'precipitation_sum': [0.0, 3.2]
+        }
+    }
+    args = (-29.4669, -51.9644, date(2020, 1, 1), date(2020, 1, 2), str(tmp_path), RateLimiter(0), None)
 
-    # Check that model file exists
-    assert os.path.exists(model_path)
+    with mock.patch('train_model.fetch_archive_range', return_value=response) as mock_fetch:
+        first = fetch_chunk(*args)
+        second = fetch_chunk(*args)
 
-    # Cleanup dummy model file
-    os.remove(model_path)
+    mock_fetch.assert_called_once()
+    assert first.equals(second)
+    assert list(first['prcp']) == [0.0, 3.2]
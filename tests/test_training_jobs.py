@@ -0,0 +1,84 @@
+import time
+from unittest.mock import MagicMock, patch
+from app.services.training_pipeline import TrainingJobManager
+
+class SharedRedis:
+    """Key/value store shared by managers standing in for separate worker processes"""
+    def __init__(self):
+        self.values = {}
+        self.lock = MagicMock()
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+def fake_training(job, chunks, model_path, batch_size, on_update):
+    job.status = 'running'
+    on_update(job)
+    job.epoch = job.epochs
+    job.status = 'completed'
+    on_update(job)
+
+def wait_for_status(manager, job_id, status, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'Training job did not reach {status}')
+
+def test_jobs_are_visible_to_other_processes():
+    redis = SharedRedis()
+    submitting, other = TrainingJobManager(redis), TrainingJobManager(redis)
+
+    with patch('app.services.training_pipeline.run_training', side_effect=fake_training):
+        job = submitting.submit(lambda: iter([]), {'type': 'records'}, 'model.h5', epochs=2)
+        finished = wait_for_status(other, job.id, 'completed')
+
+    assert finished.epoch == 2
+    assert finished.source_type == 'records'
+    assert other.get('unknown') is None
+
+def test_training_holds_the_shared_lock():
+    redis = SharedRedis()
+    manager = TrainingJobManager(redis, lock_timeout=60)
+
+    with patch('app.services.training_pipeline.run_training', side_effect=fake_training):
+        job = manager.submit(lambda: iter([]), {'type': 'records'}, 'model.h5', epochs=1)
+        wait_for_status(manager, job.id, 'completed')
+    manager._executor.shutdown(wait=True)
+
+    redis.lock.assert_called_once_with('ml:training_lock', timeout=60)
+    lock = redis.lock.return_value
+    lock.acquire.assert_called_once()
+    lock.release.assert_called_once()
+
+def test_archive_source_is_downloaded_once(tmp_path):
+    import pandas as pd
+    from app.services.training_pipeline import materialize_chunks
+
+    downloads = []
+
+    def archive():
+        downloads.append(1)
+        yield pd.DataFrame({'tavg': [20.0, 21.0], 'tmin': [15.0, None], 'tmax': [25.0, 26.0], 'prcp': [0.0, 3.5]})
+        yield pd.DataFrame({'tavg': [19.0], 'tmin': [14.0], 'tmax': [24.0], 'prcp': [None]})
+
+    chunks = materialize_chunks(archive, str(tmp_path / 'archive.parquet'))
+    for _ in range(3):
+        assert sum(len(chunk) for chunk in chunks()) == 3
+    assert len(downloads) == 1
+
+def test_partial_batches_are_counted_exactly():
+    import pandas as pd
+    from app.services.training_pipeline import _split_arrays
+
+    rows = []
+    frame = pd.DataFrame({'tavg': [20.0] * 12, 'tmin': [15.0] * 12, 'tmax': [25.0] * 12, 'prcp': [1.0] * 12})
+    arrays = list(_split_arrays(lambda: iter([frame]), validation=False, on_rows=rows.append))
+
+    # Rows 0, 5 and 10 are held out for validation
+    assert rows == [9] and len(arrays[0][0]) == 9
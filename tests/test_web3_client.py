@@ -0,0 +1,92 @@
+from unittest.mock import patch, MagicMock
+from app.blockchain import web3_client
+from app.blockchain.web3_client import Web3Client, get_web3_client
+
+def test_client_is_shared_within_a_process(app):
+    with app.app_context():
+        with patch('app.blockchain.web3_client.Web3Client._load_contract'):
+            web3_client._reset_clients()
+            first = get_web3_client()
+            second = get_web3_client()
+
+    assert first is second
+
+def test_event_filters_are_created_lazily(app):
+    with app.app_context():
+        with patch('app.blockchain.web3_client.Web3Client._load_contract'):
+            client = Web3Client(MagicMock())
+        client.contract = MagicMock()
+
+        client.contract.events.ContractStored.create_filter.assert_not_called()
+        client.contract_stored_filter
+        client.contract_stored_filter
+
+    client.contract.events.ContractStored.create_filter.assert_called_once_with(fromBlock='latest')
+
+def test_reverted_writes_are_recorded_as_failed(app):
+    import pytest
+    from hexbytes import HexBytes
+    from app import db
+    from app.models.pending_transaction import PendingTransaction
+    from app.utils.error_handlers import BlockchainError
+
+    with app.app_context():
+        with patch('app.blockchain.web3_client.Web3Client._load_contract'):
+            client = Web3Client(MagicMock())
+        client.async_transactions = False
+        client.w3 = MagicMock()
+        client.w3.to_hex.side_effect = lambda value: '0x' + bytes(value).hex()
+        client.w3.eth.wait_for_transaction_receipt.return_value = {
+            'status': 0, 'blockNumber': 7, 'blockHash': HexBytes('0x' + '07' * 32), 'gasUsed': 30000
+        }
+
+        with patch.object(client, '_broadcast', return_value=(b'\xaa' * 32, 4)), \
+                patch('app.blockchain.event_indexer.index_in_background'):
+            with pytest.raises(BlockchainError):
+                client._transact(MagicMock(), 300000, 'register_cid', 'upload', 'bafycid', sender='0x' + '11' * 20)
+
+        # The reverted transaction is never reported as included
+        tracked = [obj for obj in db.session.new if isinstance(obj, PendingTransaction)]
+        assert [(tx.status, tx.error, tx.nonce) for tx in tracked] == [('failed', 'Transaction reverted', 4)]
+
+def make_sending_client(app, send_error):
+    with app.app_context():
+        with patch('app.blockchain.web3_client.Web3Client._load_contract'):
+            client = Web3Client(MagicMock())
+    client.w3 = MagicMock()
+    client.w3.eth.send_transaction.side_effect = send_error
+    client._senders = MagicMock()
+    client._senders.private_key.return_value = None
+    client.nonces = MagicMock()
+    client.nonces.allocate.return_value = 9
+    client.fees = MagicMock()
+    return client
+
+def test_rejected_sends_give_their_nonce_back(app):
+    import pytest
+
+    client = make_sending_client(app, ValueError({'code': -32000, 'message': 'insufficient funds for gas'}))
+    with app.app_context(), pytest.raises(ValueError):
+        client._broadcast(MagicMock(), 300000, '0x' + '11' * 20)
+
+    client.nonces.release.assert_called_once_with('0x' + '11' * 20, 9)
+    client.nonces.resync.assert_not_called()
+
+def test_timed_out_sends_leave_the_counter_alone(app):
+    import pytest
+    import requests
+
+    # The node may have accepted the transaction, so its nonce is not reused
+    client = make_sending_client(app, requests.Timeout('read timed out'))
+    with app.app_context(), pytest.raises(requests.Timeout):
+        client._broadcast(MagicMock(), 300000, '0x' + '11' * 20)
+
+    client.nonces.release.assert_not_called()
+    client.nonces.resync.assert_not_called()
+
+def test_nonce_errors_resync_and_retry_once(app):
+    client = make_sending_client(app, [ValueError({'code': -32000, 'message': 'nonce too low'}), b'\xbb' * 32])
+    with app.app_context():
+        assert client._broadcast(MagicMock(), 300000, '0x' + '11' * 20) == (b'\xbb' * 32, 9)
+
+    client.nonces.resync.assert_called_once_with('0x' + '11' * 20, 9)
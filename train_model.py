@@ -1,38 +1,161 @@
+import argparse
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 import requests
 import pandas as pd
 import numpy as np
 from app.services.ml_service import MLPredictor
+from app.services.training_pipeline import archive_response_to_frame, fetch_archive_range, split_date_range
+from app.services.climatology import ClimatologyTable
 
-def collect_weather_data():
-    """Collect historical weather data from Open-Meteo"""
-    url = (
-        "https://archive-api.open-meteo.com/v1/archive?"
-        "latitude=-29.4669&longitude=-51.9644"
-        "&start_date=2014-01-01&end_date=2024-03-27"
-        "&daily=temperature_2m_mean,temperature_2m_min,temperature_2m_max,precipitation_sum"
+DEFAULT_LOCATIONS = [(-29.4669, -51.9644)]
+DEFAULT_START_DATE = date(2014, 1, 1)
+DEFAULT_END_DATE = date(2024, 3, 27)
+DEFAULT_CACHE_DIR = os.path.join('data', 'weather_cache')
+DEFAULT_OUTPUT = os.path.join('data', 'training', 'weather_history.parquet')
+DEFAULT_CLIMATOLOGY_OUTPUT = os.path.join('data', 'climatology.npz')
+CHUNK_DAYS = 365
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 2.0
+
+class RateLimiter:
+    """Spaces out calls across threads to at most `rate` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def cache_path(cache_dir, latitude, longitude, start_date, end_date):
+    """Disk location of the raw archive response for one (location, range)"""
+    return os.path.join(
+        cache_dir,
+        f"{latitude:.4f}_{longitude:.4f}",
+        f"{start_date.isoformat()}_{end_date.isoformat()}.json"
     )
-    response = requests.get(url).json()
-    df = pd.DataFrame({
-        'tavg': response['daily']['temperature_2m_mean'],
-        'tmin': response['daily']['temperature_2m_min'],
-        'tmax': response['daily']['temperature_2m_max'],
-        'prcp': response['daily']['precipitation_sum']
-    }, index=pd.to_datetime(response['daily']['time']))
 
-    df['prcp'] = df['prcp'].fillna(0)
-    df['tavg'] = df['tavg'].fillna(df['tavg'].mean())
-    df['tmin'] = df['tmin'].fillna(df['tmin'].mean())
-    df['tmax'] = df['tmax'].fillna(df['tmax'].mean())
-    df['chuva'] = df['prcp'].apply(lambda x: 1 if x > 0 else 0)
+def fetch_chunk(latitude, longitude, start_date, end_date, cache_dir, limiter, session):
+    """
+    Fetch one (location, range) chunk, reading the disk cache first
 
+    Responses are written atomically, so an interrupted run only refetches
+    the chunks that had not finished.
+    """
+    path = cache_path(cache_dir, latitude, longitude, start_date, end_date)
+    if os.path.exists(path):
+        with open(path) as f:
+            response = json.load(f)
+    else:
+        limiter.wait()
+        response = fetch_archive_range(latitude, longitude, start_date, end_date, session)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(response, f)
+        os.replace(tmp_path, path)
+
+    df = archive_response_to_frame(response)
+    df.index.name = 'date'
+    df['latitude'] = latitude
+    df['longitude'] = longitude
     return df
 
-def main():
+def collect_weather_data(locations=None, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                         cache_dir=DEFAULT_CACHE_DIR, max_workers=MAX_WORKERS,
+                         requests_per_second=REQUESTS_PER_SECOND):
+    """
+    Collect historical weather data from Open-Meteo for several locations
+
+    Returns:
+        DataFrame indexed by (latitude, longitude, date) with the training
+        columns ['tavg', 'tmin', 'tmax', 'prcp', 'chuva']
+    """
+    locations = locations or DEFAULT_LOCATIONS
+    limiter = RateLimiter(requests_per_second)
+    session = requests.Session()
+
+    tasks = [
+        (lat, lon, chunk_start, chunk_end)
+        for lat, lon in locations
+        for chunk_start, chunk_end in split_date_range(start_date, end_date, CHUNK_DAYS)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(
+            lambda task: fetch_chunk(*task, cache_dir, limiter, session),
+            tasks
+        ))
+
+    df = pd.concat(frames).reset_index().set_index(['latitude', 'longitude', 'date']).sort_index()
+    df = df[~df.index.duplicated(keep='last')]
+
+    df['prcp'] = df['prcp'].fillna(0)
+    by_location = df.groupby(level=['latitude', 'longitude'])
+    for column in ('tavg', 'tmin', 'tmax'):
+        df[column] = df[column].fillna(by_location[column].transform('mean'))
+    df['chuva'] = (df['prcp'] > 0).astype(int)
+
+    return df[['tavg', 'tmin', 'tmax', 'prcp', 'chuva']]
+
+def write_training_dataset(df, output_path=DEFAULT_OUTPUT):
+    """Write the collected data as a single columnar (Parquet) dataset"""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    df.reset_index().to_parquet(output_path, index=False)
+    return output_path
+
+def parse_location(value):
+    """Parse a 'lat,lon' command line value"""
+    lat, lon = value.split(',')
+    return float(lat), float(lon)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Collect weather history and train the rain model')
+    parser.add_argument('--location', action='append', type=parse_location, dest='locations',
+                        help="Location as 'lat,lon' (repeatable)")
+    parser.add_argument('--start', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
+                        default=DEFAULT_START_DATE)
+    parser.add_argument('--end', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
+                        default=DEFAULT_END_DATE)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--climatology-output', default=DEFAULT_CLIMATOLOGY_OUTPUT)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND,
+                        help='Maximum archive requests per second')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv or [])
+
     print("Collecting historical weather data...")
-    df = collect_weather_data()
+    df = collect_weather_data(
+        locations=args.locations,
+        start_date=args.start,
+        end_date=args.end,
+        cache_dir=args.cache_dir,
+        max_workers=args.workers,
+        requests_per_second=args.rate
+    )
     print(f"Collected {len(df)} days of data")
 
+    output_path = write_training_dataset(df, args.output)
+    print(f"Training dataset written to {output_path}")
+
+    ClimatologyTable.build(df).save(args.climatology_output)
+    print(f"Climatology table written to {args.climatology_output}")
+
     print("Training the rain prediction model...")
     predictor = MLPredictor()
     predictor.retrain_model(df)
@@ -40,4 +163,4 @@ def main():
     print("Model trained and saved successfully!")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])